@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+A `gh` stand-in for the benchmark suite.
+
+Answers the calls the engine makes (REST via `gh api --include`, GraphQL,
+`gh pr list/create`, `gh auth token`) with canned data after sleeping
+GH_STUB_LATENCY_MS, so runs measure the engine's round trips rather than
+GitHub. Each call is appended to GH_STUB_LOG when set.
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+
+USERS = [f"user{index}" for index in range(int(os.environ.get("GH_STUB_USERS", "250")))]
+PAGE_SIZE = 100
+
+
+def _rest(path: str, headers: dict[str, str]) -> str:
+    if path.startswith("search/users"):
+        body = {"items": [{"login": "user0"}]}
+    elif path.startswith("repos/") and "/contributors" in path:
+        body = [{"login": login, "type": "User"} for login in USERS[:PAGE_SIZE]]
+    elif path == "user":
+        body = {"login": "bench"}
+    else:
+        return "HTTP/2.0 404 Not Found\n\n{}"
+    text = json.dumps(body)
+    etag = '"' + hashlib.sha1(text.encode()).hexdigest()[:16] + '"'
+    # Conditional revalidation, as gh forwards it with -H If-None-Match.
+    if headers.get("if-none-match") == etag:
+        return f"HTTP/2.0 304 Not Modified\nETag: {etag}\n\n"
+    lines = ["HTTP/2.0 200 OK", "Content-Type: application/json", f"ETag: {etag}"]
+    return "\n".join(lines) + "\n\n" + text
+
+
+def _graphql(fields: dict[str, str]) -> str:
+    query = fields.get("query", "")
+    if "assignableUsers" in query:
+        start = int(fields.get("after") or 0)
+        end = min(start + PAGE_SIZE, len(USERS))
+        repository = {
+            "assignableUsers": {
+                "nodes": [{"login": login} for login in USERS[start:end]],
+                "pageInfo": {"hasNextPage": end < len(USERS), "endCursor": str(end)},
+            },
+            "pullRequests": {"nodes": []},
+        }
+        return json.dumps({"data": {"viewer": {"login": "bench"}, "repository": repository}})
+    # Batched handle search: one aliased search per email.
+    aliases = [name for name in fields if name.startswith("q")]
+    data = {f"u{name[1:]}": {"nodes": [{"login": "user0"}]} for name in aliases}
+    return json.dumps({"data": data})
+
+
+def _fields(args: list[str]) -> dict[str, str]:
+    fields = {}
+    for flag, value in zip(args, args[1:]):
+        if flag in ("-f", "-F"):
+            name, _, field = value.partition("=")
+            fields[name] = field
+    return fields
+
+
+def _rest_request(args: list[str]) -> tuple[str, dict[str, str]]:
+    """The path (the argument after `-X <method>`) and the -H headers."""
+    path = ""
+    headers = {}
+    for index, flag in enumerate(args):
+        value = args[index + 1] if index + 1 < len(args) else ""
+        if flag == "-X" and index + 2 < len(args):
+            path = args[index + 2]
+        elif flag == "-H":
+            name, _, header = value.partition(":")
+            headers[name.strip().lower()] = header.strip()
+    return path, headers
+
+
+def main(args: list[str]) -> int:
+    time.sleep(float(os.environ.get("GH_STUB_LATENCY_MS", "0")) / 1000)
+    log = os.environ.get("GH_STUB_LOG")
+    if log:
+        with open(log, "a", encoding="utf-8") as file_handle:
+            file_handle.write(" ".join(args[:3]) + "\n")
+
+    if args[:2] == ["auth", "token"]:
+        print("stub-token")
+    elif args[:2] == ["api", "graphql"]:
+        print(_graphql(_fields(args[2:])))
+    elif args[:1] == ["api"]:
+        print(_rest(*_rest_request(args[1:])))
+    elif args[:2] == ["pr", "list"]:
+        print("[]")
+    elif args[:2] == ["pr", "create"]:
+        base = args[args.index("--base") + 1]
+        print(f"https://github.com/bench/origin/pull/{abs(hash(base)) % 10000}")
+    else:
+        sys.stderr.write(f"gh stub: unsupported command {' '.join(args)}\n")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Engine cold-start benchmark.
+
+Runs each engine mode in a fresh interpreter against a throwaway repository
+and reports the median wall time plus the import cost measured with
+`python -X importtime`. Every Raycast interaction that misses the warm
+server pays this cost, so the run fails when a mode imports a module listed
+in startup_budget.json (e.g. the HTTP stack for --save-reviewers), imports
+more modules in all than its max_modules there, or, with --max-ms, gets
+slower than the given budget. The forbidden imports are the real
+regression check: they name the heavy modules a mode must not pull in, on
+any Python version. max_modules is only a coarse guard against imports
+growing wholesale, so it sits about 40% above the counts measured with
+CPython 3.11 rather than tracking them, and stdlib changes between versions
+do not trip it.
+
+    python3 benchmarks/startup.py                 # pr_engine.py
+    python3 benchmarks/startup.py --bundle venv/pr_engine.pyz
+
+GitHub is replaced by a `gh` stub that fails immediately, and HOME and the
+cache directory point at temporary folders, so no real state is touched.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent
+BUDGET_FILE = Path(__file__).resolve().parent / "startup_budget.json"
+
+MODES = {
+    "save-reviewers": ["--save-reviewers", "--reviewers", "octocat"],
+    "get-description": ["--get-description", "--source", "feature", "--target", "main"],
+    "get-preview": ["--get-preview", "--source", "feature", "--target", "main"],
+    "get-data": ["--get-data"],
+    "get-repos-data": ["--get-repos-data", "--repos", "."],
+    "serve": ["--serve"],
+}
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def _make_repo(root: Path) -> Path:
+    repo = root / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "config", "user.email", "bench@example.com")
+    _git(repo, "config", "user.name", "Bench")
+    (repo / "README.md").write_text("bench\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "initial")
+    _git(repo, "checkout", "-q", "-b", "feature")
+    (repo / "feature.txt").write_text("change\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "feat: change")
+    return repo
+
+
+def _make_env(root: Path) -> dict[str, str]:
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    stub = bin_dir / "gh"
+    stub.write_text("#!/bin/sh\nexit 1\n")
+    stub.chmod(0o755)
+    env = dict(os.environ)
+    env.update(
+        {
+            "HOME": str(root / "home"),
+            "PR_CREATOR_CACHE_DIR": str(root / "cache"),
+            "PATH": f"{bin_dir}{os.pathsep}{env.get('PATH', '')}",
+        }
+    )
+    env.pop("PR_CREATOR_GITHUB_TRANSPORT", None)
+    (root / "home").mkdir()
+    return env
+
+
+def _run(cmd: list[str], repo: Path, env: dict[str, str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        cmd, cwd=repo, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True
+    )
+
+
+def parse_importtime(stderr: str) -> tuple[int, list[str]]:
+    """Return total import microseconds and the names of imported modules."""
+    total_us = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append(name.strip())
+        # Top-level imports are not indented; their cumulative times add up.
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative_us)
+    return total_us, modules
+
+
+def benchmark_mode(
+    entry: str, mode_args: list[str], repo: Path, env: dict[str, str], runs: int
+) -> dict:
+    cmd = [sys.executable, entry, *mode_args, str(repo)]
+    # One warm-up run so the OS file cache and any bytecode are in place.
+    _run(cmd, repo, env)
+    wall_ms = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        _run(cmd, repo, env)
+        wall_ms.append((time.perf_counter() - started) * 1000)
+
+    traced = _run([sys.executable, "-X", "importtime", *cmd[1:]], repo, env)
+    import_us, modules = parse_importtime(traced.stderr)
+    return {
+        "median_ms": round(statistics.median(wall_ms), 1),
+        "min_ms": round(min(wall_ms), 1),
+        "import_ms": round(import_us / 1000, 1),
+        "modules": len(modules),
+        "imported": modules,
+    }
+
+
+def check_budget(mode: str, result: dict, budget: dict, max_ms: float) -> list[str]:
+    failures = []
+    imported = set(result["imported"])
+    mode_budget = budget.get(mode, {})
+    for module in mode_budget.get("forbidden_imports", []):
+        if module in imported:
+            failures.append(f"{mode}: imports {module}")
+    max_modules = mode_budget.get("max_modules")
+    if max_modules and result["modules"] > max_modules:
+        failures.append(f"{mode}: imports {result['modules']} modules, over {max_modules}")
+    if max_ms and result["median_ms"] > max_ms:
+        failures.append(f"{mode}: median {result['median_ms']}ms exceeds {max_ms}ms")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark engine cold start")
+    parser.add_argument("--bundle", help="Benchmark a bundle built by build_engine.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mode", action="append", choices=sorted(MODES))
+    parser.add_argument("--max-ms", type=float, default=0, help="Fail above this median")
+    args = parser.parse_args()
+
+    entry = os.path.abspath(args.bundle) if args.bundle else str(ASSETS_DIR / "pr_engine.py")
+    with open(BUDGET_FILE, "r", encoding="utf-8") as file_handle:
+        budget = json.load(file_handle)
+
+    results = {}
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        repo = _make_repo(root)
+        env = _make_env(root)
+        for mode in args.mode or list(MODES):
+            result = benchmark_mode(entry, MODES[mode], repo, env, args.runs)
+            failures.extend(check_budget(mode, result, budget, args.max_ms))
+            del result["imported"]
+            results[mode] = result
+
+    sys.stdout.write(
+        json.dumps(
+            {
+                "entry": entry,
+                "python": sys.version.split()[0],
+                "results": results,
+                "failures": failures,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
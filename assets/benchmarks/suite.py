@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Engine benchmark suite on synthetic repositories.
+
+Generates (once per profile, see synthetic.py) a repository with thousands
+of branches, a deep history, a big feature diff and a multi-thousand-line
+CODEOWNERS file, then times:
+
+- every CLI mode in a fresh interpreter, with a `gh` stub on PATH that
+  answers after --gh-latency-ms, cold (empty cache) and warm
+- the hot engine functions in-process (ref snapshot, commit and changed-file
+  collection, CODEOWNERS compilation and matching, the preview git stage)
+
+Results are printed as JSON. --write-baseline stores them in baseline.json
+under the profile name; later runs compare against it and fail when a
+median regresses by more than --tolerance.
+
+    python3 benchmarks/suite.py --profile small
+    python3 benchmarks/suite.py --profile large --write-baseline
+
+Repositories are kept in --workdir (default: a folder in the system temp
+directory) so repeated runs skip generation.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import synthetic
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / "pr-creator-bench"
+
+SOURCE = synthetic.FEATURE_BRANCH
+TARGETS = ["develop", "main", "release/1.0.0", "release/1.0.5"]
+TARGET_ARGS = [arg for target in TARGETS for arg in ("--target", target)]
+
+# name -> (arguments, warm cache)
+CLI_MODES = {
+    "get-data": (["--get-data"], False),
+    "get-data-graphql": (["--get-data", "--graphql"], False),
+    "get-description": (["--get-description", "--source", SOURCE, *TARGET_ARGS], False),
+    "get-preview-cold": (["--get-preview", "--source", SOURCE, *TARGET_ARGS], False),
+    "get-preview-warm": (["--get-preview", "--source", SOURCE, *TARGET_ARGS], True),
+    "headless": (
+        ["--headless", "--source", SOURCE, *TARGET_ARGS, "--title", "Bench"],
+        False,
+    ),
+}
+
+# Ignore regressions smaller than this; sub-millisecond timings are noise.
+MIN_REGRESSION_MS = 5.0
+
+
+def prepare_repo(workdir: Path, name: str) -> Path:
+    """Return the repository for a profile, generating it when missing or outdated."""
+    profile = synthetic.PROFILES[name]
+    root = workdir / name
+    marker = root / "profile.json"
+    if marker.exists() and json.loads(marker.read_text()) == profile:
+        return root / "repo"
+    repo = synthetic.build_repo(root, profile)
+    marker.write_text(json.dumps(profile))
+    return repo
+
+
+def make_env(root: Path, latency_ms: float) -> dict[str, str]:
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    stub = bin_dir / "gh"
+    stub.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{BENCH_DIR / "gh_stub.py"}" "$@"\n')
+    stub.chmod(0o755)
+    (root / "home").mkdir()
+    env = dict(os.environ)
+    env.update(
+        {
+            "HOME": str(root / "home"),
+            "PR_CREATOR_CACHE_DIR": str(root / "cache"),
+            "GH_STUB_LATENCY_MS": str(latency_ms),
+            "PATH": f"{bin_dir}{os.pathsep}{env.get('PATH', '')}",
+        }
+    )
+    env.pop("PR_CREATOR_GITHUB_TRANSPORT", None)
+    return env
+
+
+def _summary(samples_ms: list[float]) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples_ms), 1),
+        "min_ms": round(min(samples_ms), 1),
+    }
+
+
+def benchmark_cli(entry: str, repo: Path, env: dict[str, str], runs: int) -> dict:
+    results = {}
+    root = Path(env["HOME"]).parent
+    for name, (mode_args, warm) in CLI_MODES.items():
+        cmd = [sys.executable, entry, *mode_args, str(repo)]
+        cache_dirs = [root / f"cache-{name}"] * runs if warm else [
+            root / f"cache-{name}-{run}" for run in range(runs)
+        ]
+        if warm:
+            subprocess.run(
+                cmd, cwd=repo, env={**env, "PR_CREATOR_CACHE_DIR": str(cache_dirs[0])},
+                stdin=subprocess.DEVNULL, capture_output=True,
+            )
+
+        samples = []
+        for cache_dir in cache_dirs:
+            started = time.perf_counter()
+            completed = subprocess.run(
+                cmd, cwd=repo, env={**env, "PR_CREATOR_CACHE_DIR": str(cache_dir)},
+                stdin=subprocess.DEVNULL, capture_output=True, text=True,
+            )
+            samples.append((time.perf_counter() - started) * 1000)
+            if completed.returncode != 0:
+                raise RuntimeError(f"{name} failed: {completed.stderr.strip()[-500:]}")
+        results[name] = _summary(samples)
+    return results
+
+
+def _time(func: Callable[[], object], runs: int, setup: Optional[Callable[[], None]] = None) -> dict:
+    samples = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return _summary(samples)
+
+
+def benchmark_functions(repo: Path, root: Path, runs: int) -> dict:
+    """Time the engine's hot paths in this process, each against a cold cache."""
+    os.environ["HOME"] = str(root / "home")
+    sys.path.insert(0, str(ASSETS_DIR))
+    os.chdir(repo)
+
+    from pr_creator import codeowners, git, preview
+    from pr_creator.cache import CACHE_DIR_ENV
+    from pr_creator.executor import get_executor
+
+    def cold() -> None:
+        os.environ[CACHE_DIR_ENV] = tempfile.mkdtemp(dir=root, prefix="fn-cache-")
+        get_executor().reset()
+        git.close_cat_files()
+        git.invalidate_ref_snapshot()
+        codeowners._matchers_by_blob.clear()
+        preview._stages.clear()
+
+    cold()
+    content = codeowners.get_codeowners_content() or ""
+    changed = git.get_changed_files_for_targets(TARGETS, SOURCE)
+    matcher = codeowners.compile_codeowners(content)
+    assert matcher is not None
+
+    return {
+        "ref_snapshot": _time(git.get_ref_snapshot, runs, cold),
+        "remote_branches": _time(git.get_remote_branches, runs, cold),
+        "commits_for_targets": _time(
+            lambda: git.get_commits_for_targets(TARGETS, SOURCE), runs, cold
+        ),
+        "changed_files_for_targets": _time(
+            lambda: git.get_changed_files_for_targets(TARGETS, SOURCE), runs, cold
+        ),
+        "codeowners_compile": _time(lambda: codeowners.compile_codeowners(content), runs),
+        "codeowners_match": _time(lambda: [matcher.owners_for(path) for path in changed], runs),
+        "preview_git_stage": _time(lambda: preview.get_git_stage(SOURCE, TARGETS), runs, cold),
+    }
+
+
+def compare(results: dict, baseline: Optional[dict], latency_ms: float, tolerance: float) -> list[str]:
+    if not baseline:
+        return []
+    if baseline.get("gh_latency_ms") != latency_ms:
+        return [f"baseline was recorded with gh latency {baseline.get('gh_latency_ms')}ms"]
+
+    failures = []
+    for group, timings in results.items():
+        for name, timing in timings.items():
+            previous = baseline.get("results", {}).get(group, {}).get(name)
+            if not previous:
+                continue
+            limit = previous["median_ms"] * (1 + tolerance)
+            current = timing["median_ms"]
+            if current > limit and current - previous["median_ms"] > MIN_REGRESSION_MS:
+                failures.append(
+                    f"{group}/{name}: median {current}ms vs baseline {previous['median_ms']}ms"
+                )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the engine on synthetic repositories")
+    parser.add_argument("--profile", choices=sorted(synthetic.PROFILES), default="small")
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    parser.add_argument("--bundle", help="Run CLI modes from a bundle built by build_engine.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--gh-latency-ms", type=float, default=150)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median regression")
+    parser.add_argument("--write-baseline", action="store_true")
+    args = parser.parse_args()
+
+    entry = os.path.abspath(args.bundle) if args.bundle else str(ASSETS_DIR / "pr_engine.py")
+    started = time.perf_counter()
+    repo = prepare_repo(args.workdir, args.profile)
+    setup_s = round(time.perf_counter() - started, 1)
+
+    baselines = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    root = Path(tempfile.mkdtemp(prefix="run-", dir=args.workdir))
+    try:
+        env = make_env(root, args.gh_latency_ms)
+        results = {
+            "cli": benchmark_cli(entry, repo, env, args.runs),
+            "functions": benchmark_functions(repo, root, args.runs),
+        }
+    finally:
+        os.chdir(BENCH_DIR)
+        shutil.rmtree(root, ignore_errors=True)
+
+    failures = [] if args.write_baseline else compare(
+        results, baselines.get(args.profile), args.gh_latency_ms, args.tolerance
+    )
+    if args.write_baseline:
+        baselines[args.profile] = {
+            "profile": synthetic.PROFILES[args.profile],
+            "gh_latency_ms": args.gh_latency_ms,
+            "python": sys.version.split()[0],
+            "results": results,
+        }
+        BASELINE_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+
+    sys.stdout.write(
+        json.dumps(
+            {
+                "profile": args.profile,
+                "entry": entry,
+                "python": sys.version.split()[0],
+                "setup_s": setup_s,
+                "gh_latency_ms": args.gh_latency_ms,
+                "results": results,
+                "failures": failures,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Synthetic repositories for the benchmark suite.
+
+A repository is generated with a single `git fast-import` stream:
+
+- an initial commit with `files` files spread over src/mod*/ plus a
+  CODEOWNERS file of `codeowners` rules
+- `depth` linear commits on main, each touching one file
+- a feature branch forking `depth // 10` commits back, changing
+  `changed` files over a handful of commits
+- `branches` release/staging/hotfix branches pointing along main
+
+It is then cloned to a bare "origin" so the engine sees real
+remote-tracking refs (half of them packed) and fetches stay local.
+"""
+import random
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Iterator
+
+PROFILES = {
+    "small": {"branches": 200, "depth": 500, "files": 2000, "changed": 200, "codeowners": 300},
+    "large": {
+        "branches": 5000,
+        "depth": 20000,
+        "files": 20000,
+        "changed": 5000,
+        "codeowners": 4000,
+    },
+}
+
+FEATURE_BRANCH = "feature/BENCH-1-big-change"
+MODULES = 500
+TEAMS = 60
+
+
+def file_path(index: int) -> str:
+    return f"src/mod{index % MODULES}/pkg{index % 7}/file{index}.py"
+
+
+def codeowners_content(rules: int, seed: int = 1) -> str:
+    """A CODEOWNERS file mixing every pattern shape the matcher indexes."""
+    rng = random.Random(seed)
+    lines = ["# Synthetic CODEOWNERS", "* @org/platform"]
+    for index in range(rules):
+        team = f"@org/team{index % TEAMS}"
+        module = rng.randrange(MODULES)
+        shape = index % 8
+        if shape == 0:
+            lines.append(f"/src/mod{module}/ {team}")
+        elif shape == 1:
+            lines.append(f"/src/mod{module}/pkg{rng.randrange(7)}/*.py {team}")
+        elif shape == 2:
+            lines.append(f"*.ext{index} {team}")
+        elif shape == 3:
+            lines.append(f"pkg{rng.randrange(7)}/ {team}")
+        elif shape == 4:
+            lines.append(f"/src/**/file{rng.randrange(100000)}.py {team} @user{index % 200}")
+        elif shape == 5:
+            lines.append(f"file{rng.randrange(100000)}.py {team}")
+        elif shape == 6:
+            lines.append(f"/docs/section{index}/**/*.md {team}")
+        else:
+            lines.append(f"src/mod{module}/pkg?/file{rng.randrange(100000)}* {team}")
+    return "\n".join(lines) + "\n"
+
+
+def _data(content: str) -> bytes:
+    raw = content.encode("utf-8")
+    return b"data %d\n" % len(raw) + raw + b"\n"
+
+
+def _commit(ref: str, mark: int, parent: int, message: str, timestamp: int) -> bytes:
+    header = (
+        f"commit {ref}\nmark :{mark}\n"
+        f"committer Bench <bench@example.com> {timestamp} +0000\n"
+    ).encode()
+    body = header + _data(message)
+    if parent:
+        body += f"from :{parent}\n".encode()
+    return body
+
+
+def _stream(profile: dict) -> Iterator[bytes]:
+    rng = random.Random(42)
+    timestamp = 1_600_000_000
+    mark = 1
+
+    yield _commit("refs/heads/main", mark, 0, "chore: initial import", timestamp)
+    yield b"M 100644 inline .github/CODEOWNERS\n" + _data(codeowners_content(profile["codeowners"]))
+    for index in range(profile["files"]):
+        yield f"M 100644 inline {file_path(index)}\n".encode() + _data(f"# file {index}\n")
+
+    main_marks = [mark]
+    for step in range(profile["depth"]):
+        mark += 1
+        timestamp += 60
+        index = rng.randrange(profile["files"])
+        yield _commit("refs/heads/main", mark, main_marks[-1], f"feat: change {step}", timestamp)
+        yield f"M 100644 inline {file_path(index)}\n".encode() + _data(f"# file {index} v{step}\n")
+        main_marks.append(mark)
+
+    fork = main_marks[-max(1, profile["depth"] // 10)]
+    parent = fork
+    per_commit = max(1, profile["changed"] // 20)
+    for start in range(0, profile["changed"], per_commit):
+        mark += 1
+        timestamp += 60
+        yield _commit(
+            f"refs/heads/{FEATURE_BRANCH}", mark, parent, f"feat: big change {start}", timestamp
+        )
+        for index in range(start, min(start + per_commit, profile["changed"])):
+            path = file_path(index * 3 % profile["files"])
+            yield f"M 100644 inline {path}\n".encode() + _data(f"# changed {index}\n")
+        parent = mark
+
+    kinds = ["release/{v}", "release/{v}-staging", "release/{v}-alpha", "release/{v}-beta", "hotfix/{v}"]
+    for index in range(profile["branches"]):
+        version = f"{index // 400 + 1}.{index // 20 % 20}.{index % 20}"
+        name = kinds[index % len(kinds)].format(v=version)
+        target = main_marks[rng.randrange(len(main_marks))]
+        yield f"reset refs/heads/{name}\nfrom :{target}\n\n".encode()
+    yield b"reset refs/heads/develop\nfrom :%d\n\n" % main_marks[-1]
+
+
+def _git(cwd: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def build_repo(root: Path, profile: dict) -> Path:
+    """Create origin.git and a clone of it under root; return the clone."""
+    if root.exists():
+        shutil.rmtree(root)
+    source = root / "source"
+    source.mkdir(parents=True)
+    _git(source, "init", "-q", "-b", "main")
+
+    importer = subprocess.Popen(
+        ["git", "fast-import", "--quiet"], cwd=source, stdin=subprocess.PIPE
+    )
+    assert importer.stdin is not None
+    for chunk in _stream(profile):
+        importer.stdin.write(chunk)
+    importer.stdin.close()
+    if importer.wait() != 0:
+        raise RuntimeError("git fast-import failed")
+
+    origin = root / "origin.git"
+    _git(root, "clone", "-q", "--bare", str(source), str(origin))
+    shutil.rmtree(source)
+
+    repo = root / "repo"
+    _git(root, "clone", "-q", str(origin), str(repo))
+    _git(repo, "checkout", "-q", FEATURE_BRANCH)
+    _git(repo, "config", "user.email", "bench@example.com")
+    _git(repo, "config", "user.name", "Bench")
+    # Real clones mix packed and loose refs; keep both code paths honest.
+    _git(repo, "pack-refs", "--all")
+    _git(repo, "fetch", "-q", "origin")
+    return repo
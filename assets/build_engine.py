@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Build the precompiled engine bundle.
+
+Packs pr_engine.py and the pr_creator package into venv/pr_engine.pyz, a
+zipapp that carries bytecode compiled by the interpreter running this
+script, so the engine never compiles or writes __pycache__ at startup.
+Run it with the venv interpreter after changing the engine:
+
+    venv/bin/python3 build_engine.py
+
+The sources are stored next to the bytecode; if the bundle is ever run by
+a Python with a different bytecode format, they are compiled in memory
+instead. The extension ignores a bundle older than the sources.
+"""
+import argparse
+import os
+import py_compile
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+ASSETS_DIR = Path(__file__).resolve().parent
+PACKAGE = "pr_creator"
+DEFAULT_OUTPUT = ASSETS_DIR / "venv" / "pr_engine.pyz"
+
+
+def _sources() -> list[tuple[Path, str]]:
+    """Return (source file, archive name without extension) pairs."""
+    entries = [(ASSETS_DIR / "pr_engine.py", "__main__")]
+    for path in sorted((ASSETS_DIR / PACKAGE).glob("*.py")):
+        entries.append((path, f"{PACKAGE}/{path.stem}"))
+    return entries
+
+
+def _compile(source: Path, archive_name: str, workdir: str) -> bytes:
+    target = os.path.join(workdir, archive_name.replace("/", "_") + ".pyc")
+    # Unchecked hash-based pycs: zipimport loads them without comparing
+    # timestamps against the bundled sources.
+    py_compile.compile(
+        str(source),
+        cfile=target,
+        dfile=f"{archive_name}.py",
+        doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+    with open(target, "rb") as file_handle:
+        return file_handle.read()
+
+
+def build_bundle(output: Path = DEFAULT_OUTPUT) -> Path:
+    """Write the bundle atomically and return its path."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=output.parent, prefix=".tmp-", suffix=".pyz")
+    try:
+        with os.fdopen(fd, "wb") as file_handle, tempfile.TemporaryDirectory() as workdir:
+            file_handle.write(b"#!/usr/bin/env python3\n")
+            with zipfile.ZipFile(file_handle, "w", zipfile.ZIP_STORED) as archive:
+                for source, archive_name in _sources():
+                    archive.write(source, f"{archive_name}.py")
+                    archive.writestr(
+                        f"{archive_name}.pyc", _compile(source, archive_name, workdir)
+                    )
+        os.chmod(tmp_path, 0o755)
+        os.replace(tmp_path, output)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the precompiled engine bundle")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+    path = build_bundle(args.output)
+    print(f"Wrote {path} for Python {sys.version_info.major}.{sys.version_info.minor}")
+
+
+if __name__ == "__main__":
+    main()
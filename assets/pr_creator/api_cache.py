@@ -0,0 +1,122 @@
+"""
+Conditional-request cache for read-only GitHub REST calls.
+
+Responses are stored with their ETag / Last-Modified validators. Within the
+configured TTL a cached body is served without touching the network; after
+that it is revalidated with If-None-Match / If-Modified-Since, which costs a
+304 (and no rate limit) when nothing changed. Paginated endpoints are
+walked one page at a time through the Link header, each page cached on its
+own.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Iterator, Optional
+
+from .cache import read_cache, write_cache
+from .config import load_config
+from .transport import ApiResponse, TransportError, get_transport
+
+CACHE_NAMESPACE = "api"
+DEFAULT_TTL_SECONDS = 300
+
+_NEXT_LINK = re.compile(r'<([^>]+)>;\s*rel="next"')
+_API_ROOT = re.compile(r"^https?://[^/]+/(?:api/v3/)?")
+
+
+def _cache_key(path: str) -> str:
+    # Transports fill :owner/:repo from the current repository, so include it.
+    scope = os.getcwd() if ":owner" in path or ":repo" in path else ""
+    return hashlib.sha256(f"{scope}|{path}".encode()).hexdigest()
+
+
+def _request(path: str, headers: dict[str, str]) -> Optional[ApiResponse]:
+    try:
+        return get_transport().request("GET", path, headers)
+    except TransportError as exc:
+        logging.warning(f"GitHub API request failed for {path}: {exc}")
+        return None
+
+
+def get_ttl_seconds() -> int:
+    ttl = load_config().get("api_cache_ttl_seconds", DEFAULT_TTL_SECONDS)
+    return ttl if isinstance(ttl, int) and ttl >= 0 else DEFAULT_TTL_SECONDS
+
+
+def cached_api_get(path: str, ttl: Optional[int] = None) -> Optional[dict]:
+    """
+    GET a REST path through the cache.
+    Returns the cache entry ({"body", "next", ...}) or None when the request
+    failed and nothing usable is cached.
+    """
+    ttl = get_ttl_seconds() if ttl is None else ttl
+    key = _cache_key(path)
+    entry = read_cache(CACHE_NAMESPACE, key)
+    if not isinstance(entry, dict) or "body" not in entry:
+        entry = None
+
+    now = time.time()
+    if entry and now - entry.get("fetched_at", 0) < ttl:
+        return entry
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = _request(path, headers)
+    if response is None:
+        return entry
+
+    status, response_headers, body = response.status, response.headers, response.body
+    if status == 304 and entry:
+        entry["fetched_at"] = now
+        write_cache(CACHE_NAMESPACE, key, entry)
+        return entry
+
+    if status != 200:
+        logging.warning(f"GitHub API returned {status} for {path}; serving cached data")
+        return entry
+
+    try:
+        parsed = json.loads(body)
+    except ValueError as exc:
+        logging.warning(f"Invalid JSON from GitHub API for {path}: {exc}")
+        return entry
+
+    next_match = _NEXT_LINK.search(response_headers.get("link", ""))
+    entry = {
+        "body": parsed,
+        "etag": response_headers.get("etag"),
+        "last_modified": response_headers.get("last-modified"),
+        "next": _to_api_path(next_match.group(1)) if next_match else None,
+        "fetched_at": now,
+    }
+    write_cache(CACHE_NAMESPACE, key, entry)
+    return entry
+
+
+def _to_api_path(url: str) -> str:
+    """
+    Transports take paths relative to the API root, so strip the scheme, the
+    host and GitHub Enterprise's /api/v3 base from Link URLs; both transports
+    add the base back themselves.
+    """
+    return _API_ROOT.sub("", url)
+
+
+def iter_api_pages(path: str, ttl: Optional[int] = None) -> Iterator[Any]:
+    """Yield the body of each page of a paginated endpoint, fetching lazily."""
+    next_path: Optional[str] = path
+    seen = set()
+    while next_path and next_path not in seen:
+        seen.add(next_path)
+        entry = cached_api_get(next_path, ttl)
+        if entry is None:
+            return
+        yield entry["body"]
+        next_path = entry.get("next")
@@ -0,0 +1,68 @@
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+CACHE_DIR_ENV = "PR_CREATOR_CACHE_DIR"
+
+
+def get_cache_dir(namespace: str) -> Path:
+    """
+    Return the cache directory for a namespace.
+    Defaults to $XDG_CACHE_HOME/pr_creator (~/.cache/pr_creator) and can be
+    overridden with PR_CREATOR_CACHE_DIR.
+    """
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        root = Path(override)
+    else:
+        xdg_cache = os.environ.get("XDG_CACHE_HOME")
+        root = (Path(xdg_cache) if xdg_cache else Path.home() / ".cache") / "pr_creator"
+    return root / namespace
+
+
+def _entry_path(namespace: str, key: str) -> Path:
+    safe_key = "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
+    return get_cache_dir(namespace) / f"{safe_key}.json"
+
+
+def read_cache(namespace: str, key: str) -> Optional[Any]:
+    """Read a cached JSON value, or None on a miss or unreadable entry."""
+    path = _entry_path(namespace, key)
+    try:
+        with open(path, "r", encoding="utf-8") as file_handle:
+            return json.load(file_handle)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logging.debug(f"Ignoring unreadable cache entry {path}: {exc}")
+        return None
+
+
+def write_cache(namespace: str, key: str, value: Any) -> None:
+    """Atomically write a JSON value to the cache. Failures are non-fatal."""
+    path = _entry_path(namespace, key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file_handle:
+                json.dump(value, file_handle)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as exc:
+        logging.debug(f"Failed to write cache entry {path}: {exc}")
+
+
+def delete_cache(namespace: str, key: str) -> None:
+    """Remove a cache entry if it exists."""
+    try:
+        _entry_path(namespace, key).unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logging.debug(f"Failed to delete cache entry {namespace}/{key}: {exc}")
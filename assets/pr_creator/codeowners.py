@@ -1,28 +1,56 @@
-import fnmatch
+import collections
+import functools
 import logging
 import os
 import re
-from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Pattern
+
+from .cache import read_cache, write_cache
+from .git import get_blob_shas, read_blob, resolve_base_ref
+
+CODEOWNERS_LOCATIONS = [".github/CODEOWNERS", "CODEOWNERS", "docs/CODEOWNERS"]
+# Bump when parsing changes so stale cache entries are ignored.
+CACHE_VERSION = 1
+
+# Compiled regexes are shared across matchers and only built on first use,
+# so a matcher restored from cache costs nothing until a rule is consulted.
+_regex = functools.lru_cache(maxsize=None)(re.compile)
+
+# Matchers already built in this process, keyed by CODEOWNERS blob SHA, least
+# recently used first. The --serve daemon sees many repos and revisions, so
+# only the last few are kept; older ones come back from the on-disk cache.
+MAX_MATCHERS = 8
+_matchers_by_blob: "collections.OrderedDict[str, Optional[CodeownersMatcher]]" = (
+    collections.OrderedDict()
+)
+
 
 def parse_codeowners(content: str) -> List[tuple[str, List[str]]]:
-    """Parse CODEOWNERS content into a list of (pattern, owners) tuples."""
+    """
+    Parse CODEOWNERS content into a list of (pattern, owners) tuples.
+    A pattern without owners is kept: it marks the matching paths as unowned.
+    """
     rules = []
     for line in content.splitlines():
         line = line.strip()
         if not line or line.startswith('#'):
             continue
         parts = line.split()
-        if len(parts) >= 2:
-            pattern = parts[0]
-            owners = parts[1:]
-            rules.append((pattern, owners))
+        pattern = parts[0]
+        if pattern.startswith('\\#'):
+            pattern = pattern[1:]
+        owners = []
+        for owner in parts[1:]:
+            if owner.startswith('#'):
+                break
+            owners.append(owner)
+        rules.append((pattern, owners))
     return rules
 
+
 def get_codeowners_content() -> Optional[str]:
     """Check common locations for a CODEOWNERS file and read it."""
-    locations = [".github/CODEOWNERS", "CODEOWNERS", "docs/CODEOWNERS"]
-    for p in locations:
+    for p in CODEOWNERS_LOCATIONS:
         if os.path.isfile(p):
             try:
                 with open(p, "r") as f:
@@ -31,72 +59,334 @@ def get_codeowners_content() -> Optional[str]:
                 logging.warning(f"Failed to read CODEOWNERS file at {p}: {e}")
     return None
 
+
+def _is_literal(pattern: str) -> bool:
+    return '*' not in pattern and '?' not in pattern
+
+
+def _translate_segment(segment: str) -> str:
+    parts = []
+    for char in segment:
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        else:
+            parts.append(re.escape(char))
+    return ''.join(parts)
+
+
+def pattern_to_regex(pattern: str) -> Optional[str]:
+    """
+    Translate a CODEOWNERS pattern into a regex source matched against the
+    full repo-relative path, following GitHub's gitignore-style rules:
+
+    - a pattern containing a slash (other than a trailing one) is anchored
+      to the repository root, otherwise it matches at any depth
+    - a trailing slash only matches directories, i.e. paths beneath them
+    - a pattern that names a directory also owns everything inside it,
+      except when its last segment is a bare ``*`` (``docs/*``)
+    - ``**/`` matches zero or more directories, a trailing ``/**`` matches
+      everything inside
+    """
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    if not pattern:
+        return None
+
+    segments = pattern.split('/')
+    regex = '' if anchored else '(?:.*/)?'
+    for index, segment in enumerate(segments):
+        is_last = index == len(segments) - 1
+        if segment == '**':
+            regex += '.+' if is_last else '(?:.*/)?'
+        else:
+            regex += _translate_segment(segment) + ('' if is_last else '/')
+
+    if dir_only:
+        return regex + '/.+'
+    if segments[-1] in ('*', '**'):
+        return regex
+    return regex + '(?:/.+)?'
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_pattern(pattern: str) -> Optional[Pattern[str]]:
+    source = pattern_to_regex(pattern)
+    return _regex(source) if source is not None else None
+
+
 def match_pattern(path: str, pattern: str) -> bool:
-    """Basic matching for CODEOWNERS patterns."""
-    # Clean pattern
-    orig_pattern = pattern
-    
-    # If it starts with '/', it matches from the root
-    root_match = False
-    if pattern.startswith('/'):
-        root_match = True
-        pattern = pattern[1:]
-        
-    # If it ends with '/', it's a directory match
-    is_dir = False
-    if pattern.endswith('/'):
-        is_dir = True
-        pattern = pattern[:-1]
-
-    # Convert CODEOWNERS rules to fnmatch globs
-    if not root_match:
-        # If it doesn't start with /, it can match anywhere
-        if not pattern.startswith('*'):
-            pattern = f"*{pattern}"
-    
-    if is_dir:
-        # Directory match means it matches the directory or anything inside it
-        return fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(path, f"{pattern}/*")
-    
-    # Standard file/glob match
-    return fnmatch.fnmatch(path, pattern)
-
-def get_owners_for_files(changed_files: List[str], valid_reviewers: List[str]) -> List[str]:
+    """Check whether a single CODEOWNERS pattern matches a path."""
+    compiled = _compile_pattern(pattern)
+    return compiled is not None and compiled.fullmatch(path) is not None
+
+
+class _TrieNode:
+    __slots__ = ("children", "rules", "globs")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.rules: List[tuple[int, bool]] = []
+        self.globs: List[tuple[int, str]] = []
+
+
+def _combine(sources: List[tuple[int, str]]) -> Optional[str]:
+    """Fold rule regexes into one alternation tried from the last rule backwards."""
+    if not sources:
+        return None
+    alternatives = [f"(?P<r{index}>{source})" for index, source in reversed(sources)]
+    return '|'.join(alternatives)
+
+
+def _first_hit(source: Optional[str], text: str) -> int:
+    if source is None:
+        return -1
+    match = _regex(source).fullmatch(text)
+    if match is None or not match.lastgroup:
+        return -1
+    return int(match.lastgroup[1:])
+
+
+class CodeownersMatcher:
     """
-    Get the CODEOWNERS for a list of changed files, filtering by valid_reviewers map.
-    The rules are evaluated top-to-bottom, with the last matching rule taking precedence.
+    CODEOWNERS rules compiled into an indexed structure.
+
+    Anchored patterns are stored in a path-component trie under their
+    literal directory prefix (``/src/app/`` or ``/src/**/*.py``), so a
+    lookup only considers rules on the path being matched. Unanchored
+    patterns never contain a slash and are matched per path component:
+    literal names and ``*<suffix>`` globs (``*.md``) through dicts, other
+    globs through one alternation ordered from the last rule to the first,
+    so the first alternative that matches is the rule that wins. The few anchored globs without a literal prefix
+    share a whole-path alternation built the same way. A lookup takes the
+    highest rule index across all of them.
     """
+
+    def __init__(self, rules: List[tuple[str, List[str]]]) -> None:
+        self.rules = rules
+        self._trie = _TrieNode()
+        self._names: Dict[str, List[tuple[int, bool]]] = {}
+        self._suffixes: Dict[str, List[tuple[int, bool]]] = {}
+
+        component_sources: List[tuple[int, str]] = []
+        dir_component_sources: List[tuple[int, str]] = []
+        path_sources: List[tuple[int, str]] = []
+
+        for index, (pattern, _owners) in enumerate(rules):
+            dir_only = pattern.endswith('/')
+            stripped = pattern.rstrip('/')
+            if not stripped.lstrip('/'):
+                continue
+
+            if '/' not in stripped:
+                if _is_literal(stripped):
+                    self._names.setdefault(stripped, []).append((index, dir_only))
+                elif stripped.startswith('*') and _is_literal(stripped[1:]) and stripped[1:]:
+                    self._suffixes.setdefault(stripped[1:], []).append((index, dir_only))
+                elif dir_only:
+                    dir_component_sources.append((index, _translate_segment(stripped)))
+                else:
+                    component_sources.append((index, _translate_segment(stripped)))
+                continue
+
+            segments = stripped.lstrip('/').split('/')
+            if _is_literal(stripped):
+                self._trie_node(segments).rules.append((index, dir_only))
+                continue
+
+            prefix: List[str] = []
+            for segment in segments[:-1]:
+                if not _is_literal(segment):
+                    break
+                prefix.append(segment)
+
+            source = pattern_to_regex(pattern)
+            if source is None:
+                continue
+            if prefix:
+                self._trie_node(prefix).globs.append((index, source))
+            else:
+                path_sources.append((index, source))
+
+        self._component_regex = _combine(component_sources)
+        self._dir_component_regex = _combine(dir_component_sources)
+        self._path_regex = _combine(path_sources)
+        self._max_component_index = component_sources[-1][0] if component_sources else -1
+        self._max_dir_component_index = (
+            dir_component_sources[-1][0] if dir_component_sources else -1
+        )
+        self._max_path_index = path_sources[-1][0] if path_sources else -1
+        self._suffix_lengths = sorted({len(suffix) for suffix in self._suffixes})
+
+    def _trie_node(self, components: List[str]) -> _TrieNode:
+        node = self._trie
+        for component in components:
+            node = node.children.setdefault(component, _TrieNode())
+        return node
+
+    def match_index(self, path: str) -> int:
+        """Return the index of the winning rule for ``path``, or -1."""
+        components = path.split('/')
+        last = len(components) - 1
+        best = -1
+
+        candidates: List[tuple[int, str]] = []
+        node: Optional[_TrieNode] = self._trie
+        for position, component in enumerate(components):
+            node = node.children.get(component)
+            if node is None:
+                break
+            for index, dir_only in node.rules:
+                if index > best and (not dir_only or position < last):
+                    best = index
+            candidates.extend(node.globs)
+
+        for index, source in sorted(candidates, key=lambda item: item[0], reverse=True):
+            if index <= best:
+                break
+            if _regex(source).fullmatch(path):
+                best = index
+                break
+
+        for position, component in enumerate(components):
+            for index, dir_only in self._names.get(component, ()):
+                if index > best and (not dir_only or position < last):
+                    best = index
+            for length in self._suffix_lengths:
+                if length > len(component):
+                    break
+                for index, dir_only in self._suffixes.get(component[-length:], ()):
+                    if index > best and (not dir_only or position < last):
+                        best = index
+            if self._max_component_index > best:
+                best = max(best, _first_hit(self._component_regex, component))
+            if position < last and self._max_dir_component_index > best:
+                best = max(best, _first_hit(self._dir_component_regex, component))
+
+        if self._max_path_index > best:
+            best = max(best, _first_hit(self._path_regex, path))
+
+        return best
+
+    def owners_for(self, path: str) -> List[str]:
+        """Return the owners of the last rule matching ``path``."""
+        index = self.match_index(path)
+        return self.rules[index][1] if index >= 0 else []
+
+
+def compile_codeowners(content: str) -> Optional[CodeownersMatcher]:
+    """Parse and compile CODEOWNERS content, or None when it has no rules."""
+    rules = parse_codeowners(content)
+    return CodeownersMatcher(rules) if rules else None
+
+
+def _matcher_for_blob(sha: str) -> Optional[CodeownersMatcher]:
+    """Build the matcher for a CODEOWNERS blob, using the on-disk rule cache."""
+    if sha in _matchers_by_blob:
+        _matchers_by_blob.move_to_end(sha)
+        return _matchers_by_blob[sha]
+
+    cache_key = f"v{CACHE_VERSION}-{sha}"
+    cached = read_cache("codeowners", cache_key)
+    if isinstance(cached, dict) and isinstance(cached.get("rules"), list):
+        rules = [(pattern, owners) for pattern, owners in cached["rules"]]
+    else:
+        content = read_blob(sha)
+        if content is None:
+            return None
+        rules = parse_codeowners(content)
+        write_cache("codeowners", cache_key, {"rules": rules})
+
+    matcher = CodeownersMatcher(rules) if rules else None
+    _matchers_by_blob[sha] = matcher
+    if len(_matchers_by_blob) > MAX_MATCHERS:
+        _matchers_by_blob.popitem(last=False)
+    return matcher
+
+
+def get_codeowners_blob_sha(commit_sha: str) -> Optional[str]:
+    """
+    Return the SHA of the CODEOWNERS blob GitHub would use at a commit, or
+    None when there is none. Cached on disk, since a commit never changes.
+    """
+    cache_key = f"commit-{commit_sha}"
+    cached = read_cache("codeowners", cache_key)
+    if isinstance(cached, dict) and "blob" in cached:
+        return cached["blob"]
+
+    shas = get_blob_shas(commit_sha, CODEOWNERS_LOCATIONS)
+    if shas is None:
+        return None
+    blob = next((shas[location] for location in CODEOWNERS_LOCATIONS if location in shas), None)
+    write_cache("codeowners", cache_key, {"blob": blob})
+    return blob
+
+
+def get_codeowners_matcher(ref: Optional[str] = None) -> Optional[CodeownersMatcher]:
+    """
+    Return the compiled CODEOWNERS rules that apply to a base branch.
+    The file is read at origin/<ref> (or the local <ref>) so ownership follows
+    the branch the PR targets; the working tree is used when neither exists.
+    """
+    base_sha = resolve_base_ref(ref) if ref else None
+    if base_sha:
+        blob = get_codeowners_blob_sha(base_sha)
+        return _matcher_for_blob(blob) if blob else None
+
     content = get_codeowners_content()
     if not content:
+        return None
+    return compile_codeowners(content)
+
+
+def get_all_owners(changed_files: List[str], ref: Optional[str] = None) -> List[str]:
+    """
+    Get every CODEOWNERS owner (without the leading @) of a list of changed
+    files, sorted. The last matching rule takes precedence for each file.
+    When ref is given, the CODEOWNERS file of that base branch is used.
+    """
+    matcher = get_codeowners_matcher(ref)
+    if matcher is None:
         return []
-        
-    rules = parse_codeowners(content)
-    if not rules:
-        return []
 
-    matched_owners_set = set()
-    
+    owners = set()
+    for file_path in set(changed_files):
+        if not file_path: continue
+        for owner in matcher.owners_for(file_path):
+            # Strip leading @ from GitHub handles
+            owners.add(owner.lstrip('@'))
+    return sorted(owners)
+
+
+def filter_owners(owners: List[str], valid_reviewers: List[str]) -> List[str]:
+    """
+    Keep the owners that appear in valid_reviewers, using its spelling.
+    An empty valid_reviewers list keeps every owner.
+    """
+    if not valid_reviewers:
+        return list(owners)
+
     # We want to match case-insensitively for simplicity when comparing to valid_reviewers
     valid_reviewers_lower = {r.lower(): r for r in valid_reviewers}
+    matched = {
+        valid_reviewers_lower[owner.lower()]
+        for owner in owners
+        if owner.lower() in valid_reviewers_lower
+    }
+    return sorted(matched)
 
-    for file_path in changed_files:
-        if not file_path: continue
-        
-        file_owners = []
-        # Last matching rule takes precedence
-        for pattern, owners in rules:
-            if match_pattern(file_path, pattern):
-                file_owners = owners
-                
-        # Add to the set
-        for owner in file_owners:
-            # Strip leading @ from GitHub handles
-            clean_owner = owner.lstrip('@')
-            
-            # Filter against personalized config if applicable
-            if not valid_reviewers:
-                matched_owners_set.add(clean_owner)
-            elif clean_owner.lower() in valid_reviewers_lower:
-                matched_owners_set.add(valid_reviewers_lower[clean_owner.lower()])
-
-    return list(matched_owners_set)
+
+def get_owners_for_files(
+    changed_files: List[str],
+    valid_reviewers: List[str],
+    ref: Optional[str] = None,
+) -> List[str]:
+    """
+    Get the CODEOWNERS for a list of changed files, filtering by valid_reviewers map.
+    The rules are evaluated top-to-bottom, with the last matching rule taking precedence.
+    When ref is given, the CODEOWNERS file of that base branch is used.
+    """
+    return filter_owners(get_all_owners(changed_files, ref), valid_reviewers)
@@ -1,8 +1,10 @@
-import json
+import copy
 import logging
 from pathlib import Path
 from typing import Any, Dict
 
+from .config_store import ConfigStore, get_store
+
 CONFIG_FILENAME = ".pr_creator_config.json"
 
 
@@ -59,16 +61,35 @@ def _merge_config(base: Dict[str, Any], user_config: object) -> Dict[str, Any]:
     merged["personalized_reviewers"] = _normalize_string_list(
         user_config.get("personalized_reviewers")
     )
+    github_transport = user_config.get("github_transport")
+    merged["github_transport"] = (
+        github_transport
+        if github_transport in ("gh", "http")
+        else base["github_transport"]
+    )
+    github_api_url = user_config.get("github_api_url")
+    merged["github_api_url"] = (
+        github_api_url
+        if isinstance(github_api_url, str) and github_api_url
+        else base["github_api_url"]
+    )
+    api_cache_ttl_seconds = user_config.get("api_cache_ttl_seconds")
+    merged["api_cache_ttl_seconds"] = (
+        api_cache_ttl_seconds
+        if isinstance(api_cache_ttl_seconds, int) and api_cache_ttl_seconds >= 0
+        else base["api_cache_ttl_seconds"]
+    )
+    fetch_max_age_seconds = user_config.get("fetch_max_age_seconds")
+    merged["fetch_max_age_seconds"] = (
+        fetch_max_age_seconds
+        if isinstance(fetch_max_age_seconds, int) and fetch_max_age_seconds >= 0
+        else base["fetch_max_age_seconds"]
+    )
     return merged
 
 
-def load_config() -> Dict[str, Any]:
-    """
-    Load configuration from home directory only for security.
-    Config files in project directories (cwd) are not loaded to prevent
-    injection attacks via malicious config files in repositories.
-    """
-    defaults: Dict[str, Any] = {
+def _default_config() -> Dict[str, Any]:
+    return {
         "default_target_branch": "main",
         "jira_project_keys": [],
         "reviewer_groups": {},
@@ -76,87 +97,51 @@ def load_config() -> Dict[str, Any]:
         "ignored_authors": [],
         "jira_base_url": "https://qualitytrade.atlassian.net/browse/",
         "personalized_reviewers": [],
+        "api_cache_ttl_seconds": 300,
+        "github_transport": "gh",
+        "github_api_url": "https://api.github.com",
+        "fetch_max_age_seconds": 60,
     }
 
-    home_config_path = Path.home() / CONFIG_FILENAME
 
-    if home_config_path.exists():
-        try:
-            with open(home_config_path, "r", encoding="utf-8") as file_handle:
-                user_config = json.load(file_handle)
-                return _merge_config(defaults, user_config)
-        except json.JSONDecodeError:
-            logging.warning(
-                f"Failed to parse config file at {home_config_path}. Using defaults."
-            )
-        except OSError as exc:
-            logging.warning(f"Failed to read config file at {home_config_path}: {exc}")
+def _build_config(user_config: object) -> Dict[str, Any]:
+    defaults = _default_config()
+    if user_config is None:
+        return defaults
+    return _merge_config(defaults, user_config)
 
-    return defaults
 
+def _home_store() -> ConfigStore:
+    # Resolved per call: HOME may change between calls (benchmarks, tests).
+    return get_store(Path.home() / CONFIG_FILENAME, _build_config)
 
-def _safe_write_config(path: Path, payload: Dict[str, Any]) -> None:
-    if path.is_symlink():
-        logging.warning(f"Refusing to write config to symlinked path: {path}")
-        return
 
-    try:
-        with open(path, "w", encoding="utf-8") as file_handle:
-            json.dump(payload, file_handle, indent=4)
-        logging.info(f"Saved configuration to {path}")
-    except OSError as exc:
-        logging.warning(f"Failed to save config: {exc}")
+def load_config() -> Dict[str, Any]:
+    """
+    Load configuration from home directory only for security.
+    Config files in project directories (cwd) are not loaded to prevent
+    injection attacks via malicious config files in repositories.
+    The merged config is cached in process until the file changes; callers
+    get their own deep copy, so mutating it cannot leak into the cache.
+    """
+    return copy.deepcopy(_home_store().get())
 
 
 def save_config(config_dict: Dict[str, Any]) -> None:
     """
     Saves the configuration to .pr_creator_config.json in the home directory only.
     """
-    target_path = Path.home() / CONFIG_FILENAME
-    current_config: Dict[str, Any] = {}
-
-    if target_path.exists():
-        try:
-            with open(target_path, "r", encoding="utf-8") as file_handle:
-                current_config = json.load(file_handle)
-        except json.JSONDecodeError:
-            logging.warning(
-                f"Failed to parse existing config at {target_path}. Starting fresh."
-            )
-        except OSError as exc:
-            logging.warning(f"Failed to read existing config at {target_path}: {exc}")
-
-    if not isinstance(current_config, dict):
-        current_config = {}
-
-    current_config.update(config_dict)
-    _safe_write_config(target_path, current_config)
+    _home_store().update(lambda current_config: current_config.update(config_dict))
 
 
 def add_to_user_map(email: str, handle: str) -> None:
     """
     Updates the github_user_map in the config file in the home directory.
     """
-    target_path = Path.home() / CONFIG_FILENAME
-    if target_path.is_symlink():
-        logging.warning(f"Refusing to write config to symlinked path: {target_path}")
-        return
-
-    current_config: Dict[str, Any] = {}
-    if target_path.exists():
-        try:
-            with open(target_path, "r", encoding="utf-8") as file_handle:
-                current_config = json.load(file_handle)
-        except json.JSONDecodeError:
-            logging.warning(f"Failed to parse config at {target_path}. Starting fresh.")
-        except OSError as exc:
-            logging.warning(f"Failed to read config at {target_path}: {exc}")
-
-    if not isinstance(current_config, dict):
-        current_config = {}
-
-    github_user_map = _normalize_string_map(current_config.get("github_user_map"))
-    github_user_map[email] = handle
-    current_config["github_user_map"] = github_user_map
-
-    _safe_write_config(target_path, current_config)
+
+    def add(current_config: Dict[str, Any]) -> None:
+        github_user_map = _normalize_string_map(current_config.get("github_user_map"))
+        github_user_map[email] = handle
+        current_config["github_user_map"] = github_user_map
+
+    _home_store().update(add)
@@ -0,0 +1,147 @@
+"""
+Cached, atomic access to a JSON config file.
+
+load_config() runs for nearly every engine call (once per reviewer when
+resolving handles), and several Raycast commands may run the engine at the
+same time. A ConfigStore therefore:
+
+- keeps the parsed and built config in memory and only re-reads the file
+  when a stat() shows a different (mtime, size, inode)
+- writes with read-modify-write under an exclusive fcntl lock on a sidecar
+  lock file, so concurrent updates are not lost, and replaces the file with
+  a fully written temp file via os.replace, so readers never see a
+  truncated file
+"""
+import fcntl
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# (mtime in ns, size, inode): os.replace gives every write a new inode, so
+# rewrites within the filesystem's mtime resolution are still noticed.
+Signature = Tuple[int, int, int]
+
+
+def _signature(status: os.stat_result) -> Signature:
+    return status.st_mtime_ns, status.st_size, status.st_ino
+
+
+class ConfigStore:
+    """
+    One JSON config file. ``build`` turns the parsed JSON value (None when
+    the file is missing or unreadable) into the config returned by get().
+    """
+
+    def __init__(self, path: Path, build: Callable[[Any], Dict[str, Any]]) -> None:
+        self.path = path
+        self._build = build
+        self._lock = threading.Lock()
+        self._signature: Optional[Signature] = None
+        self._config: Optional[Dict[str, Any]] = None
+
+    def get(self) -> Dict[str, Any]:
+        """Return the built config, re-reading the file only when it changed."""
+        try:
+            current: Optional[Signature] = _signature(os.stat(self.path))
+        except OSError:
+            current = None
+        with self._lock:
+            if self._config is not None and self._signature == current:
+                return self._config
+
+        signature, value = self._read()
+        config = self._build(value)
+        with self._lock:
+            self._signature, self._config = signature, config
+        return config
+
+    def update(self, mutate: Callable[[Dict[str, Any]], None]) -> bool:
+        """
+        Apply mutate to the file's current JSON object (an empty one when it
+        is missing or invalid) and write the result atomically. Returns
+        whether the file was written.
+        """
+        if self.path.is_symlink():
+            logging.warning(f"Refusing to write config to symlinked path: {self.path}")
+            return False
+
+        try:
+            with self._exclusive():
+                _signature_read, current = self._read()
+                if not isinstance(current, dict):
+                    current = {}
+                mutate(current)
+                self._write(current)
+        except OSError as exc:
+            logging.warning(f"Failed to save config: {exc}")
+            return False
+        logging.info(f"Saved configuration to {self.path}")
+        return True
+
+    def _read(self) -> Tuple[Optional[Signature], Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file_handle:
+                # Taken from the open file, so it describes exactly what was read.
+                signature = _signature(os.fstat(file_handle.fileno()))
+                text = file_handle.read()
+        except FileNotFoundError:
+            return None, None
+        except OSError as exc:
+            logging.warning(f"Failed to read config file at {self.path}: {exc}")
+            return None, None
+
+        try:
+            return signature, json.loads(text)
+        except ValueError:
+            logging.warning(f"Failed to parse config file at {self.path}.")
+            return signature, None
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        # The config file itself cannot carry the lock: os.replace swaps it
+        # for a new inode that a waiting writer would not have locked.
+        lock_path = self.path.with_name(f"{self.path.name}.lock")
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _write(self, payload: Dict[str, Any]) -> None:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file_handle:
+                json.dump(payload, file_handle, indent=4)
+                file_handle.flush()
+                os.fsync(file_handle.fileno())
+            try:
+                # Keep the permissions of the file being replaced.
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+_stores: Dict[Path, ConfigStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: Path, build: Callable[[Any], Dict[str, Any]]) -> ConfigStore:
+    """Return the process-wide store for path, creating it on first use."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ConfigStore(path, build)
+        return store
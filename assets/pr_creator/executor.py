@@ -0,0 +1,257 @@
+"""
+Subprocess executor shared by every engine module.
+
+All git and gh commands go through utils.run_cmd(), which hands them to the
+process-wide CommandExecutor:
+
+- results of read-only commands (see is_read_only) are memoised for the
+  invocation: one CLI run, or one --serve request (the server calls
+  reset() before each)
+- an identical read-only command already running in another thread is not
+  spawned again; the caller waits for the running one
+- any other command (fetch, pr create, ...) may change what the read-only
+  ones return, so the memo is dropped before and after it runs
+- submit() starts a command on a worker thread and returns a Future, so
+  independent commands can run concurrently; a later run_cmd() of the same
+  command joins it instead of spawning a second process
+
+Only captured output is memoised; output that goes to the terminal is a
+side effect.
+"""
+import functools
+import os
+import subprocess
+import threading
+from typing import TYPE_CHECKING, Any, Optional
+
+from .tracing import MEMO, SUBPROCESS, command_label, format_command, is_enabled, span
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+MAX_WORKERS = 8
+
+_READ_ONLY_GIT = frozenset(
+    {
+        "cat-file",
+        "diff",
+        "for-each-ref",
+        "log",
+        "ls-tree",
+        "merge-base",
+        "rev-list",
+        "rev-parse",
+        "show-ref",
+    }
+)
+_READ_ONLY_BRANCH_FLAGS = frozenset({"-a", "-r", "--list", "--show-current"})
+_FIELD_FLAGS = frozenset({"-f", "-F", "--field", "--raw-field"})
+
+
+def _is_read_only_api(args: list[str]) -> bool:
+    if args[:1] == ["graphql"]:
+        queries = [
+            value[len("query="):]
+            for flag, value in zip(args, args[1:])
+            if flag in _FIELD_FLAGS and value.startswith("query=")
+        ]
+        return bool(queries) and not queries[0].lstrip().startswith("mutation")
+    # gh api turns requests with fields or a body into POSTs.
+    if _FIELD_FLAGS & set(args) or "--input" in args:
+        return False
+    method = next(
+        (value for flag, value in zip(args, args[1:]) if flag in ("-X", "--method")), "GET"
+    )
+    return method.upper() == "GET"
+
+
+def is_read_only(cmd: list[str]) -> bool:
+    """Whether cmd only reads repository or GitHub state, so it may be memoised."""
+    if len(cmd) < 2:
+        return False
+    program, subcommand, args = os.path.basename(cmd[0]), cmd[1], cmd[2:]
+    if program == "git":
+        if subcommand in _READ_ONLY_GIT:
+            return True
+        if subcommand == "branch":
+            return bool(args) and set(args) <= _READ_ONLY_BRANCH_FLAGS
+        if subcommand == "config":
+            # `git config <key>` reads; anything with more arguments may write.
+            return len(args) == 1 and not args[0].startswith("-")
+        if subcommand == "remote":
+            return args[:1] == ["get-url"]
+        return False
+    if program == "gh":
+        if subcommand == "api":
+            return _is_read_only_api(args)
+        return cmd[1:3] in (["pr", "list"], ["auth", "token"])
+    return False
+
+
+def _output_bytes(result: object) -> int:
+    return sum(
+        len(stream.encode("utf-8", "replace"))
+        for stream in (getattr(result, "stdout", None), getattr(result, "stderr", None))
+        if isinstance(stream, str)
+    )
+
+
+def _spawn(
+    cmd: list[str],
+    check: bool,
+    capture: bool,
+    timeout: Optional[int],
+    input: Optional[str],
+    cwd: Optional[str],
+) -> subprocess.CompletedProcess:
+    """Run one process, recording a tracing span when tracing is on."""
+    run = functools.partial(
+        subprocess.run,
+        cmd,
+        check=check,
+        capture_output=capture,
+        text=True,
+        timeout=timeout,
+        input=input,
+        cwd=cwd,
+    )
+    if not is_enabled():
+        return run()
+
+    with span(command_label(cmd), SUBPROCESS, cmd=format_command(cmd)) as details:
+        try:
+            result = run()
+        except subprocess.CalledProcessError as exc:
+            details.update(exit_code=exc.returncode, output_bytes=_output_bytes(exc))
+            raise
+        except subprocess.TimeoutExpired:
+            details.update(exit_code=None, timed_out=True)
+            raise
+        except OSError as exc:
+            details.update(exit_code=None, error=str(exc))
+            raise
+        details.update(exit_code=result.returncode, output_bytes=_output_bytes(result))
+        return result
+
+
+def _checked(result: subprocess.CompletedProcess, check: bool) -> subprocess.CompletedProcess:
+    if check and result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, result.args, output=result.stdout, stderr=result.stderr
+        )
+    return result
+
+
+def _record_reuse(cmd: list[str], source: str) -> None:
+    if is_enabled():
+        with span(command_label(cmd), MEMO, cmd=format_command(cmd), source=source):
+            pass
+
+
+class _Call:
+    """A read-only command running on behalf of one or more callers."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[subprocess.CompletedProcess] = None
+        self.error: Optional[BaseException] = None
+
+
+class CommandExecutor:
+    """Run commands with in-flight deduplication and a per-invocation memo."""
+
+    def __init__(self, max_workers: int = MAX_WORKERS) -> None:
+        self._lock = threading.Lock()
+        self._memo: dict[tuple, subprocess.CompletedProcess] = {}
+        self._in_flight: dict[tuple, _Call] = {}
+        # Bumped by every reset so results started before a write are not memoised.
+        self._generation = 0
+        self._max_workers = max_workers
+        self._pool: Optional["ThreadPoolExecutor"] = None
+
+    def reset(self) -> None:
+        """Forget memoised results, e.g. at the start of a --serve request."""
+        with self._lock:
+            self._memo.clear()
+            self._in_flight.clear()
+            self._generation += 1
+
+    def run(
+        self,
+        cmd: list[str],
+        check: bool = True,
+        capture: bool = False,
+        timeout: Optional[int] = 60,
+        input: Optional[str] = None,
+        cwd: Optional[str] = None,
+    ) -> subprocess.CompletedProcess:
+        """Run cmd like subprocess.run(text=True), reusing read-only results."""
+        if not is_read_only(cmd):
+            self.reset()
+            try:
+                return _spawn(cmd, check, capture, timeout, input, cwd)
+            finally:
+                self.reset()
+        if not capture:
+            return _spawn(cmd, check, capture, timeout, input, cwd)
+
+        key = (tuple(cmd), os.path.abspath(cwd or os.getcwd()), input)
+        with self._lock:
+            result = self._memo.get(key)
+            call = self._in_flight.get(key) if result is None else None
+            owner = result is None and call is None
+            if owner:
+                call = self._in_flight[key] = _Call()
+                generation = self._generation
+
+        if result is not None:
+            _record_reuse(cmd, "memo")
+            return _checked(result, check)
+
+        assert call is not None
+        if not owner:
+            call.done.wait()
+            _record_reuse(cmd, "in-flight")
+            if call.error is not None:
+                raise call.error
+            assert call.result is not None
+            return _checked(call.result, check)
+
+        try:
+            call.result = _spawn(cmd, False, True, timeout, input, cwd)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is call:
+                    del self._in_flight[key]
+                if call.result is not None and generation == self._generation:
+                    self._memo[key] = call.result
+            call.done.set()
+        return _checked(call.result, check)
+
+    def submit(self, cmd: list[str], **kwargs: Any) -> "Future[subprocess.CompletedProcess]":
+        """Start cmd on a worker thread; takes run()'s keyword arguments."""
+        with self._lock:
+            if self._pool is None:
+                # Imported here: most modes never submit and should not pay for it.
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="cmd"
+                )
+            pool = self._pool
+        return pool.submit(self.run, cmd, **kwargs)
+
+
+_executor = CommandExecutor()
+
+
+def get_executor() -> CommandExecutor:
+    return _executor
+
+
+def submit_cmd(cmd: list[str], **kwargs: Any) -> "Future[subprocess.CompletedProcess]":
+    """Start a command in the background; see CommandExecutor.submit()."""
+    return _executor.submit(cmd, **kwargs)
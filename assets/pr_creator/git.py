@@ -1,7 +1,37 @@
+import atexit
+import heapq
 import logging
+import os
+import re
 import subprocess
+import threading
+import time
+from typing import Optional
+from .cache import read_cache, write_cache
+from .executor import submit_cmd
+from .tracing import PIPE, SUBPROCESS, command_label, format_command, is_enabled, span
 from .utils import run_cmd, print_colored
 
+MERGE_BASE_CACHE_NAMESPACE = "merge_bases"
+CHANGED_FILES_CACHE_NAMESPACE = "changed_files"
+
+# Full refname -> SHA for every ref, resolved once per invocation, and the
+# symrefs among them (refname -> target refname).
+_ref_snapshot: Optional[dict[str, str]] = None
+_symrefs: dict[str, str] = {}
+
+# Characters that only appear in revision expressions, never in ref names.
+_REVISION_SYNTAX = set("~^:@{}")
+
+# Branch lines git writes to FETCH_HEAD: "<sha>\t[not-for-merge]\tbranch 'x' of <url>"
+_FETCH_HEAD_BRANCH = re.compile(r"^[0-9a-f]+\t[^\t]*\tbranch '(.+)' of ")
+
+# A cat-file coprocess unused for this long exits; the next read restarts it.
+CAT_FILE_IDLE_SECONDS = 60
+# Object names written per round trip. Kept far below a pipe buffer so the
+# write never blocks while git waits for its answers to be read.
+CAT_FILE_CHUNK = 256
+
 def is_git_repo() -> bool:
     """Check if the current directory is a git repository."""
     try:
@@ -11,40 +41,354 @@ def is_git_repo() -> bool:
         logging.debug(f"is_git_repo failed: {e}")
         return False
 
-def fetch_latest_branches() -> None:
-    """Fetch latest branches from origin."""
+def _find_git_dirs(cwd: Optional[str] = None) -> Optional[tuple[str, str]]:
+    """
+    Locate (git dir, common dir) for the work tree containing cwd without
+    spawning git. Linked worktrees and submodules have a .git file pointing
+    at their git dir; a worktree's git dir names the shared one in
+    "commondir". Returns None when git must be asked instead (GIT_DIR
+    overrides, bare repositories, reftable ref storage).
+    """
+    if os.environ.get("GIT_DIR") or os.environ.get("GIT_COMMON_DIR"):
+        return None
+
+    directory = os.path.abspath(cwd or os.getcwd())
+    while True:
+        dot_git = os.path.join(directory, ".git")
+        if os.path.isdir(dot_git):
+            git_dir = dot_git
+            break
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, "r", encoding="utf-8") as file_handle:
+                    content = file_handle.read().strip()
+            except OSError:
+                return None
+            if not content.startswith("gitdir:"):
+                return None
+            git_dir = os.path.join(directory, content[len("gitdir:"):].strip())
+            break
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as file_handle:
+            common_dir = os.path.join(git_dir, file_handle.read().strip())
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return None
+
+    if os.path.isdir(os.path.join(common_dir, "reftable")):
+        return None
+    return os.path.normpath(git_dir), os.path.normpath(common_dir)
+
+def _read_packed_refs(common_dir: str, refs: dict[str, str]) -> None:
+    try:
+        with open(os.path.join(common_dir, "packed-refs"), "r", encoding="utf-8") as file_handle:
+            for line in file_handle:
+                # Skip the "# pack-refs with:" header and "^<sha>" peeled tag lines.
+                if line[:1] in ("#", "^"):
+                    continue
+                sha, _, refname = line.rstrip("\n").partition(" ")
+                if len(sha) >= 40 and refname:
+                    refs[refname] = sha
+    except FileNotFoundError:
+        pass
+
+def _read_loose_refs(
+    base_dir: str, relative: str, refs: dict[str, str], symrefs: dict[str, str]
+) -> None:
+    try:
+        entries = list(os.scandir(os.path.join(base_dir, relative)))
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    for entry in entries:
+        refname = f"{relative}/{entry.name}"
+        if entry.is_dir(follow_symlinks=False):
+            _read_loose_refs(base_dir, refname, refs, symrefs)
+            continue
+        if entry.name.endswith(".lock"):
+            continue
+        try:
+            with open(entry.path, "r", encoding="utf-8") as file_handle:
+                content = file_handle.read().strip()
+        except (OSError, UnicodeDecodeError):
+            continue
+        if content.startswith("ref:"):
+            symrefs[refname] = content[len("ref:"):].strip()
+        elif len(content) >= 40:
+            # Loose refs are newer than their packed copy.
+            refs[refname] = content
+
+def read_refs(cwd: Optional[str] = None) -> Optional[tuple[dict[str, str], dict[str, str]]]:
+    """
+    Read every ref of the repository at cwd from packed-refs and loose ref
+    files, without spawning git.
+    Returns (refname -> SHA, symref name -> target refname). Symrefs such as
+    refs/remotes/origin/HEAD also appear in the first map with the SHA of
+    their target, as git for-each-ref reports them. Returns None when the
+    ref store cannot be read directly.
+    """
+    dirs = _find_git_dirs(cwd)
+    if dirs is None:
+        return None
+    git_dir, common_dir = dirs
+
+    refs: dict[str, str] = {}
+    symrefs: dict[str, str] = {}
+    try:
+        _read_packed_refs(common_dir, refs)
+        _read_loose_refs(common_dir, "refs", refs, symrefs)
+        if git_dir != common_dir:
+            # Per-worktree refs (refs/bisect, refs/worktree, ...) live in the worktree's git dir.
+            for relative in ("refs/bisect", "refs/worktree", "refs/rewritten"):
+                _read_loose_refs(git_dir, relative, refs, symrefs)
+    except OSError as e:
+        logging.debug(f"Failed to read refs directly: {e}")
+        return None
+
+    resolved: dict[str, str] = {}
+    for name, target in symrefs.items():
+        # Follow chains of symrefs; git allows a few levels.
+        for _ in range(5):
+            if target in refs or target not in symrefs:
+                break
+            target = symrefs[target]
+        # Dangling symrefs are skipped, as git for-each-ref does.
+        if target in refs:
+            refs[name] = refs[target]
+            resolved[name] = symrefs[name]
+    return refs, resolved
+
+def _read_refs_with_git(
+    cwd: Optional[str] = None, prefix: str = "refs"
+) -> Optional[tuple[dict[str, str], dict[str, str]]]:
+    try:
+        result = run_cmd(
+            ["git", "for-each-ref", "--format=%(objectname) %(refname) %(symref)", prefix],
+            capture=True,
+            cwd=cwd,
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        logging.warning(f"Failed to read refs: {e}")
+        return None
+
+    refs: dict[str, str] = {}
+    symrefs: dict[str, str] = {}
+    for line in result.stdout.splitlines():
+        sha, _, rest = line.partition(" ")
+        refname, _, target = rest.partition(" ")
+        if sha and refname:
+            refs[refname] = sha
+        if target:
+            symrefs[refname] = target
+    return refs, symrefs
+
+def get_ref_snapshot() -> dict[str, str]:
+    """
+    Resolve every local branch, remote-tracking branch and tag to its SHA,
+    read straight from the ref files (git for-each-ref when they cannot be
+    read directly). The result is reused until invalidate_ref_snapshot() is
+    called.
+    """
+    global _ref_snapshot, _symrefs
+    if _ref_snapshot is None:
+        snapshot = read_refs() or _read_refs_with_git()
+        _ref_snapshot, _symrefs = snapshot or ({}, {})
+    return _ref_snapshot
+
+def invalidate_ref_snapshot() -> None:
+    """Drop the cached ref snapshot, e.g. after a fetch."""
+    global _ref_snapshot
+    _ref_snapshot = None
+
+def get_remote_branch_refs(cwd: Optional[str] = None) -> dict[str, str]:
+    """
+    Map every remote-tracking branch ("origin/main", "upstream/feature") to
+    its SHA, sorted by name like git branch -r. Symrefs such as origin/HEAD
+    are left out. With cwd the refs of that repository are read directly,
+    bypassing the process-wide snapshot, so threads can serve several
+    repositories at once.
+    """
+    if cwd is None:
+        snapshot, symrefs = get_ref_snapshot(), _symrefs
+    else:
+        snapshot, symrefs = (
+            read_refs(cwd) or _read_refs_with_git(cwd, "refs/remotes") or ({}, {})
+        )
+    prefix = "refs/remotes/"
+    return {
+        refname[len(prefix):]: snapshot[refname]
+        for refname in sorted(snapshot)
+        if refname.startswith(prefix) and refname not in symrefs
+    }
+
+def resolve_ref(name: str) -> Optional[str]:
+    """
+    Resolve a ref name to a SHA from the snapshot, using git's lookup order
+    (exact, refs/, tags, heads, remotes). Only HEAD, SHAs and revision
+    expressions fall back to git rev-parse.
+    """
+    if not name:
+        return None
+
+    snapshot = get_ref_snapshot()
+    for candidate in (
+        name,
+        f"refs/{name}",
+        f"refs/tags/{name}",
+        f"refs/heads/{name}",
+        f"refs/remotes/{name}",
+    ):
+        sha = snapshot.get(candidate)
+        if sha:
+            return sha
+
+    is_revision = name == "HEAD" or bool(_REVISION_SYNTAX & set(name))
+    is_hex = all(c in "0123456789abcdef" for c in name.lower())
+    if not is_revision and not is_hex:
+        return None
+
+    try:
+        result = run_cmd(["git", "rev-parse", "--verify", "--quiet", name], capture=True)
+        return result.stdout.strip() or None
+    except subprocess.CalledProcessError:
+        return None
+
+def resolve_base_ref(base: str) -> Optional[str]:
+    """Resolve a base branch, preferring origin/<base> over the local branch."""
+    return resolve_ref(f"origin/{base}") or resolve_ref(base)
+
+def fetch_latest_branches(cwd: Optional[str] = None) -> None:
+    """Fetch and prune every branch of every remote."""
     try:
         run_cmd(
             ["git", "fetch", "--all", "--prune"],
             check=False,
             capture=True,
             timeout=120,
+            cwd=cwd,
         )
     except Exception as e:
         logging.warning(f"Failed to fetch branches: {e}")
+    invalidate_ref_snapshot()
+
+def _remote_refs(cwd: Optional[str] = None) -> Optional[dict[str, str]]:
+    snapshot = read_refs(cwd) or _read_refs_with_git(cwd, "refs/remotes")
+    if snapshot is None:
+        return None
+    refs, _symrefs = snapshot
+    return {name: sha for name, sha in refs.items() if name.startswith("refs/remotes/")}
 
-def get_remote_branches() -> list[str]:
-    """Get a list of remote branches, stripping 'origin/' prefix."""
+def fetch_and_detect_changes(cwd: Optional[str] = None) -> bool:
+    """
+    Run a full fetch and report whether any remote-tracking ref was added,
+    moved or pruned. Safe to call from a background thread for another
+    repository by passing cwd.
+    """
+    before = _remote_refs(cwd)
+    fetch_latest_branches(cwd)
+    after = _remote_refs(cwd)
+    return before is None or after is None or before != after
+
+def full_fetch_is_fresh(max_age: int, cwd: Optional[str] = None) -> bool:
+    """
+    Whether FETCH_HEAD is younger than max_age seconds and lists every
+    remote-tracking branch, i.e. a recent full fetch left nothing to do.
+    A targeted fetch since then rewrites FETCH_HEAD with fewer branches.
+    """
+    if max_age <= 0:
+        return False
+    fetched = _fetched_branches(max_age, cwd)
+    remote = _remote_refs(cwd)
+    if fetched is None or remote is None:
+        return False
+    # refs/remotes/<remote>/<branch>; <remote>/HEAD is not a fetched branch.
+    branches = {name.split("/", 3)[3] for name in remote if name.count("/") >= 3}
+    branches.discard("HEAD")
+    return branches <= fetched
+
+def _fetched_branches(max_age: int, cwd: Optional[str] = None) -> Optional[set[str]]:
+    """
+    Return the branches recorded in FETCH_HEAD when it is younger than
+    max_age seconds, otherwise None.
+    """
     try:
-        result = run_cmd(["git", "branch", "-r"], capture=True)
-        branches = []
-        for line in result.stdout.splitlines():
-            line = line.strip()
-            if not line or "->" in line:
-                continue
-            # Strip origin/ prefix for cleaner selection/autocomplete
-            if line.startswith("origin/"):
-                line = line[len("origin/"):]
-            branches.append(line)
-        return branches
-    except subprocess.CalledProcessError as e:
-        logging.warning(f"Failed to get remote branches: {e}")
-        return []
+        result = run_cmd(
+            ["git", "rev-parse", "--git-path", "FETCH_HEAD"], capture=True, cwd=cwd
+        )
+        path = os.path.join(cwd or "", result.stdout.strip())
+        if time.time() - os.path.getmtime(path) >= max_age:
+            return None
+        with open(path, "r", encoding="utf-8", errors="replace") as file_handle:
+            return {
+                match.group(1)
+                for match in map(_FETCH_HEAD_BRANCH.match, file_handle)
+                if match
+            }
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def fetch_branches(branches: list[str], max_age: int = 0) -> bool:
+    """
+    Fetch only the given branches from origin into their remote-tracking refs.
+    The fetch is skipped when FETCH_HEAD is younger than max_age seconds and
+    already lists every branch (a full fetch lists them all). Returns True
+    when a fetch ran.
+    """
+    wanted = list(dict.fromkeys(branch for branch in branches if branch))
+    if not wanted:
+        return False
+    if max_age > 0:
+        fetched = _fetched_branches(max_age)
+        if fetched is not None and fetched.issuperset(wanted):
+            logging.info(f"Skipping fetch, FETCH_HEAD is fresh for: {', '.join(wanted)}")
+            return False
+
+    def refspec(branch: str) -> str:
+        return f"+refs/heads/{branch}:refs/remotes/origin/{branch}"
+
+    cmd = ["git", "fetch", "--no-tags", "origin"]
+    try:
+        result = run_cmd(
+            cmd + [refspec(branch) for branch in wanted],
+            check=False,
+            capture=True,
+            timeout=120,
+        )
+        if result.returncode != 0 and len(wanted) > 1:
+            # One missing branch fails the whole fetch; fetch the rest one by one.
+            logging.warning(f"Batched fetch failed, retrying per branch: {result.stderr.strip()}")
+            for index, branch in enumerate(wanted):
+                # --append keeps every fetched branch listed in FETCH_HEAD.
+                append = ["--append"] if index else []
+                run_cmd(cmd + append + [refspec(branch)], check=False, capture=True, timeout=120)
+        elif result.returncode != 0:
+            logging.warning(f"Failed to fetch {wanted[0]}: {result.stderr.strip()}")
+    except Exception as e:
+        logging.warning(f"Failed to fetch branches: {e}")
+    invalidate_ref_snapshot()
+    return True
+
+def get_remote_branches(cwd: Optional[str] = None) -> list[str]:
+    """
+    Get the remote-tracking branches, read from the ref files. Names from
+    origin lose their 'origin/' prefix for cleaner selection/autocomplete;
+    other remotes keep theirs.
+    """
+    return [
+        name[len("origin/"):] if name.startswith("origin/") else name
+        for name in get_remote_branch_refs(cwd)
+    ]
 
-def get_current_branch() -> str:
+def get_current_branch(cwd: Optional[str] = None) -> str:
     """Get the name of the currently checked out branch."""
     try:
-        result = run_cmd(["git", "branch", "--show-current"], capture=True)
+        result = run_cmd(["git", "branch", "--show-current"], capture=True, cwd=cwd)
         return result.stdout.strip()
     except subprocess.CalledProcessError as e:
         logging.warning(f"Failed to get current branch: {e}")
@@ -53,27 +397,23 @@ def get_current_branch() -> str:
 def get_commits_between(base: str, head: str) -> list[str]:
     """Get list of commit subject lines between base and head."""
     try:
-        # Check if origin/{base} exists
-        base_ref = f"origin/{base}"
-        try:
-            run_cmd(["git", "rev-parse", "--verify", base_ref], capture=True)
-        except subprocess.CalledProcessError:
-            # Fallback to local base if origin/base is missing
-            base_ref = base
-            try:
-                run_cmd(["git", "rev-parse", "--verify", base_ref], capture=True)
-            except subprocess.CalledProcessError:
-                logging.warning(f"Failed to verify base ref: {base_ref}")
-                return []
+        # Prefer origin/{base}, falling back to the local base
+        base_sha = resolve_base_ref(base)
+        if not base_sha:
+            logging.warning(f"Failed to verify base ref: {base}")
+            return []
 
-        # --no-merges to skip merge commits
-        try:
-            run_cmd(["git", "rev-parse", "--verify", head], capture=True)
-        except subprocess.CalledProcessError:
+        head_sha = resolve_ref(head)
+        if not head_sha:
             logging.warning(f"Failed to verify head ref: {head}")
             return []
 
-        cmd = ["git", "log", f"{base_ref}..{head}", "--no-merges", "--pretty=format:%s"]
+        # A range walk stays in git log rather than the cat-file coprocess:
+        # parents are only known after each commit is read, so walking over
+        # cat-file costs a round trip per generation, and git log can use
+        # the commit-graph to stop at the base without reading old history.
+        # --no-merges to skip merge commits
+        cmd = ["git", "log", f"{base_sha}..{head_sha}", "--no-merges", "--pretty=format:%s"]
         result = run_cmd(cmd, capture=True)
         lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
         return lines
@@ -81,23 +421,172 @@ def get_commits_between(base: str, head: str) -> list[str]:
         logging.warning(f"Failed to get commits between: {e}")
         return []
 
+def get_commits_for_targets(targets: list[str], head: str) -> dict[str, list[str]]:
+    """
+    Get the non-merge commit subjects in head but not in each target with a
+    single history walk. Everything reachable from the targets' common
+    merge base is in every target, so one `git log` of all tips above that
+    base yields the whole commit graph that matters; reachability per tip is
+    then worked out in Python, and each list is ordered like
+    `git log target..head` would print it. The walk itself stays in git log
+    for the reason given in get_commits_between. Unresolvable targets map
+    to an empty list.
+    """
+    unique = list(dict.fromkeys(targets))
+    if len(unique) == 1:
+        return {unique[0]: get_commits_between(unique[0], head)}
+
+    head_sha = resolve_ref(head)
+    if not head_sha:
+        logging.warning(f"Failed to verify head ref: {head}")
+        return {target: [] for target in unique}
+
+    target_shas: dict[str, str] = {}
+    for target in unique:
+        sha = resolve_base_ref(target)
+        if sha:
+            target_shas[target] = sha
+        else:
+            logging.warning(f"Failed to verify base ref: {target}")
+    commits: dict[str, list[str]] = {target: [] for target in unique}
+    if not target_shas:
+        return commits
+
+    tips = list(dict.fromkeys([head_sha, *target_shas.values()]))
+    try:
+        base = run_cmd(
+            ["git", "merge-base", "--octopus", *target_shas.values()],
+            check=False,
+            capture=True,
+        ).stdout.split()
+        result = run_cmd(
+            [
+                "git",
+                "log",
+                "--pretty=format:%H %ct %P%x1f%s",
+                *tips,
+                *(f"^{sha}" for sha in base),
+            ],
+            capture=True,
+        )
+    except subprocess.CalledProcessError as e:
+        logging.warning(f"Failed to walk commit graph: {e}")
+        return commits
+
+    # sha -> (parents, subject, committer timestamp).
+    graph: dict[str, tuple[list[str], str, int]] = {}
+    for line in result.stdout.splitlines():
+        ids, _, subject = line.partition("\x1f")
+        sha, timestamp, *parents = ids.split()
+        graph[sha] = (parents, subject.strip(), int(timestamp))
+
+    def reachable(tip: str) -> set[str]:
+        seen: set[str] = set()
+        stack = [tip]
+        while stack:
+            sha = stack.pop()
+            if sha in seen or sha not in graph:
+                continue
+            seen.add(sha)
+            stack.extend(graph[sha][0])
+        return seen
+
+    def log_order(missing: set[str]) -> list[str]:
+        # Replays git's default walk: newest committer date first, ties in
+        # the order commits were queued (parents in order, as each child is
+        # shown), so equal timestamps come out as `git log` prints them.
+        subjects: list[str] = []
+        if head_sha not in missing:
+            return subjects
+        queue = [(-graph[head_sha][2], 0, head_sha)]
+        queued = {head_sha}
+        while queue:
+            _date, _order, sha = heapq.heappop(queue)
+            parents, subject, _timestamp = graph[sha]
+            if len(parents) <= 1 and subject:
+                subjects.append(subject)
+            for parent in parents:
+                if parent in missing and parent not in queued:
+                    queued.add(parent)
+                    heapq.heappush(queue, (-graph[parent][2], len(queued), parent))
+        return subjects
+
+    in_head = reachable(head_sha)
+    for target, target_sha in target_shas.items():
+        commits[target] = log_order(in_head - reachable(target_sha))
+    return commits
+
+def _cached_merge_base(base_sha: str, head_sha: str) -> Optional[str]:
+    cached = read_cache(MERGE_BASE_CACHE_NAMESPACE, f"{base_sha}-{head_sha}")
+    if isinstance(cached, dict) and isinstance(cached.get("sha"), str):
+        return cached["sha"]
+    return None
+
+def _merge_base(base_sha: str, head_sha: str) -> Optional[str]:
+    """Merge base of two commits; immutable for a pair of SHAs, so cached."""
+    cached = _cached_merge_base(base_sha, head_sha)
+    if cached is not None:
+        return cached
+
+    key = f"{base_sha}-{head_sha}"
+    result = run_cmd(["git", "merge-base", base_sha, head_sha], check=False, capture=True)
+    sha = result.stdout.strip()
+    if result.returncode != 0 or not sha:
+        return None
+    write_cache(MERGE_BASE_CACHE_NAMESPACE, key, {"sha": sha})
+    return sha
+
 def get_changed_files(base: str, head: str) -> list[str]:
-    """Get list of files changed between base and head."""
+    """
+    Get list of files changed between base and head (git diff base...head).
+    Lists are cached on disk by (merge-base SHA, head SHA), so targets that
+    share a merge base share an entry and unchanged refs cost no git diff.
+    """
     try:
-        base_ref = f"origin/{base}"
-        try:
-            run_cmd(["git", "rev-parse", "--verify", base_ref], capture=True)
-        except subprocess.CalledProcessError:
-            base_ref = base
+        base_sha = resolve_base_ref(base)
+        head_sha = resolve_ref(head)
+        if not base_sha or not head_sha:
+            logging.warning(f"Failed to verify refs for diff: {base}...{head}")
+            return []
+
+        merge_base = _merge_base(base_sha, head_sha)
+        if merge_base is None:
+            # Unrelated histories: let git report it as before.
+            cmd = ["git", "diff", "--name-only", f"{base_sha}...{head_sha}"]
+            result = run_cmd(cmd, capture=True)
+            return [line.strip() for line in result.stdout.splitlines() if line.strip()]
 
-        cmd = ["git", "diff", "--name-only", f"{base_ref}...{head}"]
+        key = f"{merge_base}-{head_sha}"
+        cached = read_cache(CHANGED_FILES_CACHE_NAMESPACE, key)
+        if isinstance(cached, dict) and isinstance(cached.get("files"), list):
+            return cached["files"]
+
+        cmd = ["git", "diff", "--name-only", merge_base, head_sha]
         result = run_cmd(cmd, capture=True)
         lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+        write_cache(CHANGED_FILES_CACHE_NAMESPACE, key, {"files": lines})
         return lines
     except subprocess.CalledProcessError as e:
         logging.warning(f"Failed to get changed files: {e}")
         return []
 
+def get_changed_files_for_targets(targets: list[str], head: str) -> list[str]:
+    """Union of the files changed against each target, each path listed once."""
+    unique_targets = list(dict.fromkeys(targets))
+    head_sha = resolve_ref(head)
+    if head_sha and len(unique_targets) > 1:
+        # The merge bases are independent: start the uncached ones together
+        # and let get_changed_files() join them through the executor.
+        for target in unique_targets:
+            base_sha = resolve_base_ref(target)
+            if base_sha and _cached_merge_base(base_sha, head_sha) is None:
+                submit_cmd(["git", "merge-base", base_sha, head_sha], check=False, capture=True)
+
+    changed: dict[str, None] = {}
+    for target in unique_targets:
+        changed.update(dict.fromkeys(get_changed_files(target, head)))
+    return list(changed)
+
 def get_current_user_email() -> str:
     """Get the current git user's email."""
     try:
@@ -106,3 +595,180 @@ def get_current_user_email() -> str:
     except subprocess.CalledProcessError as e:
         logging.warning(f"Failed to get current user email: {e}")
         return ""
+
+class CatFileProcess:
+    """
+    A long-lived `git cat-file --batch` (contents) or `--batch-check` (type
+    and size) for one repository, so object reads cost a pipe round trip
+    instead of a process spawn. Callers queue on a lock and each request
+    pipelines its names in chunks. The process exits after
+    CAT_FILE_IDLE_SECONDS without requests, and at interpreter exit.
+    """
+
+    def __init__(self, cwd: str, check: bool) -> None:
+        self._cwd = cwd
+        self._check = check
+        self._cmd = ["git", "cat-file", "--batch-check" if check else "--batch"]
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._last_used = 0.0
+        self._timer: Optional[threading.Timer] = None
+
+    def query(self, names: list[str]) -> list[Optional[tuple[str, str, Optional[bytes]]]]:
+        """
+        Look up object names (SHAs, refs, "<rev>:<path>"). Each answer is
+        (SHA, type, content) or None when the object does not exist; content
+        is None for --batch-check.
+        """
+        # A newline would split the name into two requests.
+        valid = [name for name in names if name and "\n" not in name]
+        with self._lock, span(" ".join(self._cmd[:2]), PIPE, objects=len(valid)):
+            try:
+                found = self._query(valid)
+            except (OSError, ValueError):
+                # The process died (or was closed by a signal): restart once.
+                self._close()
+                found = self._query(valid)
+            self._last_used = time.monotonic()
+            self._schedule_idle_check(CAT_FILE_IDLE_SECONDS)
+        answers = dict(zip(valid, found))
+        return [answers.get(name) for name in names]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._close()
+
+    def _start(self) -> subprocess.Popen:
+        with span(command_label(self._cmd), SUBPROCESS, cmd=format_command(self._cmd)):
+            self._process = subprocess.Popen(
+                self._cmd,
+                cwd=self._cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._process
+
+    def _query(self, names: list[str]) -> list[Optional[tuple[str, str, Optional[bytes]]]]:
+        process = self._process
+        if process is None or process.poll() is not None:
+            process = self._start()
+        assert process.stdin is not None and process.stdout is not None
+
+        answers = []
+        for start in range(0, len(names), CAT_FILE_CHUNK):
+            chunk = names[start:start + CAT_FILE_CHUNK]
+            process.stdin.write("".join(f"{name}\n" for name in chunk).encode("utf-8"))
+            process.stdin.flush()
+            for _name in chunk:
+                answers.append(self._read_answer(process.stdout))
+        return answers
+
+    def _read_answer(self, stdout) -> Optional[tuple[str, str, Optional[bytes]]]:
+        header = stdout.readline()
+        if not header.endswith(b"\n"):
+            raise OSError("git cat-file exited unexpectedly")
+        # "<sha> <type> <size>", or "<name> missing" / "<name> ambiguous".
+        parts = header.decode("utf-8", "replace").split()
+        if len(parts) != 3 or not parts[2].isdigit():
+            return None
+        sha, object_type, size = parts
+        if self._check:
+            return sha, object_type, None
+        content = stdout.read(int(size))
+        stdout.read(1)
+        return sha, object_type, content
+
+    def _schedule_idle_check(self, delay: float) -> None:
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._on_idle_check)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_idle_check(self) -> None:
+        with self._lock:
+            self._timer = None
+            idle = time.monotonic() - self._last_used
+            if idle >= CAT_FILE_IDLE_SECONDS:
+                self._close()
+            elif self._process is not None:
+                self._schedule_idle_check(CAT_FILE_IDLE_SECONDS - idle)
+
+    def _close(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+            process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            if process.stdout is not None:
+                process.stdout.close()
+
+# (repository directory, check) -> its coprocess.
+_cat_files: dict[tuple[str, bool], CatFileProcess] = {}
+_cat_files_lock = threading.Lock()
+
+def _cat_file(check: bool = False, cwd: Optional[str] = None) -> CatFileProcess:
+    key = (os.path.realpath(cwd or os.getcwd()), check)
+    with _cat_files_lock:
+        process = _cat_files.get(key)
+        if process is None:
+            process = _cat_files[key] = CatFileProcess(key[0], check)
+    return process
+
+def close_cat_files() -> None:
+    """Stop every cat-file coprocess; they restart on the next read."""
+    with _cat_files_lock:
+        processes = list(_cat_files.values())
+        _cat_files.clear()
+    for process in processes:
+        process.close()
+
+atexit.register(close_cat_files)
+
+def read_objects(
+    names: list[str], check: bool = False, cwd: Optional[str] = None
+) -> Optional[list[Optional[tuple[str, str, Optional[bytes]]]]]:
+    """
+    Read many objects over the repository's cat-file coprocess; see
+    CatFileProcess.query(). With check only type and size are looked up.
+    Returns None when git cannot be run.
+    """
+    try:
+        return _cat_file(check, cwd).query(names)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Failed to read objects with git cat-file: {e}")
+        return None
+
+def get_blob_shas(ref: str, paths: list[str]) -> Optional[dict[str, str]]:
+    """
+    Map each path that exists as a blob at ref to its blob SHA.
+    Returns None when ref cannot be resolved.
+    """
+    answers = read_objects([ref, *(f"{ref}:{path}" for path in paths)], check=True)
+    if not answers or answers[0] is None:
+        logging.debug(f"Failed to resolve {ref} to list {paths}")
+        return None
+
+    return {
+        path: answer[0]
+        for path, answer in zip(paths, answers[1:])
+        if answer is not None and answer[1] == "blob"
+    }
+
+def read_blob(sha: str) -> Optional[str]:
+    """Read the content of a blob object."""
+    answers = read_objects([sha])
+    answer = answers[0] if answers else None
+    if answer is None or answer[1] != "blob" or answer[2] is None:
+        logging.warning(f"Failed to read blob {sha}")
+        return None
+    return answer[2].decode("utf-8", "replace")
@@ -1,98 +1,272 @@
-import json
+import hashlib
 import logging
+import os
 import re
-import shutil
-import subprocess
+import time
 from typing import Optional
 from urllib.parse import quote
 
-from .utils import run_cmd, print_colored
+from .utils import print_colored
 from .config import load_config
+from .cache import delete_cache, read_cache, write_cache
+from .api_cache import cached_api_get, iter_api_pages
+from .transport import TransportError, get_repo_slug, get_transport
 
+OPEN_PRS_CACHE_NAMESPACE = "pull_requests"
+IDENTITY_CACHE_NAMESPACE = "github"
+IDENTITY_CACHE_KEY = "identities"
+IDENTITY_TTL_SECONDS = 30 * 24 * 60 * 60
+# Misses are retried sooner: the user may add a public email or a map entry.
+IDENTITY_NEGATIVE_TTL_SECONDS = 24 * 60 * 60
+# Assignable users are fetched 100 per page; stop after this many pages.
+ASSIGNABLE_USERS_MAX_PAGES = 10
 
-def check_existing_pr(source_branch: str, target_branch: str) -> bool:
-    """Check if an open PR already exists using 'gh'. Returns True if exists."""
-    if shutil.which("gh") is None:
-        raise FileNotFoundError("gh CLI not found")
+_ASSIGNABLE_USERS_FIELDS = """
+    assignableUsers(first: 100, after: $after) {
+      nodes { login }
+      pageInfo { hasNextPage endCursor }
+    }
+"""
 
+METADATA_QUERY = f"""
+query($owner: String!, $name: String!, $head: String!, $after: String) {{
+  viewer {{ login }}
+  repository(owner: $owner, name: $name) {{
+    {_ASSIGNABLE_USERS_FIELDS}
+    pullRequests(headRefName: $head, states: OPEN, first: 100) {{
+      nodes {{ baseRefName url title }}
+    }}
+  }}
+}}
+"""
+
+ASSIGNABLE_USERS_QUERY = f"""
+query($owner: String!, $name: String!, $after: String) {{
+  repository(owner: $owner, name: $name) {{
+    {_ASSIGNABLE_USERS_FIELDS}
+  }}
+}}
+"""
+
+
+def _open_prs_cache_key(source_branch: str) -> str:
+    return hashlib.sha256(f"{os.getcwd()}|{source_branch}".encode()).hexdigest()
+
+
+def forget_open_prs(source_branch: str) -> None:
+    """Drop the cached open-PR listing, e.g. after creating a PR."""
+    delete_cache(OPEN_PRS_CACHE_NAMESPACE, _open_prs_cache_key(source_branch))
+
+
+def get_cached_open_prs(source_branch: str, max_age: int) -> Optional[dict[str, dict]]:
+    """
+    The open-PR listing for source_branch cached by the last lookup, without
+    any request; None when there is none or it is older than max_age seconds.
+    """
+    cached = read_cache(OPEN_PRS_CACHE_NAMESPACE, _open_prs_cache_key(source_branch))
+    if (
+        isinstance(cached, dict)
+        and isinstance(cached.get("prs"), dict)
+        and time.time() - cached.get("fetched_at", 0) < max_age
+    ):
+        return cached["prs"]
+    return None
+
+
+def get_open_prs_for_head(source_branch: str) -> dict[str, dict]:
+    """
+    List every open PR from source_branch with one request.
+    Returns a map of base branch -> {"url", "title"}, and caches it for
+    get_cached_open_prs().
+    """
+    transport = get_transport()
+    if not transport.is_available():
+        raise FileNotFoundError(transport.unavailable_message())
+
+    try:
+        prs = transport.list_open_prs(source_branch)
+    except TransportError as e:
+        raise RuntimeError(f"Failed to check for existing PRs: {str(e)}") from e
+
+    return _store_open_prs(source_branch, prs)
+
+
+def _store_open_prs(source_branch: str, prs: list) -> dict[str, dict]:
+    """Index an open-PR listing by base branch and cache it for previews."""
+    by_base = {
+        pr["baseRefName"]: {"url": pr.get("url", ""), "title": pr.get("title", "")}
+        for pr in prs
+        if isinstance(pr, dict) and isinstance(pr.get("baseRefName"), str)
+    }
+    write_cache(
+        OPEN_PRS_CACHE_NAMESPACE,
+        _open_prs_cache_key(source_branch),
+        {"prs": by_base, "fetched_at": time.time()},
+    )
+    return by_base
+
+
+def check_existing_pr(
+    source_branch: str,
+    target_branch: str,
+    open_prs: Optional[dict[str, dict]] = None,
+) -> bool:
+    """
+    Check if an open PR already exists using 'gh'. Returns True if exists.
+    Pass open_prs from get_open_prs_for_head() to check several targets
+    against a single lookup.
+    """
     # Debug info to stderr
     print_colored(
         f"Checking for existing PRs: {source_branch} -> {target_branch}...", "cyan"
     )
 
-    head = source_branch
-    base = target_branch
+    if open_prs is None:
+        open_prs = get_open_prs_for_head(source_branch)
 
-    try:
-        # We specify the current repo explicitly if possible, or just let gh handle it
-        cmd = [
-            "gh",
-            "pr",
-            "list",
-            "--head",
-            head,
-            "--base",
-            base,
-            "--state",
-            "open",
-            "--json",
-            "url,title",
-        ]
-        result = run_cmd(cmd, capture=True)
-        prs = json.loads(result.stdout)
-
-        if prs:
-            print_colored(f"[!] A PR already exists for {head} -> {base}", "yellow")
-            return True
-        return False
-
-    except subprocess.CalledProcessError as e:
-        error_msg = e.stderr.strip() or e.stdout.strip() or f"Exit code {e.returncode}"
-        raise RuntimeError(f"Failed to check for existing PRs: {error_msg}") from e
-    except Exception as e:
-        raise RuntimeError(f"Failed to check for existing PRs: {str(e)}") from e
+    if target_branch in open_prs:
+        print_colored(
+            f"[!] A PR already exists for {source_branch} -> {target_branch}", "yellow"
+        )
+        return True
+    return False
 
 
-def resolve_handle(git_identity: str, interactive: bool = True) -> Optional[str]:
-    """Resolve 'Name <email>' to GitHub username via config or gh api."""
-    email = None
+def _extract_email(git_identity: str) -> Optional[str]:
     if "<" in git_identity and ">" in git_identity:
         m = re.search(r"<([^>]+)>", git_identity)
         if m:
-            email = m.group(1)
+            return m.group(1)
     elif "@" in git_identity:
-        email = git_identity.strip()
-
-    if not email:
-        return git_identity
+        return git_identity.strip()
+    return None
 
-    config = load_config()
-    user_map = config.get("github_user_map", {})
-    if email in user_map:
-        return user_map[email]
 
+def _search_handle(email: str) -> Optional[str]:
+    """Look up a single email with the REST search API."""
     try:
         encoded_email = quote(email, safe="")
-        cmd = [
-            "gh",
-            "api",
-            f"search/users?q={encoded_email}",
-            "--jq",
-            ".items[0].login",
-        ]
-        result = run_cmd(cmd, capture=True, check=False)
-        handle = result.stdout.strip()
-        if handle:
+        response = get_transport().request("GET", f"search/users?q={encoded_email}")
+        items = (response.json() or {}).get("items") if response.status == 200 else None
+        handle = items[0].get("login") if items else None
+        if isinstance(handle, str) and handle:
             return handle
     except Exception as e:
         logging.warning(f"Failed to resolve GitHub handle for {email}: {e}")
+    return None
+
+
+def _search_handles_batch(emails: list[str]) -> Optional[dict[str, Optional[str]]]:
+    """
+    Look up several emails with one GraphQL request, one aliased search per email.
+    Returns None if the request itself failed, so callers can fall back.
+    """
+    declarations = ", ".join(f"$q{i}: String!" for i in range(len(emails)))
+    searches = " ".join(
+        f"u{i}: search(query: $q{i}, type: USER, first: 1) "
+        "{ nodes { ... on User { login } } }"
+        for i in range(len(emails))
+    )
+    query = f"query({declarations}) {{ {searches} }}"
+    variables = {f"q{i}": f"{email} in:email" for i, email in enumerate(emails)}
 
-    if not interactive:
+    try:
+        data = get_transport().graphql(query, variables)
+    except TransportError as e:
+        logging.warning(f"Batched GitHub handle lookup failed: {e}")
         return None
 
-    print_colored(f"Could not resolve GitHub username for: {email}", "yellow")
-    # Note: In Raycast mode, input() will fail or hang. We should avoid it.
-    return None
+    handles: dict[str, Optional[str]] = {}
+    for i, email in enumerate(emails):
+        nodes = (data.get(f"u{i}") or {}).get("nodes") or []
+        login = nodes[0].get("login") if nodes and isinstance(nodes[0], dict) else None
+        handles[email] = login if isinstance(login, str) and login else None
+    return handles
+
+
+def _load_identity_cache() -> dict:
+    cached = read_cache(IDENTITY_CACHE_NAMESPACE, IDENTITY_CACHE_KEY)
+    return cached if isinstance(cached, dict) else {}
+
+
+def _cached_handle(entry: object, now: float) -> tuple[bool, Optional[str]]:
+    """Return (hit, handle) for a cache entry, honouring positive/negative TTLs."""
+    if not isinstance(entry, dict):
+        return False, None
+    login = entry.get("login")
+    resolved_at = entry.get("resolved_at")
+    if not isinstance(resolved_at, (int, float)):
+        return False, None
+    ttl = IDENTITY_TTL_SECONDS if login else IDENTITY_NEGATIVE_TTL_SECONDS
+    if now - resolved_at > ttl:
+        return False, None
+    return True, login if isinstance(login, str) else None
+
+
+def resolve_handles(
+    git_identities: list[str], interactive: bool = True
+) -> dict[str, Optional[str]]:
+    """
+    Resolve several 'Name <email>' identities to GitHub usernames at once.
+    Lookup order: github_user_map in the config, the on-disk identity cache
+    (misses are cached too, for a shorter time), then a single batched
+    GraphQL search for everything that is left.
+    """
+    handles: dict[str, Optional[str]] = {}
+    emails: dict[str, str] = {}
+    for identity in git_identities:
+        email = _extract_email(identity)
+        if email:
+            emails[identity] = email
+        else:
+            handles[identity] = identity
+
+    if not emails:
+        return handles
+
+    user_map = load_config().get("github_user_map", {})
+    cache = _load_identity_cache()
+    now = time.time()
+    resolved: dict[str, Optional[str]] = {}
+    pending: list[str] = []
+    for email in dict.fromkeys(emails.values()):
+        if email in user_map:
+            resolved[email] = user_map[email]
+            continue
+        hit, handle = _cached_handle(cache.get(email), now)
+        if hit:
+            resolved[email] = handle
+        else:
+            pending.append(email)
+
+    if pending:
+        looked_up = _search_handles_batch(pending)
+        if looked_up is None:
+            # Don't cache misses caused by a failed request.
+            looked_up = {email: _search_handle(email) for email in pending}
+            fresh = {email: handle for email, handle in looked_up.items() if handle}
+        else:
+            fresh = looked_up
+        resolved.update(looked_up)
+
+        if fresh:
+            cache = _load_identity_cache()
+            for email, handle in fresh.items():
+                cache[email] = {"login": handle, "resolved_at": now}
+            write_cache(IDENTITY_CACHE_NAMESPACE, IDENTITY_CACHE_KEY, cache)
+
+    for identity, email in emails.items():
+        handle = resolved.get(email)
+        if not handle and interactive:
+            print_colored(f"Could not resolve GitHub username for: {email}", "yellow")
+            # Note: In Raycast mode, input() will fail or hang. We should avoid it.
+        handles[identity] = handle
+    return handles
+
+
+def resolve_handle(git_identity: str, interactive: bool = True) -> Optional[str]:
+    """Resolve 'Name <email>' to GitHub username via config, cache or gh api."""
+    return resolve_handles([git_identity], interactive=interactive).get(git_identity)
 
 
 def create_pr(
@@ -103,72 +277,117 @@ def create_pr(
     reviewers: Optional[list[str]] = None,
     skip_confirm: bool = False,
     draft: bool = False,
+    handles: Optional[dict[str, Optional[str]]] = None,
 ) -> dict:
     """
-    Constructs and executes the gh pr create command.
+    Creates the PR through the configured transport (gh pr create by default).
+    Pass handles from resolve_handles() to reuse one lookup across PRs.
     Returns a dict with 'url', 'error', and 'warnings'.
     """
-    if not shutil.which("gh"):
-        return {"error": "gh CLI not found"}
-
-    cmd = [
-        "gh",
-        "pr",
-        "create",
-        "--base",
-        target,
-        "--head",
-        source,
-        "--title",
-        title,
-        "--body",
-        body,
-    ]
-
-    if draft:
-        cmd.append("--draft")
+    transport = get_transport()
+    if not transport.is_available():
+        return {"error": transport.unavailable_message()}
 
     warnings = []
+    reviewer_handles = []
     if reviewers:
+        if handles is None:
+            handles = resolve_handles(reviewers, interactive=not skip_confirm)
         for r in reviewers:
-            handle = resolve_handle(r, interactive=not skip_confirm)
+            handle = handles.get(r)
             if handle:
-                cmd.extend(["--reviewer", handle])
+                reviewer_handles.append(handle)
             else:
                 warnings.append(f"Could not resolve GitHub handle for: {r}")
 
     try:
-        # Use capture=True and check=True. If error, it raises CalledProcessError.
-        result = run_cmd(cmd, capture=True)
-        pr_url = result.stdout.strip()
-        return {"url": pr_url, "warnings": warnings}
-    except subprocess.CalledProcessError as e:
-        error_msg = e.stderr.strip() or e.stdout.strip() or f"Exit code {e.returncode}"
-        print_colored(f"GH Error: {error_msg}", "red")
-        return {"error": error_msg, "warnings": warnings}
+        pr_url, transport_warnings = transport.create_pr(
+            source, target, title, body, reviewer_handles, draft=draft
+        )
+        return {"url": pr_url, "warnings": warnings + transport_warnings}
+    except TransportError as e:
+        print_colored(f"GH Error: {e}", "red")
+        return {"error": str(e), "warnings": warnings}
     except Exception as e:
         return {"error": str(e), "warnings": warnings}
 
 
+def _filter_ignored(logins: list[str], ignored_authors: Optional[list[str]]) -> list[str]:
+    if not ignored_authors:
+        return logins
+    ignored = [entry.lower() for entry in ignored_authors if entry]
+    return [login for login in logins if not any(term in login.lower() for term in ignored)]
+
+
+def _logins(connection: object) -> tuple[list[str], Optional[str]]:
+    """Return the logins of an assignableUsers page and the cursor of the next one."""
+    if not isinstance(connection, dict):
+        return [], None
+    logins = [
+        node["login"]
+        for node in connection.get("nodes") or []
+        if isinstance(node, dict) and isinstance(node.get("login"), str)
+    ]
+    page_info = connection.get("pageInfo") or {}
+    cursor = page_info.get("endCursor") if page_info.get("hasNextPage") else None
+    return logins, cursor if isinstance(cursor, str) else None
+
+
+def get_repository_metadata(
+    head_branch: str, ignored_authors: Optional[list[str]] = None
+) -> Optional[dict]:
+    """
+    Fetch the viewer login, the assignable users and the open PRs from
+    head_branch with one GraphQL query. Further requests are only made when
+    there is more than one page of assignable users.
+    Returns {"currentUser", "contributors", "openPullRequests"}, or None when
+    the query failed so callers can fall back to the REST lookups.
+    """
+    transport = get_transport()
+    if not transport.is_available():
+        return None
+
+    try:
+        owner, name = get_repo_slug()
+        variables = {"owner": owner, "name": name}
+        data = transport.graphql(METADATA_QUERY, {**variables, "head": head_branch})
+        repository = data.get("repository") or {}
+        users, cursor = _logins(repository.get("assignableUsers"))
+        for _page in range(ASSIGNABLE_USERS_MAX_PAGES - 1):
+            if cursor is None:
+                break
+            page = transport.graphql(ASSIGNABLE_USERS_QUERY, {**variables, "after": cursor})
+            more, cursor = _logins((page.get("repository") or {}).get("assignableUsers"))
+            users.extend(more)
+    except TransportError as e:
+        logging.warning(f"Failed to fetch repository metadata: {e}")
+        return None
+
+    viewer = (data.get("viewer") or {}).get("login")
+    prs = (repository.get("pullRequests") or {}).get("nodes") or []
+    return {
+        "currentUser": viewer if isinstance(viewer, str) else "",
+        "contributors": _filter_ignored(users, ignored_authors),
+        "openPullRequests": _store_open_prs(head_branch, prs),
+    }
+
+
 def get_contributors(ignored_authors: Optional[list[str]] = None) -> list[str]:
     """Fetch list of contributors from GitHub API."""
-    if shutil.which("gh") is None:
+    if not get_transport().is_available():
         return []
 
     try:
-        cmd = ["gh", "api", "repos/:owner/:repo/contributors", "--jq", ".[].login"]
-        result = run_cmd(cmd, capture=True)
-        contributors = [
-            line.strip() for line in result.stdout.splitlines() if line.strip()
-        ]
-        if ignored_authors:
-            ignored = [entry.lower() for entry in ignored_authors if entry]
-            contributors = [
-                contributor
-                for contributor in contributors
-                if not any(term in contributor.lower() for term in ignored)
-            ]
-        return contributors
+        contributors = []
+        for page in iter_api_pages("repos/:owner/:repo/contributors?per_page=100"):
+            if not isinstance(page, list):
+                break
+            contributors.extend(
+                item["login"]
+                for item in page
+                if isinstance(item, dict) and isinstance(item.get("login"), str)
+            )
+        return _filter_ignored(contributors, ignored_authors)
     except Exception as e:
         logging.warning(f"Failed to get contributors: {e}")
         return []
@@ -176,12 +395,13 @@ def get_contributors(ignored_authors: Optional[list[str]] = None) -> list[str]:
 
 def get_current_username() -> str:
     """Get the currently authenticated GitHub username."""
-    if shutil.which("gh") is None:
+    if not get_transport().is_available():
         return ""
     try:
-        cmd = ["gh", "api", "user", "--jq", ".login"]
-        result = run_cmd(cmd, capture=True)
-        return result.stdout.strip()
+        entry = cached_api_get("user")
+        body = entry["body"] if entry else None
+        login = body.get("login") if isinstance(body, dict) else None
+        return login if isinstance(login, str) else ""
     except Exception as e:
         logging.warning(f"Failed to get current username: {e}")
         return ""
@@ -1,56 +1,239 @@
-import argparse
 import json
+import logging
 import sys
+from typing import TYPE_CHECKING, Callable, Optional
 
-from .utils import normalize_jira_link, extract_jira_id
-from .git import (
-    is_git_repo,
-    fetch_latest_branches,
-    get_remote_branches,
-    get_current_branch,
-    get_commits_between,
-    get_changed_files,
-)
-from .github import check_existing_pr, create_pr, get_contributors
-from .config import load_config, save_config
-from .naming import parse_branch_name
-from .templates import PR_TEMPLATE
-from .codeowners import get_owners_for_files
-
-
-def output_git_data(fetch: bool = False) -> None:
-    """Output git/github metadata in JSON for Raycast."""
-    if not is_git_repo():
-        sys.stdout.write(json.dumps({"error": "Not a git repository."}) + "\n")
-        return
+from .tracing import enable as enable_tracing, summary as timings_summary, traced
+
+if TYPE_CHECKING:
+    import argparse
+
+# Everything but JSON output and tracing is imported inside the modes that
+# use it: every Raycast interaction that misses the warm server spawns the
+# engine, and a mode such as --save-reviewers should not pay for git,
+# subprocess, GitHub or argparse. main() dispatches --save-reviewers before
+# the full parser is even built.
+
+# Upper bound on targets processed at once; each pipeline mostly waits on gh.
+MAX_PARALLEL_TARGETS = 4
+# Upper bound on repositories read at once by --get-repos-data.
+MAX_PARALLEL_REPOS = 8
+# How stale the open-PR listing shown in previews may be. Previews never
+# ask GitHub themselves; get-data and headless runs refresh the listing.
+PREVIEW_OPEN_PRS_MAX_AGE = 10 * 60
+
+
+# Receives progress events from create_prs(), possibly from worker threads.
+ProgressCallback = Callable[[dict], None]
+
+
+# Set by --timings: mode results then carry a summary of the recorded spans.
+_include_timings = False
+
+
+def _write_json(payload: dict) -> None:
+    sys.stdout.write(json.dumps(payload) + "\n")
+
+
+def _write_result(payload: dict) -> None:
+    """Write a mode's result, with the tracing summary when --timings is set."""
+    if _include_timings:
+        payload = {**payload, "timings": timings_summary()}
+    _write_json(payload)
 
-    if fetch:
-        fetch_latest_branches()
-    current_branch = get_current_branch()
-    remote_branches = get_remote_branches()
-    tickets_auto, title_auto = parse_branch_name(current_branch)
+
+@traced("get-data")
+def get_git_data(
+    contributors: Optional[list[str]] = None,
+    graphql: bool = False,
+    branch_prefix: Optional[str] = None,
+    branch_limit: Optional[int] = None,
+) -> dict:
+    """
+    Collect git/github metadata for Raycast from the local refs; it never
+    fetches (output_git_data and the server revalidate separately).
+    Pass ``contributors`` to reuse a previously fetched list instead of
+    querying GitHub again. With ``graphql`` all GitHub metadata (viewer,
+    assignable users, open PRs from the current branch) comes from a single
+    GraphQL query that runs while the local git work is done.
+    ``branch_prefix`` and ``branch_limit`` bound the remoteBranches list
+    (remoteBranchCount has the full count); releaseIndex is always built
+    from every branch, with at most ``branch_limit`` versions.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .config import load_config
+    from .git import get_current_branch, get_remote_branches, is_git_repo
+    from .github import get_contributors, get_repository_metadata
+    from .naming import parse_branch_name
+    from .releases import PINNED_BRANCHES, build_release_index, get_branch_index
+
+    if not is_git_repo():
+        return {"error": "Not a git repository."}
 
     config = load_config()
     personalized_reviewers = config.get("personalized_reviewers", [])
     ignored_authors = config.get("ignored_authors", [])
 
+    current_branch = get_current_branch()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        metadata = (
+            executor.submit(get_repository_metadata, current_branch, ignored_authors)
+            if graphql
+            else None
+        )
+        remote_branches = get_remote_branches()
+        tickets_auto, title_auto = parse_branch_name(current_branch)
+        github_data = metadata.result() if metadata else None
+
+    default_target = config.get("default_target_branch", "main")
     data = {
         "currentBranch": current_branch,
-        "remoteBranches": remote_branches,
-        "contributors": get_contributors(ignored_authors),
+        "remoteBranches": get_branch_index(remote_branches).search(
+            branch_prefix or "", branch_limit, pinned=(default_target, *PINNED_BRANCHES)
+        ),
+        "remoteBranchCount": len(remote_branches),
+        "releaseIndex": build_release_index(remote_branches, branch_limit),
+        "contributors": contributors,
         "suggestedTickets": tickets_auto,
         "suggestedTitle": title_auto,
         "personalizedReviewers": personalized_reviewers,
-        "defaultTargetBranch": config.get("default_target_branch", "main"),
+        "defaultTargetBranch": default_target,
     }
-    sys.stdout.write(json.dumps(data) + "\n")
+    if github_data is not None:
+        data.update(github_data)
+    elif data["contributors"] is None:
+        data["contributors"] = get_contributors(ignored_authors)
+    return data
+
+
+def output_git_data(
+    fetch: bool = False,
+    graphql: bool = False,
+    branch_prefix: Optional[str] = None,
+    branch_limit: Optional[int] = None,
+) -> None:
+    """
+    Output git/github metadata as NDJSON for Raycast.
+    With ``fetch`` this is stale-while-revalidate: the locally known branches
+    are printed straight away with ``"revalidating": true``, then a full
+    fetch runs and a second, final payload follows only if it changed any
+    remote-tracking ref. The fetch is skipped when a full fetch ran within
+    ``fetch_max_age_seconds``, so reopening the form does not fetch again.
+    """
+    from .config import load_config
+    from .git import fetch_and_detect_changes, full_fetch_is_fresh
+
+    branch_options = {"branch_prefix": branch_prefix, "branch_limit": branch_limit}
+    data = get_git_data(graphql=graphql, **branch_options)
+    if (
+        not fetch
+        or "error" in data
+        or full_fetch_is_fresh(load_config().get("fetch_max_age_seconds", 0))
+    ):
+        _write_result(data)
+        return
+
+    _write_result({**data, "revalidating": True})
+    sys.stdout.flush()
+    if fetch_and_detect_changes():
+        # GitHub metadata does not depend on the fetch; only git data is re-read.
+        refreshed = get_git_data(contributors=data["contributors"], **branch_options)
+        _write_result({**data, **refreshed, "revalidating": False})
+
+
+@traced("get-branches")
+def get_branches_data(prefix: Optional[str] = None, limit: Optional[int] = None) -> dict:
+    """Remote branches matching prefix, for autocomplete, at most limit of them."""
+    from .git import get_remote_branches, is_git_repo
+    from .releases import get_branch_index
+
+    if not is_git_repo():
+        return {"error": "Not a git repository."}
+    matches = get_branch_index(get_remote_branches()).search(prefix or "")
+    return {"branches": matches[:limit], "matchCount": len(matches)}
+
+
+def _repo_summary(
+    repo_path: str, default_target: str, branch_limit: Optional[int]
+) -> dict:
+    """Branch data of one repository, read via cwd without changing directory."""
+    import os
+
+    from .git import get_current_branch, get_remote_branches
+    from .releases import PINNED_BRANCHES, BranchIndex
+
+    is_valid, error_msg = _validate_repo_path(repo_path)
+    if not is_valid:
+        return {"repoPath": repo_path, "error": f"Invalid repository path: {error_msg}"}
+
+    cwd = os.path.realpath(repo_path)
+    remote_branches = get_remote_branches(cwd)
+    return {
+        "repoPath": repo_path,
+        "currentBranch": get_current_branch(cwd),
+        # A fresh index: the shared one only pays off for repeated queries on one repo.
+        "remoteBranches": BranchIndex(remote_branches).search(
+            "", branch_limit, pinned=(default_target, *PINNED_BRANCHES)
+        ),
+        "remoteBranchCount": len(remote_branches),
+        "defaultTargetBranch": default_target,
+    }
+
+
+@traced("get-repos-data")
+def get_repos_data(
+    repo_paths: list[str],
+    branch_limit: Optional[int] = None,
+    on_event: Optional[ProgressCallback] = None,
+) -> dict:
+    """
+    Read the current branch, remote branches and default target of several
+    repositories concurrently. Each repository is reported to ``on_event``
+    as a ``repo-data`` event as soon as it is read (with ``error`` instead
+    of the branch data when it cannot be); the returned summary counts them.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    from .config import load_config
+
+    paths = list(dict.fromkeys(repo_paths))
+    if not paths:
+        return {"success": True, "repoCount": 0, "errorCount": 0}
+
+    default_target = load_config().get("default_target_branch", "main")
+    errors = 0
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_REPOS, len(paths))) as executor:
+        futures = {
+            executor.submit(_repo_summary, path, default_target, branch_limit): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                logging.warning(f"Failed to read repository {path}: {exc}")
+                result = {"repoPath": path, "error": str(exc)}
+            errors += "error" in result
+            if on_event:
+                on_event({"event": "repo-data", **result})
+    return {"success": errors == 0, "repoCount": len(paths), "errorCount": errors}
 
 
 def build_description_for_targets(source: str, targets: list[str]) -> str:
     """Build a commit-based description for one or more targets."""
+    from .git import get_commits_for_targets
+
+    commits_by_target = get_commits_for_targets(targets, source) if targets else {}
+    return format_description(targets, commits_by_target)
+
+
+def format_description(targets: list[str], commits_by_target: dict[str, list[str]]) -> str:
+    """Render commit subjects per target as the PR description."""
     descriptions = []
     for target in targets:
-        commits = get_commits_between(target, source)
+        commits = commits_by_target.get(target, [])
         if len(targets) == 1:
             descriptions.append("\n".join([f"- {c}" for c in commits]))
         else:
@@ -64,15 +247,49 @@ def build_description_for_targets(source: str, targets: list[str]) -> str:
     return "\n\n".join(descriptions) if descriptions else "None"
 
 
+@traced("get-description")
+def get_description_data(source: str, targets: list[str]) -> dict:
+    """Build the commit-based description payload for Raycast."""
+    if not targets or not source:
+        return {"error": "Source/Target required"}
+    return {"description": build_description_for_targets(source, targets)}
+
+
 def output_description(source: str, targets: list[str]) -> None:
     """Output commit-based description in JSON for Raycast."""
-    description = build_description_for_targets(source, targets)
-    sys.stdout.write(json.dumps({"description": description}) + "\n")
-
+    _write_result(get_description_data(source, targets))
+
+
+@traced("headless")
+def create_prs(
+    args: "argparse.Namespace", on_event: Optional[ProgressCallback] = None
+) -> dict:
+    """
+    Create one PR per target and return the results payload.
+    ``on_event`` is called once per phase and target: ``fetch-done``,
+    ``description-built``, ``duplicate-check``, ``pr-created`` and
+    ``target-error``; every event has an ``event`` key.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .config import load_config
+    from .git import (
+        fetch_branches,
+        fetch_latest_branches,
+        get_commits_for_targets,
+        get_current_branch,
+        get_ref_snapshot,
+    )
+    from .github import (
+        check_existing_pr,
+        create_pr,
+        forget_open_prs,
+        get_open_prs_for_head,
+        resolve_handles,
+    )
+    from .templates import PR_TEMPLATE
+    from .utils import extract_jira_id, normalize_jira_link
 
-def run_headless(args: argparse.Namespace) -> None:
-    """Execute PR creation without interaction."""
-    fetch_latest_branches()
     source = args.source or get_current_branch()
     targets = args.target or []
     title_base = args.title or ""
@@ -81,10 +298,21 @@ def run_headless(args: argparse.Namespace) -> None:
     tickets = args.tickets or []
 
     if not targets:
-        sys.stdout.write(json.dumps({"error": "No target branches specified"}) + "\n")
-        return
+        return {"error": "No target branches specified"}
+
+    def emit(event: str, **fields: object) -> None:
+        if on_event is not None:
+            on_event({"event": event, **fields})
 
     config = load_config()
+    if args.full_fetch:
+        fetch_latest_branches()
+        fetched = True
+    else:
+        fetched = fetch_branches(
+            [source, *targets], max_age=config.get("fetch_max_age_seconds", 0)
+        )
+    emit("fetch-done", fetched=fetched)
     jira_base_url = config.get(
         "jira_base_url", "https://qualitytrade.atlassian.net/browse/"
     )
@@ -95,24 +323,18 @@ def run_headless(args: argparse.Namespace) -> None:
     valid_ticket_ids = [extract_jira_id(tid) for tid in tickets if extract_jira_id(tid)]
     ticket_prefix = "".join([f"[{tid}]" for tid in valid_ticket_ids])
 
-    results = []
-    for target in targets:
-        title_part = f"[{title_base}]" if title_base else ""
+    title_part = f"[{title_base}]" if title_base else ""
+
+    def process_target(target: str) -> dict:
         final_title = f"{ticket_prefix}{title_part}[{source}] -> [{target}]"
-        body_description = description or build_description_for_targets(
-            source, [target]
-        )
+        body_description = description or format_description([target], commits_by_target)
         body = PR_TEMPLATE.format(tickets=jira_section, description=body_description)
+        emit("description-built", target=target)
 
-        try:
-            if check_existing_pr(source, target):
-                results.append(
-                    {"target": target, "skipped": True, "reason": "PR already exists"}
-                )
-                continue
-        except Exception as exc:
-            results.append({"target": target, "error": str(exc)})
-            continue
+        exists = check_existing_pr(source, target, open_prs=open_prs)
+        emit("duplicate-check", target=target, exists=exists)
+        if exists:
+            return {"target": target, "skipped": True, "reason": "PR already exists"}
 
         res = create_pr(
             source,
@@ -122,24 +344,95 @@ def run_headless(args: argparse.Namespace) -> None:
             reviewers,
             skip_confirm=True,
             draft=args.draft,
+            handles=handles,
         )
         if res.get("error"):
-            results.append({"target": target, "error": res.get("error")})
-        else:
-            results.append(
-                {
-                    "target": target,
-                    "url": res.get("url"),
-                    "warnings": res.get("warnings", []),
-                }
-            )
+            return {"target": target, "error": res.get("error")}
+        result = {
+            "target": target,
+            "url": res.get("url"),
+            "warnings": res.get("warnings", []),
+        }
+        emit("pr-created", **result)
+        return result
+
+    def isolated(target: str) -> dict:
+        try:
+            result = process_target(target)
+        except Exception as exc:
+            result = {"target": target, "error": str(exc)}
+        if "error" in result:
+            emit("target-error", **result)
+        return result
+
+    # Resolve refs, commits and reviewer handles once up front instead of
+    # per target; one graph walk covers every target's description.
+    get_ref_snapshot()
+    commits_by_target = {} if description else get_commits_for_targets(targets, source)
+    handles = resolve_handles(reviewers, interactive=False) if reviewers else {}
+    try:
+        open_prs: Optional[dict[str, dict]] = get_open_prs_for_head(source)
+    except Exception:
+        # Let each target retry and report the failure on its own.
+        open_prs = None
+    workers = min(MAX_PARALLEL_TARGETS, len(targets))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # map() keeps results in target order regardless of completion order.
+        results = list(executor.map(isolated, targets))
+
+    if any("url" in result for result in results):
+        forget_open_prs(source)
 
     success = not any("error" in result for result in results)
-    sys.stdout.write(json.dumps({"success": success, "results": results}) + "\n")
+    return {"success": success, "results": results}
 
 
-def output_preview(args: argparse.Namespace) -> None:
-    """Output PR preview based on inputs."""
+def run_headless(args: "argparse.Namespace") -> None:
+    """
+    Execute PR creation without interaction.
+    With --stream every progress event is printed as its own NDJSON line as
+    it happens, so partial results survive a caller's timeout; the summary
+    is always the last line.
+    """
+    import threading
+
+    lock = threading.Lock()
+
+    def print_event(event: dict) -> None:
+        with lock:
+            _write_json(event)
+            sys.stdout.flush()
+
+    _write_result(create_prs(args, print_event if args.stream else None))
+
+
+def output_repos_data(repo_paths: list[str], branch_limit: Optional[int] = None) -> None:
+    """Print one repo-data line per repository as it is read, then the summary."""
+
+    def print_event(event: dict) -> None:
+        _write_json(event)
+        sys.stdout.flush()
+
+    _write_result(get_repos_data(repo_paths, branch_limit, print_event))
+
+
+@traced("get-preview")
+def get_preview_data(args: "argparse.Namespace") -> dict:
+    """
+    Build the PR preview payload based on inputs.
+    Git-derived data comes from preview.get_git_stage(), memoised by ref
+    SHAs; everything below it is plain text formatting, so edits to the
+    title, tickets or description do not run git again. Existing PRs come
+    from the cached open-PR listing only, so previews make no requests.
+    """
+    from .codeowners import filter_owners
+    from .config import load_config
+    from .git import get_current_branch
+    from .github import get_cached_open_prs
+    from .preview import get_git_stage
+    from .templates import PR_TEMPLATE
+    from .utils import extract_jira_id, normalize_jira_link
+
     source = args.source or get_current_branch()
     config = load_config()
     target = (
@@ -160,31 +453,47 @@ def output_preview(args: argparse.Namespace) -> None:
     valid_ticket_ids = [extract_jira_id(tid) for tid in tickets if extract_jira_id(tid)]
     ticket_prefix = "".join([f"[{tid}]" for tid in valid_ticket_ids])
 
+    stage = get_git_stage(source, targets)
+
     title_part = f"[{title_base}]" if title_base else ""
     target_label = ", ".join(targets)
     final_title = f"{ticket_prefix}{title_part}[{source}] -> [{target_label}]"
-    final_description = description_base or build_description_for_targets(
-        source, targets
+    final_description = description_base or format_description(
+        targets, stage["commits"]
     )
     final_body = PR_TEMPLATE.format(tickets=jira_section, description=final_description)
 
-    changed_files = []
-    for target_branch in targets:
-        changed_files.extend(get_changed_files(target_branch, source))
-    suggested_reviewers = get_owners_for_files(
-        changed_files, config.get("personalized_reviewers", [])
+    suggested_reviewers = filter_owners(
+        stage["owners"], config.get("personalized_reviewers", [])
     )
 
-    sys.stdout.write(
-        json.dumps(
-            {
-                "title": final_title,
-                "body": final_body,
-                "suggestedReviewers": suggested_reviewers,
-            }
-        )
-        + "\n"
-    )
+    # Cache only: a gh round trip per keystroke would dominate the preview.
+    open_prs = get_cached_open_prs(source, PREVIEW_OPEN_PRS_MAX_AGE) or {}
+
+    return {
+        "title": final_title,
+        "body": final_body,
+        "suggestedReviewers": suggested_reviewers,
+        "existingPullRequests": {
+            target_branch: open_prs[target_branch]["url"]
+            for target_branch in targets
+            if target_branch in open_prs
+        },
+    }
+
+
+def output_preview(args: "argparse.Namespace") -> None:
+    """Output PR preview based on inputs."""
+    _write_result(get_preview_data(args))
+
+
+@traced("save-reviewers")
+def save_reviewers(reviewers: list[str]) -> dict:
+    """Persist the personalized reviewers list."""
+    from .config import save_config
+
+    save_config({"personalized_reviewers": reviewers})
+    return {"success": True}
 
 
 def _validate_repo_path(repo_path: str) -> tuple[bool, str]:
@@ -210,17 +519,78 @@ def _validate_repo_path(repo_path: str) -> tuple[bool, str]:
     return True, ""
 
 
-def main() -> None:
+def _positive_int(value: str) -> int:
+    import argparse
+
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
+def build_parser() -> "argparse.ArgumentParser":
+    import argparse
+
     parser = argparse.ArgumentParser(description="QualityTrade PR Creator")
     parser.add_argument("--headless", action="store_true")
     parser.add_argument("--get-data", action="store_true")
+    parser.add_argument(
+        "--get-branches",
+        action="store_true",
+        help="List remote branches for autocomplete (with --branch-prefix/--branch-limit)",
+    )
+    parser.add_argument(
+        "--get-repos-data",
+        action="store_true",
+        help="Print branch data of every --repos repository as NDJSON, then a summary",
+    )
     parser.add_argument("--get-description", action="store_true")
     parser.add_argument("--get-preview", action="store_true")
     parser.add_argument("--save-reviewers", action="store_true")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve newline-delimited JSON-RPC requests on stdin/stdout",
+    )
     parser.add_argument(
         "--fetch", action="store_true", help="Fetch latest branches from remote"
     )
+    parser.add_argument(
+        "--full-fetch",
+        action="store_true",
+        help="With --headless, fetch and prune every remote instead of only the PR branches",
+    )
     parser.add_argument("--draft", action="store_true", help="Create PR as draft")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="With --headless, print NDJSON progress events before the summary",
+    )
+    parser.add_argument(
+        "--graphql",
+        action="store_true",
+        help="With --get-data, fetch all GitHub metadata in one GraphQL query",
+    )
+    parser.add_argument(
+        "--branch-prefix",
+        help=(
+            "With --get-data/--get-branches, only list branches whose name "
+            "or a path segment starts with this"
+        ),
+    )
+    parser.add_argument(
+        "--branch-limit",
+        type=_positive_int,
+        help=(
+            "With --get-data/--get-branches, list at most this many branches "
+            "(and release versions)"
+        ),
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Add a summary of git/gh calls and their durations to the JSON output",
+    )
 
     parser.add_argument("--source")
     parser.add_argument("--target", action="append")
@@ -228,43 +598,106 @@ def main() -> None:
     parser.add_argument("--body")
     parser.add_argument("--reviewers", action="append")
     parser.add_argument("--tickets", action="append")
+    parser.add_argument(
+        "--repos", action="append", help="With --get-repos-data, a repository to read"
+    )
     parser.add_argument(
         "repo_path", nargs="?", help="Optional path to the git repository"
     )
+    return parser
+
+
+def _parse_save_reviewers(argv: list[str]) -> Optional[tuple[list[str], bool, Optional[str]]]:
+    """
+    Parse the arguments Raycast passes with --save-reviewers without
+    argparse: (reviewers, timings, repo_path). Returns None for anything
+    else, which is left to the full parser, errors included.
+    """
+    if "--save-reviewers" not in argv:
+        return None
+
+    reviewers: list[str] = []
+    timings = False
+    repo_path: Optional[str] = None
+    tokens = iter(argv)
+    for token in tokens:
+        if token == "--save-reviewers":
+            continue
+        if token == "--timings":
+            timings = True
+        elif token == "--reviewers":
+            value = next(tokens, None)
+            if value is None or value.startswith("-"):
+                return None
+            reviewers.append(value)
+        elif token.startswith("-") or repo_path is not None:
+            return None
+        else:
+            repo_path = token
+    return reviewers, timings, repo_path
 
-    args = parser.parse_args()
 
-    if args.repo_path:
+def _start(timings: bool, repo_path: Optional[str]) -> None:
+    """Turn on --timings and move into the repository, exiting if it is invalid."""
+    global _include_timings
+    if timings:
+        _include_timings = True
+        enable_tracing()
+
+    if repo_path:
         import os
 
-        is_valid, error_msg = _validate_repo_path(args.repo_path)
+        is_valid, error_msg = _validate_repo_path(repo_path)
         if not is_valid:
             sys.stdout.write(
                 json.dumps({"error": f"Invalid repository path: {error_msg}"}) + "\n"
             )
             sys.exit(1)
         try:
-            os.chdir(args.repo_path)
+            os.chdir(repo_path)
         except Exception as e:
             sys.stdout.write(
                 json.dumps({"error": f"Failed to change directory: {str(e)}"}) + "\n"
             )
             sys.exit(1)
 
+
+def main() -> None:
+    quick = _parse_save_reviewers(sys.argv[1:])
+    if quick is not None:
+        reviewers, timings, repo_path = quick
+        _start(timings, repo_path)
+        _write_result(save_reviewers(reviewers))
+        return
+
+    args = build_parser().parse_args()
+    if args.serve:
+        _start(args.timings, None)
+        from .server import serve
+
+        serve()
+        return
+
+    _start(args.timings, args.repo_path)
     if args.get_data:
-        output_git_data(fetch=args.fetch)
+        output_git_data(
+            fetch=args.fetch,
+            graphql=args.graphql,
+            branch_prefix=args.branch_prefix,
+            branch_limit=args.branch_limit,
+        )
+    elif args.get_branches:
+        _write_result(get_branches_data(args.branch_prefix, args.branch_limit))
+    elif args.get_repos_data:
+        output_repos_data(args.repos or [], args.branch_limit)
     elif args.get_description:
-        if not args.target or not args.source:
-            sys.stdout.write(json.dumps({"error": "Source/Target required"}) + "\n")
-        else:
-            output_description(args.source, args.target)
+        output_description(args.source, args.target)
     elif args.get_preview:
         output_preview(args)
     elif args.headless:
         run_headless(args)
     elif args.save_reviewers:
-        save_config({"personalized_reviewers": args.reviewers or []})
-        sys.stdout.write(json.dumps({"success": True}) + "\n")
+        _write_result(save_reviewers(args.reviewers or []))
     else:
         sys.stdout.write(
             json.dumps({"error": "Interactive mode is disabled in Raycast version."})
@@ -0,0 +1,87 @@
+"""
+Git-derived stage of the PR preview.
+
+The frontend asks for a preview on every debounced edit, but title, tickets
+and description never change what git reports. The commits per target and
+the CODEOWNERS owners of the changed files are therefore computed once per
+(source SHA, target SHAs, CODEOWNERS SHA) and kept in memory and on disk;
+rendering the preview from them touches no history, diff or tree.
+"""
+import collections
+import hashlib
+import json
+from typing import Optional
+
+from .cache import read_cache, write_cache
+from .codeowners import get_all_owners, get_codeowners_blob_sha
+from .git import (
+    get_changed_files_for_targets,
+    get_commits_for_targets,
+    resolve_base_ref,
+    resolve_ref,
+)
+from .tracing import traced
+
+CACHE_NAMESPACE = "previews"
+# Bump when the stage contents change so stale entries are ignored.
+CACHE_VERSION = 1
+
+# Stages already computed in this process (the --serve daemon), by key, least
+# recently used first. Bounded because the daemon outlives many branches and
+# repos; evicted stages are still on disk.
+MAX_STAGES = 32
+_stages: collections.OrderedDict[str, dict] = collections.OrderedDict()
+
+
+def _stage_key(source: str, targets: list[str]) -> Optional[str]:
+    source_sha = resolve_ref(source)
+    target_shas = [resolve_base_ref(target) for target in targets]
+    if not source_sha or not all(target_shas):
+        return None
+
+    # GitHub applies the CODEOWNERS file of the base branch; use the first target's.
+    codeowners_sha = get_codeowners_blob_sha(target_shas[0])
+    material = [CACHE_VERSION, source_sha, list(zip(targets, target_shas)), codeowners_sha]
+    return hashlib.sha256(json.dumps(material).encode()).hexdigest()
+
+
+def _remember(key: str, stage: dict) -> None:
+    _stages[key] = stage
+    _stages.move_to_end(key)
+    while len(_stages) > MAX_STAGES:
+        _stages.popitem(last=False)
+
+
+def _is_stage(value: object) -> bool:
+    return (
+        isinstance(value, dict)
+        and isinstance(value.get("commits"), dict)
+        and isinstance(value.get("owners"), list)
+    )
+
+
+@traced("preview-git-stage")
+def get_git_stage(source: str, targets: list[str]) -> dict:
+    """
+    Return {"commits": {target: [subjects]}, "owners": [owners]} for a
+    preview, reusing the stage computed for the same SHAs when there is one.
+    Refs that cannot be resolved are never cached.
+    """
+    key = _stage_key(source, targets)
+    if key is not None:
+        stage = _stages.get(key) or read_cache(CACHE_NAMESPACE, key)
+        if _is_stage(stage):
+            _remember(key, stage)
+            return stage
+
+    stage = {
+        "commits": get_commits_for_targets(targets, source),
+        # Deduplicated across targets so each path is matched against CODEOWNERS once.
+        "owners": get_all_owners(
+            get_changed_files_for_targets(targets, source), ref=targets[0]
+        ),
+    }
+    if key is not None:
+        _remember(key, stage)
+        write_cache(CACHE_NAMESPACE, key, stage)
+    return stage
@@ -0,0 +1,147 @@
+"""
+Release branch index and branch autocomplete.
+
+The frontend used to receive every remote branch and regex-scan and
+natural-sort the whole list on each render to find the release stages.
+The engine now parses the branch list once into:
+
+- release versions (release/x.y.z staging, -a alpha, -b beta), newest
+  first, with the latest branch of each kind and the live branch
+- hotfix parents (hotfix/x) and children (hotfix/x-y)
+- a BranchIndex answering prefix queries by bisection, so the payload can
+  carry a bounded list and the frontend asks for more as the user types
+"""
+import bisect
+import re
+from typing import Iterable, Optional
+
+# Unanchored on the left like the frontend patterns, so "upstream/release/1.2.3" counts.
+RELEASE_BRANCH = re.compile(r"release/(\d+)\.(\d+)\.(\d+)(-a|-b)?$")
+HOTFIX_PREFIX = "hotfix/"
+RELEASE_KINDS = {None: "staging", "-a": "alpha", "-b": "beta"}
+# Branches kept in a truncated list whatever the limit.
+PINNED_BRANCHES = ("develop", "main", "master")
+
+
+class BranchIndex:
+    """
+    Prefix index over branch names. A query matches the start of the full
+    name or of any path segment ("1.2" finds "release/1.2.3"),
+    case-insensitively; full-name matches come first.
+    """
+
+    def __init__(self, branches: list[str]) -> None:
+        self._branches = branches
+        entries = []
+        for name in branches:
+            lowered = name.lower()
+            start = 0
+            while True:
+                entries.append((lowered[start:], name))
+                slash = lowered.find("/", start)
+                if slash == -1:
+                    break
+                start = slash + 1
+        entries.sort()
+        self._keys = [key for key, _name in entries]
+        self._names = [name for _key, name in entries]
+
+    @property
+    def branches(self) -> list[str]:
+        return self._branches
+
+    def search(
+        self, prefix: str = "", limit: Optional[int] = None, pinned: Iterable[str] = ()
+    ) -> list[str]:
+        """
+        Branches matching prefix in branch order (all branches without a
+        prefix), at most limit of them. Pinned branches that exist and match
+        are kept even when the limit would cut them off.
+        """
+        if prefix:
+            query = prefix.lower()
+            matches: dict[str, None] = {}
+            position = bisect.bisect_left(self._keys, query)
+            while position < len(self._keys) and self._keys[position].startswith(query):
+                matches[self._names[position]] = None
+                position += 1
+            found = sorted(matches, key=lambda name: (not name.lower().startswith(query), name))
+        else:
+            found = self._branches
+
+        if limit is None or len(found) <= limit:
+            return list(found)
+        selected = found[:limit]
+        kept = set(selected)
+        matching = set(found)
+        for name in pinned:
+            if name in matching and name not in kept:
+                selected.append(name)
+                kept.add(name)
+        return selected
+
+
+# The last index built; --serve answers autocomplete queries per keystroke
+# against branch lists that rarely change.
+_last_index: Optional[BranchIndex] = None
+
+
+def get_branch_index(branches: list[str]) -> BranchIndex:
+    """Return a BranchIndex for branches, reusing the last one when they are unchanged."""
+    global _last_index
+    index = _last_index
+    if index is None or index.branches != branches:
+        index = _last_index = BranchIndex(branches)
+    return index
+
+
+def build_release_index(branches: list[str], limit: Optional[int] = None) -> dict:
+    """
+    Parse release and hotfix branches. Versions are ordered newest first
+    (numerically, so 1.10.0 > 1.9.0); limit caps the versions and each
+    hotfix list, while "latest" always covers every branch.
+    """
+    versions: dict[str, dict] = {}
+    for name in branches:
+        match = RELEASE_BRANCH.search(name)
+        if not match:
+            continue
+        suffix = match.group(4)
+        staging_name = name[: -len(suffix)] if suffix else name
+        entry = versions.setdefault(
+            staging_name,
+            {
+                "version": ".".join(match.group(1, 2, 3)),
+                "staging": None,
+                "alpha": None,
+                "beta": None,
+                "_key": tuple(int(part) for part in match.group(1, 2, 3)),
+            },
+        )
+        entry[RELEASE_KINDS[suffix]] = name
+
+    ordered = sorted(
+        versions.items(), key=lambda item: (item[1]["_key"], item[0]), reverse=True
+    )
+    entries = [
+        {key: value for key, value in entry.items() if key != "_key"}
+        for _name, entry in ordered
+    ]
+    latest = {
+        kind: next((entry[kind] for entry in entries if entry[kind]), None)
+        for kind in RELEASE_KINDS.values()
+    }
+
+    hotfixes = [name for name in branches if name.startswith(HOTFIX_PREFIX)]
+    parents = [name for name in hotfixes if "-" not in name[len(HOTFIX_PREFIX):]]
+    children = [name for name in hotfixes if "-" in name[len(HOTFIX_PREFIX):]]
+
+    names = set(branches)
+    return {
+        "versions": entries[:limit],
+        "versionCount": len(entries),
+        "latest": latest,
+        "liveBranch": "master" if "main" not in names and "master" in names else "main",
+        "hotfixParents": parents[:limit],
+        "hotfixChildren": children[:limit],
+    }
@@ -0,0 +1,300 @@
+"""
+Long-lived engine server.
+
+Speaks newline-delimited JSON-RPC 2.0 over stdin/stdout so the Raycast
+frontend can keep one warm interpreter for every preview, description and
+data request instead of paying interpreter startup per keystroke.
+
+Request:  {"jsonrpc": "2.0", "id": 1, "method": "get-preview",
+           "params": {"repo_path": "/path", "source": "x", "target": ["y"]}}
+Response: {"jsonrpc": "2.0", "id": 1, "result": {...}}
+
+Params mirror the CLI flags (dashes become underscores, repeatable flags
+are lists). Results are exactly the JSON objects the CLI modes print.
+
+get-data with "fetch" answers from local refs straight away and fetches in
+the background, unless a full fetch ran within fetch_max_age_seconds; when
+the fetch finishes the server sends a notification, and the client
+re-requests get-data if the refs changed:
+
+    {"jsonrpc": "2.0", "method": "refs-updated",
+     "params": {"repo_path": "/path", "changed": true}}
+
+headless with "stream", and get-repos-data always, send each progress
+event as a notification tagged with the request id before the final
+response:
+
+    {"jsonrpc": "2.0", "method": "progress",
+     "params": {"id": 3, "event": "pr-created", "target": "main", "url": "..."}}
+
+Requests are handled one at a time, in the order they arrive: every mode
+runs against process-wide state (the working directory, the ref snapshot,
+the executor's memo), so two cannot safely overlap. A long request such as
+a multi-target headless run therefore delays the previews queued behind
+it; the extension runs headless in a one-shot process for that reason.
+Only background fetches run on their own threads, with an explicit cwd.
+
+"timings": true in any request turns tracing on and adds a "timings"
+summary of the spans recorded while handling it to the result. Background
+fetches running at the same time may show up in it.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+from .executor import get_executor
+from .api_cache import get_ttl_seconds
+from .config import load_config
+from .git import fetch_and_detect_changes, full_fetch_is_fresh, invalidate_ref_snapshot
+from .tracing import enable as enable_tracing, mark, summary as timings_summary
+from .main import (
+    build_parser,
+    _validate_repo_path,
+    get_git_data,
+    get_branches_data,
+    get_description_data,
+    get_preview_data,
+    get_repos_data,
+    create_prs,
+    save_reviewers,
+)
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RepoSession:
+    """Warm per-repository state kept between requests."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.contributors: Optional[list[str]] = None
+        self.contributors_at = 0.0
+
+    def cached_contributors(self) -> Optional[list[str]]:
+        """Contributors read within api_cache_ttl_seconds, like any API response."""
+        if self.contributors is None:
+            return None
+        if time.monotonic() - self.contributors_at >= get_ttl_seconds():
+            return None
+        return self.contributors
+
+    def remember_contributors(self, contributors: list[str]) -> None:
+        self.contributors = contributors
+        self.contributors_at = time.monotonic()
+
+
+Notify = Callable[[str, Dict[str, Any]], None]
+
+
+class EngineServer:
+    """Dispatch JSON-RPC requests to the engine modes."""
+
+    def __init__(self, notify: Optional[Notify] = None) -> None:
+        parser = build_parser()
+        self._defaults = vars(parser.parse_args([]))
+        # Converters of typed options (e.g. --branch-limit), applied to string params.
+        self._types = {
+            action.dest: action.type for action in parser._actions if callable(action.type)
+        }
+        self._sessions: Dict[str, RepoSession] = {}
+        self._notify: Notify = notify or (lambda _method, _params: None)
+        self._revalidating: set[str] = set()
+        self._revalidating_lock = threading.Lock()
+        self._request_id: object = None
+        self._methods: Dict[str, Callable[[argparse.Namespace, Optional[RepoSession]], dict]] = {
+            "get-data": self._get_data,
+            "get-description": self._get_description,
+            "get-branches": lambda args, _session: get_branches_data(
+                args.branch_prefix, args.branch_limit
+            ),
+            "get-preview": lambda args, _session: get_preview_data(args),
+            "headless": self._headless,
+            "get-repos-data": self._get_repos_data,
+            "save-reviewers": lambda args, _session: save_reviewers(args.reviewers or []),
+            "ping": lambda _args, _session: {"success": True},
+        }
+
+    def _get_data(self, args: argparse.Namespace, session: Optional[RepoSession]) -> dict:
+        # The GraphQL variant re-reads contributors in the same round trip anyway.
+        fresh = session is None or args.fetch or args.graphql
+        cached = None if fresh else session.cached_contributors()
+        data = get_git_data(
+            contributors=cached,
+            graphql=args.graphql,
+            branch_prefix=args.branch_prefix,
+            branch_limit=args.branch_limit,
+        )
+        if session is not None and "contributors" in data:
+            session.remember_contributors(data["contributors"])
+        max_age = load_config().get("fetch_max_age_seconds", 0)
+        if args.fetch and "error" not in data and not full_fetch_is_fresh(max_age):
+            self._revalidate(args.repo_path or os.getcwd())
+            data["revalidating"] = True
+        return data
+
+    def _headless(self, args: argparse.Namespace, _session: Optional[RepoSession]) -> dict:
+        if not args.stream:
+            return create_prs(args)
+        request_id = self._request_id
+        return create_prs(
+            args, lambda event: self._notify("progress", {"id": request_id, **event})
+        )
+
+    def _get_repos_data(self, args: argparse.Namespace, _session: Optional[RepoSession]) -> dict:
+        request_id = self._request_id
+        return get_repos_data(
+            args.repos or [],
+            args.branch_limit,
+            lambda event: self._notify("progress", {"id": request_id, **event}),
+        )
+
+    def _revalidate(self, repo_path: str) -> None:
+        """Fetch in the background and notify the client when it is done."""
+        path = os.path.realpath(repo_path)
+        with self._revalidating_lock:
+            if path in self._revalidating:
+                return
+            self._revalidating.add(path)
+
+        def run() -> None:
+            changed = False
+            try:
+                changed = fetch_and_detect_changes(cwd=path)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(path)
+            # Echo the path as the client sent it so it can match its request.
+            self._notify("refs-updated", {"repo_path": repo_path, "changed": changed})
+
+        threading.Thread(target=run, name=f"revalidate:{path}", daemon=True).start()
+
+    def _get_description(self, args: argparse.Namespace, _session: Optional[RepoSession]) -> dict:
+        return get_description_data(args.source, args.target)
+
+    def _build_args(self, params: Dict[str, Any]) -> argparse.Namespace:
+        merged = dict(self._defaults)
+        for key, value in params.items():
+            key = key.replace("-", "_")
+            if key not in merged:
+                raise ValueError(f"Unknown parameter: {key}")
+            convert = self._types.get(key)
+            if convert is not None and isinstance(value, str):
+                try:
+                    value = convert(value)
+                except (TypeError, ValueError, argparse.ArgumentTypeError) as exc:
+                    raise ValueError(f"Invalid value for {key}: {exc}") from exc
+            merged[key] = value
+        return argparse.Namespace(**merged)
+
+    def _enter_repo(self, repo_path: Optional[str]) -> Optional[RepoSession]:
+        if not repo_path:
+            return None
+
+        resolved = os.path.realpath(repo_path)
+        session = self._sessions.get(resolved)
+        if session is None:
+            is_valid, error_msg = _validate_repo_path(repo_path)
+            if not is_valid:
+                raise ValueError(f"Invalid repository path: {error_msg}")
+            session = RepoSession(resolved)
+            self._sessions[resolved] = session
+
+        os.chdir(session.path)
+        return session
+
+    def handle(self, request: object) -> Optional[dict]:
+        """Handle one decoded request. Notifications (no id) get no response."""
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _error_response(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        handler = self._methods.get(request["method"])
+        if handler is None:
+            return _error_response(
+                request_id, METHOD_NOT_FOUND, f"Unknown method: {request['method']}"
+            )
+
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            return _error_response(request_id, INVALID_PARAMS, "Params must be an object")
+
+        try:
+            args = self._build_args(params)
+            session = self._enter_repo(args.repo_path)
+        except ValueError as exc:
+            return _error_response(request_id, INVALID_PARAMS, str(exc))
+
+        # Refs may have moved since the last request, and memoised git/gh
+        # results only hold for one invocation.
+        invalidate_ref_snapshot()
+        get_executor().reset()
+        self._request_id = request_id
+        if args.timings:
+            enable_tracing()
+        since = mark()
+        try:
+            result = handler(args, session)
+        except Exception as exc:
+            traceback.print_exc()
+            result = {"error": f"Unexpected error: {exc}"}
+        if args.timings:
+            result = {**result, "timings": timings_summary(since)}
+
+        if request_id is None:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def _error_response(request_id: object, code: int, message: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message},
+    }
+
+
+def serve() -> None:
+    """
+    Serve requests from stdin until it is closed, one at a time (see the
+    module docstring).
+    """
+    write_lock = threading.Lock()
+
+    def send(message: dict) -> None:
+        # Background revalidations write notifications from their own threads.
+        with write_lock:
+            sys.stdout.write(json.dumps(message) + "\n")
+            sys.stdout.flush()
+
+    def notify(method: str, params: Dict[str, Any]) -> None:
+        send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    server = EngineServer(notify)
+    logging.info("PR engine server ready.")
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as exc:
+            response: Optional[dict] = _error_response(None, PARSE_ERROR, str(exc))
+        else:
+            response = server.handle(request)
+
+        if response is not None:
+            send(response)
@@ -0,0 +1,212 @@
+"""
+Lightweight span tracing for the engine.
+
+Almost all engine time is spent in git and gh subprocesses, so run_cmd,
+HTTP transport requests, cat-file coprocess requests and the mode
+functions record spans (name, duration, thread and details such as
+the command line, exit code and output size). Recording is off unless:
+
+- --timings (or "timings" in a --serve request) is given, which embeds
+  summary() in the JSON response, or
+- PR_CREATOR_TRACE names a file, which receives a Chrome trace-event dump
+  (chrome://tracing, Perfetto) when the process exits.
+
+Spans live in a bounded buffer so a long-running --serve daemon with
+tracing on does not grow without limit.
+"""
+import atexit
+import collections
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+TRACE_ENV = "PR_CREATOR_TRACE"
+MAX_SPANS = 50_000
+SLOWEST_COMMANDS = 10
+MAX_COMMAND_LENGTH = 300
+
+SUBPROCESS = "subprocess"
+HTTP = "http"
+# Requests answered by a long-lived coprocess (git cat-file --batch).
+PIPE = "pipe"
+# Commands answered by the executor without spawning a process.
+MEMO = "memo"
+MODE = "mode"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_origin = time.perf_counter()
+# Resolved now: modes chdir into the repository before the trace is written.
+_trace_path = os.path.abspath(os.environ[TRACE_ENV]) if os.environ.get(TRACE_ENV) else None
+_enabled = _trace_path is not None
+_spans: collections.deque = collections.deque(maxlen=MAX_SPANS)
+_sequence = 0
+_lock = threading.Lock()
+
+
+def enable() -> None:
+    """Start recording spans (no-op when already enabled)."""
+    global _enabled
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def mark() -> int:
+    """Return a marker; summary(since=marker) only covers later spans."""
+    return _sequence
+
+
+def command_label(cmd: list[str]) -> str:
+    """Group commands by program and subcommand, e.g. "git log" or "gh api"."""
+    program = os.path.basename(cmd[0]) if cmd else "?"
+    subcommand = next((arg for arg in cmd[1:] if not arg.startswith("-")), "")
+    return f"{program} {subcommand}".strip()
+
+
+def format_command(cmd: list[str]) -> str:
+    text = " ".join(cmd)
+    if len(text) > MAX_COMMAND_LENGTH:
+        text = text[: MAX_COMMAND_LENGTH - 3] + "..."
+    return text
+
+
+@contextmanager
+def span(name: str, category: str = MODE, **details: Any) -> Iterator[dict]:
+    """
+    Record the enclosed block as a span. The yielded dict holds the span's
+    details; callers may add to it (e.g. the exit code) before the block ends.
+    """
+    global _sequence
+    if not _enabled:
+        yield details
+        return
+
+    started = time.perf_counter()
+    try:
+        yield details
+    finally:
+        ended = time.perf_counter()
+        thread = threading.current_thread()
+        with _lock:
+            _sequence += 1
+            _spans.append(
+                {
+                    "seq": _sequence,
+                    "name": name,
+                    "cat": category,
+                    "start": started - _origin,
+                    "dur": ended - started,
+                    "tid": thread.ident,
+                    "thread": thread.name,
+                    "args": details,
+                }
+            )
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator recording each call of a mode function as a span."""
+
+    def decorate(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def _spans_since(since: int) -> list[dict]:
+    with _lock:
+        return [entry for entry in _spans if entry["seq"] > since]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def summary(since: int = 0) -> dict:
+    """
+    Summarise the spans recorded after the marker: time per mode, subprocess
+    and HTTP time grouped by command, and the slowest individual calls.
+    Call time can exceed wall time when calls ran in parallel.
+    """
+    spans = _spans_since(since)
+    commands = [entry for entry in spans if entry["cat"] in (SUBPROCESS, HTTP, PIPE)]
+
+    by_command: dict[str, dict] = {}
+    for entry in commands:
+        group = by_command.setdefault(entry["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        group["count"] += 1
+        group["total_ms"] += entry["dur"] * 1000
+        group["max_ms"] = max(group["max_ms"], entry["dur"] * 1000)
+    for group in by_command.values():
+        group["total_ms"] = round(group["total_ms"], 1)
+        group["max_ms"] = round(group["max_ms"], 1)
+
+    # The CLI reports time since startup; a --serve request since its first span.
+    started = _origin if since == 0 or not spans else min(entry["start"] for entry in spans) + _origin
+    slowest = sorted(commands, key=lambda entry: entry["dur"], reverse=True)[:SLOWEST_COMMANDS]
+    return {
+        "elapsed_ms": _ms(time.perf_counter() - started),
+        "modes": [
+            {"name": entry["name"], "ms": _ms(entry["dur"])}
+            for entry in spans
+            if entry["cat"] == MODE
+        ],
+        "subprocess_count": sum(1 for entry in commands if entry["cat"] == SUBPROCESS),
+        "subprocess_ms": _ms(sum(e["dur"] for e in commands if e["cat"] == SUBPROCESS)),
+        "http_ms": _ms(sum(e["dur"] for e in commands if e["cat"] == HTTP)),
+        "pipe_count": sum(1 for entry in commands if entry["cat"] == PIPE),
+        "pipe_ms": _ms(sum(e["dur"] for e in commands if e["cat"] == PIPE)),
+        "reused_count": sum(1 for entry in spans if entry["cat"] == MEMO),
+        "commands": dict(
+            sorted(by_command.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        ),
+        "slowest": [{"ms": _ms(entry["dur"]), **entry["args"]} for entry in slowest],
+    }
+
+
+def chrome_trace() -> dict:
+    """Return all recorded spans in Chrome trace-event format."""
+    pid = os.getpid()
+    spans = _spans_since(0)
+    events: list[dict] = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        for tid, name in {entry["tid"]: entry["thread"] for entry in spans}.items()
+    ]
+    for entry in spans:
+        events.append(
+            {
+                "name": entry["name"],
+                "cat": entry["cat"],
+                "ph": "X",
+                "ts": round(entry["start"] * 1_000_000),
+                "dur": round(entry["dur"] * 1_000_000),
+                "pid": pid,
+                "tid": entry["tid"],
+                "args": entry["args"],
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path: str) -> None:
+    try:
+        with open(path, "w", encoding="utf-8") as file_handle:
+            json.dump(chrome_trace(), file_handle)
+    except OSError as exc:
+        logging.warning(f"Failed to write trace to {path}: {exc}")
+
+
+if _trace_path:
+    atexit.register(write_chrome_trace, _trace_path)
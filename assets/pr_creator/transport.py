@@ -0,0 +1,419 @@
+"""
+Pluggable GitHub transports.
+
+GhCliTransport shells out to the gh binary and is the default.
+HttpTransport talks to the REST/GraphQL API directly over a pool of
+keep-alive connections, using the token from `gh auth token`, which saves
+a fork, gh's startup and a TLS handshake per call. Select it with
+"github_transport": "http" in the config or PR_CREATOR_GITHUB_TRANSPORT=http;
+PR_CREATOR_GITHUB_API_URL points it at another server (GitHub Enterprise or
+a local stand-in for testing).
+"""
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+from typing import TYPE_CHECKING, Any, Optional, Union
+from urllib.parse import quote, urlsplit
+
+from .config import load_config
+from .tracing import HTTP, span
+from .utils import run_cmd
+
+if TYPE_CHECKING:
+    import http.client
+
+TRANSPORT_ENV = "PR_CREATOR_GITHUB_TRANSPORT"
+API_URL_ENV = "PR_CREATOR_GITHUB_API_URL"
+DEFAULT_API_URL = "https://api.github.com"
+HTTP_TIMEOUT_SECONDS = 30
+POOL_SIZE = 4
+
+_PLACEHOLDER = re.compile(r":(owner|repo)\b|\{(owner|repo)\}")
+_REMOTE_SLUG = re.compile(r"[:/]([^/:]+)/([^/]+?)(?:\.git)?/?$")
+
+# Origin (owner, repo) per working directory.
+_slugs: dict[str, tuple[str, str]] = {}
+
+
+class TransportError(RuntimeError):
+    """A GitHub request failed; the message is suitable for the user."""
+
+
+class ApiResponse:
+    def __init__(self, status: int, headers: dict[str, str], body: str) -> None:
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else None
+
+
+def _error_message(exc: subprocess.CalledProcessError) -> str:
+    return exc.stderr.strip() or exc.stdout.strip() or f"Exit code {exc.returncode}"
+
+
+def _parse_included_response(output: str) -> Optional[ApiResponse]:
+    """Split `gh api --include` output into status, headers and body."""
+    normalized = output.replace("\r\n", "\n")
+    head, _, body = normalized.partition("\n\n")
+    lines = head.split("\n")
+    status_match = re.match(r"HTTP/\S+\s+(\d{3})", lines[0]) if lines else None
+    if not status_match:
+        return None
+
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return ApiResponse(int(status_match.group(1)), headers, body)
+
+
+def get_repo_slug() -> tuple[str, str]:
+    """Return (owner, repo) for the origin remote of the current repository."""
+    cwd = os.getcwd()
+    if cwd not in _slugs:
+        try:
+            result = run_cmd(["git", "remote", "get-url", "origin"], capture=True)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            raise TransportError("Could not determine the GitHub repository") from exc
+        match = _REMOTE_SLUG.search(result.stdout.strip())
+        if not match:
+            raise TransportError(f"Unrecognised origin URL: {result.stdout.strip()}")
+        _slugs[cwd] = (match.group(1), match.group(2))
+    return _slugs[cwd]
+
+
+def _graphql_data(payload: Any) -> dict:
+    if not isinstance(payload, dict):
+        raise TransportError("Unexpected GraphQL response")
+    data = payload.get("data")
+    if not isinstance(data, dict):
+        errors = payload.get("errors") or [{"message": "No data returned"}]
+        raise TransportError(
+            "; ".join(str(error.get("message", error)) for error in errors)
+        )
+    return data
+
+
+class GhCliTransport:
+    """Run every request through the gh binary."""
+
+    name = "gh"
+
+    def is_available(self) -> bool:
+        return shutil.which("gh") is not None
+
+    def unavailable_message(self) -> str:
+        return "gh CLI not found"
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        headers: Optional[dict[str, str]] = None,
+        body: Optional[Any] = None,
+    ) -> ApiResponse:
+        cmd = ["gh", "api", "--include", "-X", method, path]
+        for name, value in (headers or {}).items():
+            cmd.extend(["-H", f"{name}: {value}"])
+        if body is not None:
+            cmd.extend(["--input", "-"])
+        try:
+            result = run_cmd(
+                cmd,
+                capture=True,
+                check=False,
+                input=json.dumps(body) if body is not None else None,
+            )
+        except (OSError, subprocess.SubprocessError) as exc:
+            raise TransportError(str(exc)) from exc
+
+        response = _parse_included_response(result.stdout)
+        if response is None:
+            raise TransportError(result.stderr.strip() or f"Exit code {result.returncode}")
+        return response
+
+    def graphql(self, query: str, variables: Optional[dict[str, str]] = None) -> dict:
+        cmd = ["gh", "api", "graphql", "-f", f"query={query}"]
+        for name, value in (variables or {}).items():
+            cmd.extend(["-f", f"{name}={value}"])
+        try:
+            result = run_cmd(cmd, capture=True)
+            return _graphql_data(json.loads(result.stdout))
+        except subprocess.CalledProcessError as exc:
+            raise TransportError(_error_message(exc)) from exc
+        except (OSError, ValueError) as exc:
+            raise TransportError(str(exc)) from exc
+
+    def list_open_prs(self, head: str) -> list[dict]:
+        cmd = [
+            "gh",
+            "pr",
+            "list",
+            "--head",
+            head,
+            "--state",
+            "open",
+            "--limit",
+            "100",
+            "--json",
+            "baseRefName,url,title",
+        ]
+        try:
+            result = run_cmd(cmd, capture=True)
+            prs = json.loads(result.stdout)
+        except subprocess.CalledProcessError as exc:
+            raise TransportError(_error_message(exc)) from exc
+        except (OSError, ValueError) as exc:
+            raise TransportError(str(exc)) from exc
+        return prs if isinstance(prs, list) else []
+
+    def create_pr(
+        self,
+        source: str,
+        target: str,
+        title: str,
+        body: str,
+        reviewers: list[str],
+        draft: bool = False,
+    ) -> tuple[str, list[str]]:
+        cmd = [
+            "gh",
+            "pr",
+            "create",
+            "--base",
+            target,
+            "--head",
+            source,
+            "--title",
+            title,
+            "--body",
+            body,
+        ]
+        if draft:
+            cmd.append("--draft")
+        for reviewer in reviewers:
+            cmd.extend(["--reviewer", reviewer])
+
+        try:
+            result = run_cmd(cmd, capture=True)
+        except subprocess.CalledProcessError as exc:
+            raise TransportError(_error_message(exc)) from exc
+        except OSError as exc:
+            raise TransportError(str(exc)) from exc
+        return result.stdout.strip(), []
+
+
+class HttpTransport:
+    """Talk to the GitHub API directly over pooled keep-alive connections."""
+
+    name = "http"
+
+    def __init__(self, base_url: str = DEFAULT_API_URL, token: Optional[str] = None) -> None:
+        parts = urlsplit(base_url.rstrip("/"))
+        self._scheme = parts.scheme or "https"
+        self._netloc = parts.netloc
+        self._base_path = parts.path
+        self._token = token
+        self._token_lock = threading.Lock()
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(POOL_SIZE)
+
+    def _get_token(self) -> Optional[str]:
+        with self._token_lock:
+            if self._token is None:
+                self._token = (
+                    os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN") or None
+                )
+            if self._token is None and shutil.which("gh"):
+                try:
+                    result = run_cmd(["gh", "auth", "token"], capture=True)
+                    self._token = result.stdout.strip() or None
+                except (OSError, subprocess.CalledProcessError) as exc:
+                    logging.warning(f"Failed to read gh auth token: {exc}")
+            return self._token
+
+    def is_available(self) -> bool:
+        return self._get_token() is not None
+
+    def unavailable_message(self) -> str:
+        base_url = f"{self._scheme}://{self._netloc}{self._base_path}"
+        return (
+            f"No GitHub token for {base_url}: set GH_TOKEN, or log in with "
+            "`gh auth login`, and check github_api_url for GitHub Enterprise"
+        )
+
+    def _expand(self, path: str) -> str:
+        if _PLACEHOLDER.search(path):
+            owner, repo = get_repo_slug()
+            values = {"owner": quote(owner, safe=""), "repo": quote(repo, safe="")}
+            path = _PLACEHOLDER.sub(lambda m: values[m.group(1) or m.group(2)], path)
+        return path
+
+    def _url_path(self, path: str) -> str:
+        if path == "graphql":
+            # GitHub Enterprise serves GraphQL at /api/graphql next to /api/v3.
+            if self._base_path.endswith("/api/v3"):
+                return self._base_path[: -len("/v3")] + "/graphql"
+            return f"{self._base_path}/graphql"
+        return f"{self._base_path}/{self._expand(path).lstrip('/')}"
+
+    def _connect(self) -> "http.client.HTTPConnection":
+        # Imported here: http.client pulls in ssl and email, which the
+        # default gh transport never needs.
+        import http.client
+
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            if self._scheme == "http":
+                return http.client.HTTPConnection(self._netloc, timeout=HTTP_TIMEOUT_SECONDS)
+            return http.client.HTTPSConnection(self._netloc, timeout=HTTP_TIMEOUT_SECONDS)
+
+    def _release(self, connection: "http.client.HTTPConnection") -> None:
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        headers: Optional[dict[str, str]] = None,
+        body: Optional[Any] = None,
+    ) -> ApiResponse:
+        token = self._get_token()
+        if token is None:
+            raise TransportError("No GitHub token available (run 'gh auth login')")
+
+        request_headers = {
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {token}",
+            "User-Agent": "qualitytrade-pr-creator",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        request_headers.update(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            request_headers["Content-Type"] = "application/json"
+
+        import http.client
+
+        url_path = self._url_path(path)
+        with span(f"http {method}", HTTP, path=path) as details:
+            # A pooled connection may have been closed by the server; retry once.
+            for attempt in range(2):
+                connection = self._connect()
+                try:
+                    connection.request(method, url_path, body=payload, headers=request_headers)
+                    response = connection.getresponse()
+                    data = response.read().decode("utf-8", errors="replace")
+                except (http.client.HTTPException, OSError) as exc:
+                    connection.close()
+                    if attempt == 0 and isinstance(
+                        exc, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+                    ):
+                        continue
+                    raise TransportError(f"GitHub request failed: {exc}") from exc
+
+                if response.will_close:
+                    connection.close()
+                else:
+                    self._release(connection)
+                details["status"] = response.status
+                return ApiResponse(
+                    response.status,
+                    {name.lower(): value for name, value in response.getheaders()},
+                    data,
+                )
+            raise TransportError("GitHub request failed")
+
+    def _checked(self, response: ApiResponse) -> Any:
+        if response.status >= 400:
+            try:
+                message = (response.json() or {}).get("message")
+            except (ValueError, AttributeError):
+                message = None
+            raise TransportError(message or f"HTTP {response.status}")
+        return response.json()
+
+    def graphql(self, query: str, variables: Optional[dict[str, str]] = None) -> dict:
+        response = self.request(
+            "POST", "graphql", body={"query": query, "variables": variables or {}}
+        )
+        return _graphql_data(self._checked(response))
+
+    def list_open_prs(self, head: str) -> list[dict]:
+        owner, _repo = get_repo_slug()
+        head_filter = quote(f"{owner}:{head}", safe="")
+        response = self.request(
+            "GET", f"repos/:owner/:repo/pulls?state=open&per_page=100&head={head_filter}"
+        )
+        pulls = self._checked(response) or []
+        return [
+            {
+                "baseRefName": (pull.get("base") or {}).get("ref"),
+                "url": pull.get("html_url", ""),
+                "title": pull.get("title", ""),
+            }
+            for pull in pulls
+            if isinstance(pull, dict)
+        ]
+
+    def create_pr(
+        self,
+        source: str,
+        target: str,
+        title: str,
+        body: str,
+        reviewers: list[str],
+        draft: bool = False,
+    ) -> tuple[str, list[str]]:
+        response = self.request(
+            "POST",
+            "repos/:owner/:repo/pulls",
+            body={"title": title, "head": source, "base": target, "body": body, "draft": draft},
+        )
+        pull = self._checked(response) or {}
+        warnings = []
+        if reviewers and pull.get("number"):
+            review_response = self.request(
+                "POST",
+                f"repos/:owner/:repo/pulls/{pull['number']}/requested_reviewers",
+                body={"reviewers": reviewers},
+            )
+            if review_response.status >= 400:
+                warnings.append(
+                    f"Could not request reviewers: HTTP {review_response.status}"
+                )
+        return pull.get("html_url", ""), warnings
+
+
+Transport = Union[GhCliTransport, HttpTransport]
+
+_transport: Optional[Transport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """Return the configured transport, creating it on first use."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            choice = os.environ.get(TRANSPORT_ENV) or load_config().get("github_transport", "gh")
+            if choice == "http":
+                base_url = os.environ.get(API_URL_ENV) or load_config().get(
+                    "github_api_url", DEFAULT_API_URL
+                )
+                _transport = HttpTransport(base_url)
+            else:
+                _transport = GhCliTransport()
+        return _transport
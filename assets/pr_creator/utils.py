@@ -3,6 +3,8 @@ import re
 import sys
 from typing import List, Optional
 
+from .executor import get_executor
+
 def clear_screen() -> None:
     """Clear the terminal screen."""
     print("\033[H\033[J", end="")
@@ -28,14 +30,15 @@ def run_cmd(
     check: bool = True,
     capture: bool = False,
     timeout: Optional[int] = 60,
+    input: Optional[str] = None,
+    cwd: Optional[str] = None,
 ) -> subprocess.CompletedProcess:
-    """Run a subprocess command safely."""
-    return subprocess.run(
-        cmd,
-        check=check,
-        capture_output=capture,
-        text=True,
-        timeout=timeout,
+    """
+    Run a subprocess command safely through the shared executor, which
+    reuses read-only git/gh results within the invocation (see executor.py).
+    """
+    return get_executor().run(
+        cmd, check=check, capture=capture, timeout=timeout, input=input, cwd=cwd
     )
 
 def extract_jira_id(input_str: str) -> Optional[str]:
@@ -0,0 +1,75 @@
+"""Throwaway git repositories for engine tests."""
+import os
+import subprocess
+import tempfile
+import unittest
+
+from pr_creator import git
+from pr_creator.cache import CACHE_DIR_ENV
+from pr_creator.executor import get_executor
+
+# Every commit gets this committer and author date unless a test overrides it.
+FIXED_DATE = "1700000000 +0000"
+
+
+class GitRepoTestCase(unittest.TestCase):
+    """Runs each test inside a fresh repository with its own engine cache."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.repo = os.path.join(self._tmp.name, "repo")
+        os.mkdir(self.repo)
+
+        previous_cwd = os.getcwd()
+        os.chdir(self.repo)
+        self.addCleanup(os.chdir, previous_cwd)
+
+        previous_env = {
+            name: os.environ.get(name) for name in (CACHE_DIR_ENV, "GIT_CONFIG_GLOBAL")
+        }
+        os.environ[CACHE_DIR_ENV] = os.path.join(self._tmp.name, "cache")
+        os.environ["GIT_CONFIG_GLOBAL"] = os.devnull
+        self.addCleanup(self._restore_env, previous_env)
+
+        self.git("init", "-q", "-b", "main")
+        self.reset_engine()
+        self.addCleanup(self.reset_engine)
+
+    @staticmethod
+    def _restore_env(previous):
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    @staticmethod
+    def reset_engine():
+        """Forget per-invocation state: memoised commands, refs, cat-file pipes."""
+        get_executor().reset()
+        git.invalidate_ref_snapshot()
+        git.close_cat_files()
+
+    def git(self, *args, date=FIXED_DATE):
+        env = dict(
+            os.environ,
+            GIT_AUTHOR_NAME="Test",
+            GIT_AUTHOR_EMAIL="test@example.com",
+            GIT_COMMITTER_NAME="Test",
+            GIT_COMMITTER_EMAIL="test@example.com",
+            GIT_AUTHOR_DATE=date,
+            GIT_COMMITTER_DATE=date,
+        )
+        result = subprocess.run(
+            ["git", *args], cwd=self.repo, env=env, check=True, capture_output=True, text=True
+        )
+        return result.stdout.strip()
+
+    def commit(self, message, path=None, date=FIXED_DATE):
+        path = path or message.replace(" ", "_") + ".txt"
+        with open(os.path.join(self.repo, path), "a", encoding="utf-8") as file_handle:
+            file_handle.write(message + "\n")
+        self.git("add", path)
+        self.git("commit", "-q", "-m", message, date=date)
+        return self.git("rev-parse", "HEAD")
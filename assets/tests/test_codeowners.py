@@ -0,0 +1,143 @@
+import collections
+import itertools
+import unittest
+from unittest import mock
+
+from pr_creator import codeowners
+from pr_creator.codeowners import CodeownersMatcher, compile_codeowners, match_pattern
+
+PATTERNS = [
+    "*",
+    "*/",
+    "**",
+    "**/",
+    "*.md",
+    "*.md/",
+    "docs",
+    "docs/",
+    "/docs",
+    "/docs/",
+    "docs/*",
+    "docs/*/",
+    "docs/**",
+    "docs/**/",
+    "/docs/**/*.md",
+    "**/build",
+    "**/build/",
+    "src/*.py",
+    "/src/",
+    "/src/app/",
+    "a?c",
+    "build/",
+    "/build",
+    "apps/*/src/",
+]
+
+PATHS = [
+    "README.md",
+    "build",
+    "build/out.js",
+    "docs",
+    "docs/a.md",
+    "docs/x/a.md",
+    "docs/x/y/b.txt",
+    "nested/docs/a.md",
+    "nested/docs/x/a.md",
+    "src/main.py",
+    "src/app/main.py",
+    "src/app",
+    "lib/build/x.o",
+    "abc",
+    "abc/def",
+    "notes.md/inner.txt",
+    "apps/web/src/index.ts",
+    "apps/web/src",
+]
+
+
+def reference_index(rules, path):
+    """The last rule whose pattern matches, via the per-pattern regex."""
+    index = -1
+    for position, (pattern, _owners) in enumerate(rules):
+        if match_pattern(path, pattern):
+            index = position
+    return index
+
+
+class MatchPatternTest(unittest.TestCase):
+    def test_dir_only_wildcard_matches_only_inside_directories(self):
+        self.assertFalse(match_pattern("docs/a.md", "docs/*/"))
+        self.assertTrue(match_pattern("docs/x/a.md", "docs/*/"))
+        self.assertFalse(match_pattern("build", "*/"))
+        self.assertTrue(match_pattern("build/out.js", "*/"))
+        self.assertFalse(match_pattern("docs/a.md", "docs/**/"))
+        self.assertTrue(match_pattern("docs/x/a.md", "docs/**/"))
+
+    def test_bare_wildcard_does_not_own_nested_paths(self):
+        self.assertTrue(match_pattern("docs/a.md", "docs/*"))
+        self.assertFalse(match_pattern("docs/x/a.md", "docs/*"))
+        self.assertTrue(match_pattern("docs/x/a.md", "docs/**"))
+
+    def test_review_scenario(self):
+        matcher = compile_codeowners(
+            "* @all\n/src/ @src-team\n*.md @docs\ndocs/*/ @nested\n"
+        )
+        self.assertEqual(matcher.owners_for("docs/r.md"), ["@docs"])
+        self.assertEqual(matcher.owners_for("docs/sub/n.txt"), ["@nested"])
+        self.assertEqual(matcher.owners_for("src/a.py"), ["@src-team"])
+        self.assertEqual(matcher.owners_for("LICENSE"), ["@all"])
+
+
+class CompiledMatcherTest(unittest.TestCase):
+    def assert_agrees(self, patterns):
+        rules = [(pattern, [f"@owner{index}"]) for index, pattern in enumerate(patterns)]
+        matcher = CodeownersMatcher(rules)
+        for path in PATHS:
+            with self.subTest(patterns=patterns, path=path):
+                self.assertEqual(matcher.match_index(path), reference_index(rules, path))
+
+    def test_each_pattern_alone(self):
+        for pattern in PATTERNS:
+            self.assert_agrees([pattern])
+
+    def test_pattern_pairs_in_both_orders(self):
+        for pair in itertools.permutations(PATTERNS, 2):
+            self.assert_agrees(list(pair))
+
+    def test_all_patterns_together(self):
+        self.assert_agrees(PATTERNS)
+        self.assert_agrees(list(reversed(PATTERNS)))
+
+
+class MatcherForBlobTest(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(codeowners, "MAX_MATCHERS", 2),
+            mock.patch.object(codeowners, "_matchers_by_blob", collections.OrderedDict()),
+            mock.patch.object(codeowners, "read_cache", return_value=None),
+            mock.patch.object(codeowners, "write_cache"),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        read_blob = mock.patch.object(codeowners, "read_blob", return_value="* @team")
+        self.read_blob = read_blob.start()
+        self.addCleanup(read_blob.stop)
+
+    def test_matchers_are_reused_in_process(self):
+        first = codeowners._matcher_for_blob("a")
+
+        self.assertIs(codeowners._matcher_for_blob("a"), first)
+        self.assertEqual(self.read_blob.call_count, 1)
+
+    def test_least_recently_used_matcher_is_evicted(self):
+        for sha in ("a", "b", "a", "c"):
+            codeowners._matcher_for_blob(sha)
+
+        self.assertEqual(list(codeowners._matchers_by_blob), ["a", "c"])
+        codeowners._matcher_for_blob("b")
+        self.assertEqual(self.read_blob.call_count, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
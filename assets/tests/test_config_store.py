@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from pr_creator import config
+from pr_creator.config_store import ConfigStore
+
+
+def build(value):
+    return {"value": value if value is not None else {}}
+
+
+class ConfigStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = Path(directory.name)
+        self.path = self.dir / "config.json"
+
+    def write(self, payload):
+        self.path.write_text(json.dumps(payload), encoding="utf-8")
+
+    def test_get_reads_the_file_once_until_it_changes(self):
+        self.write({"a": 1})
+        store = ConfigStore(self.path, build)
+
+        with mock.patch.object(store, "_read", wraps=store._read) as read:
+            self.assertEqual(store.get(), {"value": {"a": 1}})
+            self.assertEqual(store.get(), {"value": {"a": 1}})
+            self.assertEqual(read.call_count, 1)
+
+            # Same size and likely the same mtime: the new inode gives it away.
+            store.update(lambda current: current.update({"a": 2}))
+            self.assertEqual(store.get(), {"value": {"a": 2}})
+            self.assertEqual(read.call_count, 3)
+
+    def test_missing_and_invalid_files_build_from_none(self):
+        store = ConfigStore(self.path, build)
+        self.assertEqual(store.get(), {"value": {}})
+
+        self.path.write_text("{not json", encoding="utf-8")
+        self.assertEqual(store.get(), {"value": {}})
+
+        self.assertTrue(store.update(lambda current: current.update({"a": 1})))
+        self.assertEqual(json.loads(self.path.read_text()), {"a": 1})
+
+    def test_update_replaces_the_file_and_keeps_its_mode(self):
+        self.write({"a": 1})
+        os.chmod(self.path, 0o600)
+        inode = os.stat(self.path).st_ino
+
+        ConfigStore(self.path, build).update(lambda current: current.update({"b": 2}))
+
+        status = os.stat(self.path)
+        self.assertNotEqual(status.st_ino, inode)
+        self.assertEqual(status.st_mode & 0o777, 0o600)
+        self.assertEqual(json.loads(self.path.read_text()), {"a": 1, "b": 2})
+        leftovers = [name for name in os.listdir(self.dir) if name.endswith(".tmp")]
+        self.assertEqual(leftovers, [])
+
+    def test_failed_mutation_leaves_the_file_untouched(self):
+        self.write({"a": 1})
+
+        def mutate(current):
+            current["a"] = 2
+            raise OSError("disk full")
+
+        self.assertFalse(ConfigStore(self.path, build).update(mutate))
+        self.assertEqual(json.loads(self.path.read_text()), {"a": 1})
+
+    def test_concurrent_updates_are_not_lost(self):
+        self.write({})
+        # Separate stores stand in for separate engine processes.
+        stores = [ConfigStore(self.path, build) for _ in range(8)]
+
+        def add(store, index):
+            for round_number in range(10):
+                store.update(
+                    lambda current: current.update({f"{index}-{round_number}": True})
+                )
+
+        threads = [
+            threading.Thread(target=add, args=(store, index))
+            for index, store in enumerate(stores)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(json.loads(self.path.read_text())), 80)
+
+    def test_symlinked_path_is_not_written(self):
+        target = self.dir / "elsewhere.json"
+        target.write_text("{}", encoding="utf-8")
+        self.path.symlink_to(target)
+
+        with self.assertLogs(level="WARNING"):
+            written = ConfigStore(self.path, build).update(
+                lambda current: current.update({"a": 1})
+            )
+
+        self.assertFalse(written)
+        self.assertEqual(target.read_text(), "{}")
+
+
+class LoadConfigTest(unittest.TestCase):
+    def setUp(self):
+        home = tempfile.TemporaryDirectory()
+        self.addCleanup(home.cleanup)
+        patcher = mock.patch.object(Path, "home", return_value=Path(home.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_callers_cannot_mutate_the_cached_config(self):
+        config.save_config(
+            {"reviewer_groups": {"core": ["alice"]}, "ignored_authors": ["bot"]}
+        )
+
+        first = config.load_config()
+        first["reviewer_groups"]["core"].append("mallory")
+        first["ignored_authors"].append("mallory")
+
+        second = config.load_config()
+        self.assertEqual(second["reviewer_groups"], {"core": ["alice"]})
+        self.assertEqual(second["ignored_authors"], ["bot"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import subprocess
+import threading
+import unittest
+from unittest import mock
+
+from pr_creator import executor
+from pr_creator.executor import CommandExecutor, is_read_only
+
+LOG = ["git", "log", "-1"]
+FETCH = ["git", "fetch", "origin"]
+
+
+class FakeSpawn:
+    """Stands in for executor._spawn: counts runs, optionally holding some."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+        self.started = {}
+        self.release = {}
+
+    def hold(self, cmd):
+        """Make the next runs of cmd wait until release[cmd] is set."""
+        self.started[tuple(cmd)] = threading.Event()
+        self.release[tuple(cmd)] = threading.Event()
+
+    def __call__(self, cmd, check, capture, timeout, input, cwd):
+        with self.lock:
+            self.calls.append(list(cmd))
+            count = len(self.calls)
+        key = tuple(cmd)
+        if key in self.started:
+            self.started[key].set()
+            self.release[key].wait(5)
+        returncode = 1 if cmd[1] == "fail" else 0
+        return subprocess.CompletedProcess(cmd, returncode, stdout=f"run {count}", stderr="")
+
+    def count(self, cmd):
+        with self.lock:
+            return self.calls.count(list(cmd))
+
+
+class CommandExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.spawn = FakeSpawn()
+        patcher = mock.patch.object(executor, "_spawn", self.spawn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.executor = CommandExecutor()
+
+    def run_in_thread(self, cmd, results):
+        thread = threading.Thread(
+            target=lambda: results.append(self.executor.run(cmd, capture=True).stdout)
+        )
+        thread.start()
+        return thread
+
+    def test_read_only_results_are_memoised(self):
+        first = self.executor.run(LOG, capture=True)
+        second = self.executor.run(LOG, capture=True)
+
+        self.assertEqual(second.stdout, first.stdout)
+        self.assertEqual(self.spawn.count(LOG), 1)
+
+    def test_memo_is_keyed_by_working_directory(self):
+        self.executor.run(LOG, capture=True, cwd="/a")
+        self.executor.run(LOG, capture=True, cwd="/b")
+
+        self.assertEqual(self.spawn.count(LOG), 2)
+
+    def test_uncaptured_commands_are_not_memoised(self):
+        self.executor.run(LOG)
+        self.executor.run(LOG)
+
+        self.assertEqual(self.spawn.count(LOG), 2)
+
+    def test_memoised_failures_still_raise_when_checked(self):
+        failing = ["git", "fail"]
+        with mock.patch.object(executor, "is_read_only", return_value=True):
+            self.assertEqual(self.executor.run(failing, check=False, capture=True).returncode, 1)
+            with self.assertRaises(subprocess.CalledProcessError):
+                self.executor.run(failing, capture=True)
+        self.assertEqual(self.spawn.count(failing), 1)
+
+    def test_concurrent_identical_calls_share_one_process(self):
+        self.spawn.hold(LOG)
+        results = []
+        first = self.run_in_thread(LOG, results)
+        self.assertTrue(self.spawn.started[tuple(LOG)].wait(5))
+        second = self.run_in_thread(LOG, results)
+
+        self.spawn.release[tuple(LOG)].set()
+        first.join(5)
+        second.join(5)
+
+        self.assertEqual(results, ["run 1", "run 1"])
+        self.assertEqual(self.spawn.count(LOG), 1)
+
+    def test_mutating_command_drops_the_memo(self):
+        self.executor.run(LOG, capture=True)
+        self.executor.run(FETCH, capture=True)
+        after = self.executor.run(LOG, capture=True)
+
+        self.assertEqual(after.stdout, "run 3")
+        self.assertEqual(self.spawn.count(LOG), 2)
+
+    def test_mutating_command_during_an_in_flight_read(self):
+        self.spawn.hold(LOG)
+        results = []
+        reader = self.run_in_thread(LOG, results)
+        self.assertTrue(self.spawn.started[tuple(LOG)].wait(5))
+
+        # The write bumps the generation while the read is still running.
+        self.executor.run(FETCH, capture=True)
+        # A read after the write must not join the read started before it.
+        del self.spawn.started[tuple(LOG)]
+        fresh = self.executor.run(LOG, capture=True)
+
+        self.spawn.release[tuple(LOG)].set()
+        reader.join(5)
+
+        self.assertEqual(results, ["run 1"])
+        self.assertEqual(fresh.stdout, "run 3")
+        # The stale read's result was not memoised over the fresh one.
+        self.assertEqual(self.executor.run(LOG, capture=True).stdout, "run 3")
+        self.assertEqual(self.spawn.count(LOG), 2)
+
+    def test_reset_forgets_results(self):
+        self.executor.run(LOG, capture=True)
+        self.executor.reset()
+        self.executor.run(LOG, capture=True)
+
+        self.assertEqual(self.spawn.count(LOG), 2)
+
+    def test_submitted_commands_join_later_runs(self):
+        self.spawn.hold(LOG)
+        future = self.executor.submit(LOG, capture=True)
+        self.assertTrue(self.spawn.started[tuple(LOG)].wait(5))
+        results = []
+        waiter = self.run_in_thread(LOG, results)
+
+        self.spawn.release[tuple(LOG)].set()
+        waiter.join(5)
+
+        self.assertEqual(future.result(5).stdout, "run 1")
+        self.assertEqual(results, ["run 1"])
+        self.assertEqual(self.spawn.count(LOG), 1)
+
+
+class IsReadOnlyTest(unittest.TestCase):
+    READ_ONLY = [
+        ["git", "log", "a..b", "--pretty=format:%s"],
+        ["git", "rev-parse", "--verify", "HEAD"],
+        ["git", "cat-file", "-p", "HEAD"],
+        ["git", "diff", "--name-only", "a", "b"],
+        ["git", "merge-base", "a", "b"],
+        ["git", "for-each-ref", "refs/remotes"],
+        ["git", "branch", "-r"],
+        ["git", "branch", "--show-current"],
+        ["git", "config", "user.email"],
+        ["git", "remote", "get-url", "origin"],
+        ["/usr/local/bin/git", "show-ref"],
+        ["gh", "api", "--include", "-X", "GET", "user"],
+        ["gh", "api", "repos/:owner/:repo/contributors", "-H", "If-None-Match: x"],
+        ["gh", "api", "graphql", "-f", "query=query { viewer { login } }"],
+        ["gh", "pr", "list", "--head", "x"],
+        ["gh", "auth", "token"],
+    ]
+    MUTATING = [
+        ["git", "fetch", "--all", "--prune"],
+        ["git", "push", "origin", "x"],
+        ["git", "checkout", "main"],
+        ["git", "branch", "new-branch"],
+        ["git", "branch", "-D", "old"],
+        ["git", "config", "user.email", "me@example.com"],
+        ["git", "config", "--unset", "user.email"],
+        ["git", "remote", "add", "origin", "url"],
+        ["gh", "api", "-X", "POST", "repos/o/r/pulls"],
+        ["gh", "api", "repos/o/r/issues", "-f", "title=x"],
+        ["gh", "api", "repos/o/r/pulls", "--input", "-"],
+        ["gh", "api", "graphql", "-f", "query=mutation { addStar }"],
+        ["gh", "api", "graphql"],
+        ["gh", "pr", "create", "--base", "main"],
+        ["git"],
+        ["ls", "-l"],
+    ]
+
+    def test_classification(self):
+        for cmd in self.READ_ONLY:
+            with self.subTest(cmd=cmd):
+                self.assertTrue(is_read_only(cmd))
+        for cmd in self.MUTATING:
+            with self.subTest(cmd=cmd):
+                self.assertFalse(is_read_only(cmd))
+
+
+if __name__ == "__main__":
+    unittest.main()
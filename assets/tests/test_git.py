@@ -0,0 +1,387 @@
+import os
+import subprocess
+import time
+import unittest
+from unittest import mock
+
+from pr_creator import git
+
+from .gitrepo import GitRepoTestCase
+
+
+class CommitsForTargetsTest(GitRepoTestCase):
+    def build_history(self, dated):
+        """
+        main with release/1 and develop branched off it, and a feature
+        branch on develop that merges release/1. With ``dated`` False every
+        commit shares one timestamp, so only tie-breaking decides the order.
+        """
+        clock = iter(range(1700000000, 1700001000, 10))
+
+        def date():
+            return f"{next(clock) if dated else 1700000000} +0000"
+
+        self.commit("root", date=date())
+        self.git("branch", "develop")
+        self.git("branch", "release/1")
+        self.commit("main fix", date=date())
+
+        self.git("checkout", "-q", "release/1")
+        self.commit("release prep", date=date())
+        self.commit("release bump", date=date())
+
+        self.git("checkout", "-q", "develop")
+        self.commit("develop work", date=date())
+        self.git("checkout", "-q", "-b", "feature/x")
+        for index in range(4):
+            self.commit(f"feature step {index}", date=date())
+        self.git("merge", "-q", "--no-ff", "-m", "merge release", "release/1", date=date())
+        self.commit("feature after merge", date=date())
+        self.git("checkout", "-q", "main")
+        self.reset_engine()
+
+    def assert_matches_git_log(self):
+        targets = ["main", "develop", "release/1"]
+        combined = git.get_commits_for_targets(targets, "feature/x")
+        for target in targets:
+            with self.subTest(target=target):
+                self.assertEqual(combined[target], git.get_commits_between(target, "feature/x"))
+                self.assertTrue(combined[target])
+
+    def test_order_matches_git_log_with_equal_timestamps(self):
+        self.build_history(dated=False)
+        self.assert_matches_git_log()
+
+    def test_order_matches_git_log_with_distinct_timestamps(self):
+        self.build_history(dated=True)
+        self.assert_matches_git_log()
+
+    def test_unknown_target_maps_to_empty_list(self):
+        self.build_history(dated=True)
+        combined = git.get_commits_for_targets(["main", "nope"], "feature/x")
+        self.assertEqual(combined["nope"], [])
+        self.assertEqual(combined["main"], git.get_commits_between("main", "feature/x"))
+
+
+class FullFetchFreshnessTest(GitRepoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.commit("root")
+        self.git("branch", "develop")
+        self.git("clone", "-q", "--bare", ".", "../upstream.git")
+        self.git("remote", "add", "origin", "../upstream.git")
+        self.git("fetch", "-q", "--all", "--prune")
+        self.reset_engine()
+
+    def test_recent_full_fetch_is_fresh(self):
+        self.assertTrue(git.full_fetch_is_fresh(60))
+        self.assertTrue(git.full_fetch_is_fresh(60, cwd=self.repo))
+        self.assertFalse(git.full_fetch_is_fresh(0))
+
+    def test_old_fetch_is_not_fresh(self):
+        fetch_head = os.path.join(self.repo, ".git", "FETCH_HEAD")
+        os.utime(fetch_head, (time.time() - 120, time.time() - 120))
+        self.assertFalse(git.full_fetch_is_fresh(60))
+
+    def test_targeted_fetch_does_not_count_as_full(self):
+        self.git("fetch", "-q", "origin", "main")
+        self.assertFalse(git.full_fetch_is_fresh(60))
+
+    def test_remote_branch_missing_from_fetch_head_needs_a_fetch(self):
+        self.git("fetch", "-q", "origin", "main:refs/remotes/origin/other")
+        self.git("fetch", "-q", "--all")
+        self.reset_engine()
+        self.assertFalse(git.full_fetch_is_fresh(60))
+
+
+class ChangedFilesTest(GitRepoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.commit("root", path="README.md")
+        self.git("branch", "develop")
+        self.git("checkout", "-q", "-b", "feature/x")
+        self.commit("add a", path="a.txt")
+        self.commit("add b", path="b.txt")
+        self.commit("touch a", path="a.txt")
+        self.git("checkout", "-q", "main")
+        # On main only: a three-dot diff leaves it out.
+        self.commit("add c", path="c.txt")
+        self.reset_engine()
+
+    def test_matches_a_three_dot_diff(self):
+        expected = self.git("diff", "--name-only", "main...feature/x").splitlines()
+        self.assertEqual(git.get_changed_files("main", "feature/x"), expected)
+
+    def test_unchanged_refs_are_served_from_the_cache(self):
+        first = git.get_changed_files("main", "feature/x")
+        self.reset_engine()
+
+        with mock.patch.object(git, "run_cmd", wraps=git.run_cmd) as run_cmd:
+            self.assertEqual(git.get_changed_files("main", "feature/x"), first)
+        commands = {call.args[0][1] for call in run_cmd.call_args_list}
+        self.assertFalse(commands & {"diff", "merge-base"})
+
+    def test_targets_are_merged_with_each_path_once(self):
+        self.assertEqual(
+            git.get_changed_files_for_targets(["main", "develop", "main"], "feature/x"),
+            ["a.txt", "b.txt"],
+        )
+
+
+class RefReaderTest(GitRepoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.commit("root")
+        self.git("tag", "light")
+        self.git("tag", "-a", "annotated", "-m", "annotated tag")
+        self.git("branch", "develop")
+        self.git("branch", "release/1.0.0")
+        self.git("clone", "-q", "--bare", ".", "../upstream.git")
+        self.git("remote", "add", "origin", "../upstream.git")
+        self.git("fetch", "-q", "origin")
+        self.git("remote", "set-head", "origin", "main")
+        self.reset_engine()
+
+    def for_each_ref(self, cwd=None):
+        """(refs, symrefs) as git for-each-ref reports them."""
+        refs, symrefs = {}, {}
+        output = subprocess.run(
+            ["git", "for-each-ref", "--format=%(objectname) %(refname) %(symref)"],
+            cwd=cwd or self.repo,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        for line in output.splitlines():
+            sha, refname, target = (line.split(" ") + [""])[:3]
+            refs[refname] = sha
+            if target:
+                symrefs[refname] = target
+        return refs, symrefs
+
+    def test_loose_refs(self):
+        self.assertEqual(git.read_refs(), self.for_each_ref())
+
+    def test_packed_refs_with_loose_overrides(self):
+        self.git("pack-refs", "--all")
+        # Moved after packing: the loose copy must win over the packed one.
+        self.commit("moved develop")
+        self.git("branch", "-f", "develop", "HEAD")
+        self.git("update-ref", "refs/remotes/origin/develop", "HEAD")
+
+        with open(os.path.join(self.repo, ".git", "packed-refs"), encoding="utf-8") as packed:
+            content = packed.read()
+        self.assertIn("refs/heads/develop", content)
+        self.assertIn("\n^", content)
+        self.assertEqual(git.read_refs(), self.for_each_ref())
+
+    def test_symbolic_origin_head(self):
+        refs, symrefs = git.read_refs()
+
+        self.assertEqual(symrefs, {"refs/remotes/origin/HEAD": "refs/remotes/origin/main"})
+        self.assertEqual(refs["refs/remotes/origin/HEAD"], refs["refs/remotes/origin/main"])
+        self.assertNotIn("origin/HEAD", git.get_remote_branch_refs())
+        self.assertIn("origin/main", git.get_remote_branch_refs())
+
+    def test_linked_worktree(self):
+        self.git("pack-refs", "--all")
+        worktree = os.path.join(os.path.dirname(self.repo), "worktree")
+        self.git("worktree", "add", "-q", "-b", "in-worktree", worktree)
+
+        self.assertEqual(git.read_refs(worktree), self.for_each_ref(worktree))
+        self.assertIn("refs/heads/in-worktree", git.read_refs(worktree)[0])
+
+    def test_falls_back_to_for_each_ref(self):
+        with mock.patch.dict(os.environ, {"GIT_DIR": os.path.join(self.repo, ".git")}):
+            self.assertIsNone(git.read_refs())
+            with mock.patch.object(git, "run_cmd", wraps=git.run_cmd) as run_cmd:
+                snapshot = git.get_ref_snapshot()
+
+        self.assertEqual(snapshot, self.for_each_ref()[0])
+        self.assertEqual(run_cmd.call_args_list[0].args[0][1], "for-each-ref")
+
+
+class CatFileProcessTest(GitRepoTestCase):
+    def setUp(self):
+        super().setUp()
+        # Every byte value, newlines and NULs included, plus a blob far
+        # larger than a pipe buffer.
+        self.blobs = {
+            "binary.bin": bytes(range(256)) * 4 + b"\n",
+            "large.bin": os.urandom(3 * 1024 * 1024),
+            "text.txt": b"hello\n",
+        }
+        for path, content in self.blobs.items():
+            with open(os.path.join(self.repo, path), "wb") as file_handle:
+                file_handle.write(content)
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "blobs")
+        self.reset_engine()
+
+    def test_reads_exact_contents(self):
+        names = [f"HEAD:{path}" for path in self.blobs]
+        answers = git.read_objects(names + names)
+
+        for name, answer in zip(names + names, answers):
+            with self.subTest(name=name):
+                sha, object_type, content = answer
+                self.assertEqual(object_type, "blob")
+                self.assertEqual(sha, self.git("rev-parse", name))
+                self.assertEqual(content, self.blobs[name[len("HEAD:"):]])
+
+    def test_missing_and_invalid_names(self):
+        answers = git.read_objects(
+            ["HEAD:missing.txt", "0" * 40, "HEAD:text.txt", "bad\nname", ""]
+        )
+
+        self.assertEqual(answers[:2], [None, None])
+        self.assertEqual(answers[2][2], b"hello\n")
+        self.assertEqual(answers[3:], [None, None])
+
+    def test_batch_check_reads_type_only(self):
+        sha, object_type, content = git.read_objects(["HEAD:large.bin"], check=True)[0]
+
+        self.assertEqual(object_type, "blob")
+        self.assertEqual(sha, self.git("rev-parse", "HEAD:large.bin"))
+        self.assertIsNone(content)
+
+    def test_more_names_than_one_chunk(self):
+        names = ["HEAD:text.txt", "HEAD:missing.txt"] * git.CAT_FILE_CHUNK
+        answers = git.read_objects(names)
+
+        self.assertEqual(len(answers), len(names))
+        self.assertEqual(answers[-2][2], b"hello\n")
+        self.assertIsNone(answers[-1])
+
+    def test_restarts_after_the_child_dies(self):
+        process = git._cat_file()
+        process.query(["HEAD:text.txt"])
+        child = process._process
+        child.kill()
+        child.wait()
+
+        self.assertEqual(process.query(["HEAD:text.txt"])[0][2], b"hello\n")
+        self.assertIsNot(process._process, child)
+        self.assertIsNone(process._process.poll())
+
+    def test_close_stops_the_repository_process(self):
+        process = git._cat_file()
+        process.query(["HEAD:text.txt"])
+        child = process._process
+
+        git.close_cat_files()
+
+        self.assertIsNotNone(child.poll())
+        self.assertIsNone(process._process)
+        self.assertIsNot(git._cat_file(), process)
+
+
+class FetchBranchesTest(GitRepoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.commit("root")
+        self.git("branch", "develop")
+        self.git("branch", "feature/x")
+        self.git("clone", "-q", "--bare", ".", "../upstream.git")
+        self.git("remote", "add", "origin", "../upstream.git")
+        self.git("fetch", "-q", "origin")
+        self.reset_engine()
+
+    def advance_upstream(self, branch):
+        """Move branch on origin to a new commit, leaving origin/<branch> here stale."""
+        tracking = self.git("rev-parse", f"origin/{branch}")
+        self.git("checkout", "-q", "--detach", tracking)
+        sha = self.commit(f"upstream change on {branch}", path="upstream.txt")
+        self.git("push", "-q", "origin", f"HEAD:refs/heads/{branch}")
+        self.git("update-ref", f"refs/remotes/origin/{branch}", tracking)
+        self.git("checkout", "-q", "main")
+        return sha
+
+    def tracking(self, branch):
+        return self.git("rev-parse", f"origin/{branch}")
+
+    def fetch_commands(self, run_cmd):
+        return [call.args[0] for call in run_cmd.call_args_list if call.args[0][1] == "fetch"]
+
+    def test_fetches_only_the_given_branches(self):
+        develop = self.advance_upstream("develop")
+        feature = self.advance_upstream("feature/x")
+
+        self.assertTrue(git.fetch_branches(["develop", "develop", ""]))
+
+        self.assertEqual(self.tracking("develop"), develop)
+        self.assertNotEqual(self.tracking("feature/x"), feature)
+
+    def test_fresh_fetch_head_covering_the_branches_skips_the_fetch(self):
+        git.fetch_branches(["develop", "main"])
+        develop = self.advance_upstream("develop")
+
+        with mock.patch.object(git, "run_cmd", wraps=git.run_cmd) as run_cmd:
+            self.assertFalse(git.fetch_branches(["develop"], max_age=60))
+        self.assertEqual(self.fetch_commands(run_cmd), [])
+        self.assertNotEqual(self.tracking("develop"), develop)
+
+        # Not a superset of what FETCH_HEAD lists: fetch.
+        self.assertTrue(git.fetch_branches(["develop", "feature/x"], max_age=60))
+        self.assertEqual(self.tracking("develop"), develop)
+
+    def test_stale_fetch_head_fetches_again(self):
+        git.fetch_branches(["develop"])
+        develop = self.advance_upstream("develop")
+        fetch_head = os.path.join(self.repo, ".git", "FETCH_HEAD")
+        os.utime(fetch_head, (time.time() - 120, time.time() - 120))
+
+        self.assertTrue(git.fetch_branches(["develop"], max_age=60))
+        self.assertEqual(self.tracking("develop"), develop)
+
+    def test_failed_batch_falls_back_to_one_fetch_per_branch(self):
+        develop = self.advance_upstream("develop")
+
+        with mock.patch.object(git, "run_cmd", wraps=git.run_cmd) as run_cmd:
+            self.assertTrue(git.fetch_branches(["develop", "no-such-branch", "main"]))
+
+        commands = self.fetch_commands(run_cmd)
+        self.assertEqual(len(commands), 4)
+        self.assertNotIn("--append", commands[1])
+        self.assertIn("--append", commands[2])
+        self.assertEqual(self.tracking("develop"), develop)
+        # Every branch that exists is recorded, so a later check can skip it.
+        self.assertEqual(git._fetched_branches(60), {"develop", "main"})
+
+    def test_full_fetch_fetches_and_prunes_every_branch(self):
+        develop = self.advance_upstream("develop")
+        feature = self.advance_upstream("feature/x")
+        self.git("--git-dir", "../upstream.git", "branch", "-q", "gone", "main")
+        git.fetch_latest_branches()
+        self.git("--git-dir", "../upstream.git", "branch", "-q", "-D", "gone")
+
+        git.fetch_latest_branches()
+
+        self.assertEqual(self.tracking("develop"), develop)
+        self.assertEqual(self.tracking("feature/x"), feature)
+        self.assertNotIn("origin/gone", git.get_remote_branch_refs())
+        self.assertTrue(git.full_fetch_is_fresh(60))
+
+    def test_headless_full_fetch_option_selects_the_full_fetch(self):
+        from pr_creator import github, main
+
+        args = main.build_parser().parse_args(
+            ["--headless", "--full-fetch", "--source", "feature/x", "--target", "main"]
+        )
+        with mock.patch.object(git, "fetch_latest_branches") as full, mock.patch.object(
+            git, "fetch_branches"
+        ) as targeted, mock.patch.object(
+            github, "get_open_prs_for_head", return_value={}
+        ), mock.patch.object(
+            github, "check_existing_pr", return_value=True
+        ):
+            main.create_prs(args)
+            args.full_fetch = False
+            main.create_prs(args)
+
+        full.assert_called_once_with()
+        targeted.assert_called_once_with(["feature/x", "main"], max_age=mock.ANY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from pr_creator import github, transport
+from pr_creator.cache import CACHE_DIR_ENV
+
+
+class FakeTransport:
+    def __init__(self, prs):
+        self.prs = prs
+        self.calls = 0
+
+    def is_available(self):
+        return True
+
+    def list_open_prs(self, head):
+        self.calls += 1
+        return self.prs
+
+
+class OpenPullRequestsTest(unittest.TestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        patcher = mock.patch.dict(os.environ, {CACHE_DIR_ENV: cache_dir.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.transport = FakeTransport(
+            [{"baseRefName": "main", "url": "https://example.test/pull/1", "title": "T"}]
+        )
+        previous = transport._transport
+        transport._transport = self.transport
+        self.addCleanup(setattr, transport, "_transport", previous)
+
+    def test_cached_listing_needs_a_prior_lookup(self):
+        self.assertIsNone(github.get_cached_open_prs("feature/x", max_age=600))
+        self.assertEqual(self.transport.calls, 0)
+
+    def test_lookup_is_cached_for_previews(self):
+        listed = github.get_open_prs_for_head("feature/x")
+        self.assertEqual(listed["main"]["url"], "https://example.test/pull/1")
+
+        self.assertEqual(github.get_cached_open_prs("feature/x", max_age=600), listed)
+        self.assertIsNone(github.get_cached_open_prs("feature/y", max_age=600))
+        self.assertEqual(self.transport.calls, 1)
+
+    def test_stale_and_forgotten_listings_are_not_served(self):
+        github.get_open_prs_for_head("feature/x")
+        later = time.time() + 601
+        with mock.patch.object(github.time, "time", return_value=later):
+            self.assertIsNone(github.get_cached_open_prs("feature/x", max_age=600))
+
+        github.forget_open_prs("feature/x")
+        self.assertIsNone(github.get_cached_open_prs("feature/x", max_age=600))
+
+
+class UnavailableTransportTest(unittest.TestCase):
+    def setUp(self):
+        patchers = [
+            mock.patch.dict(os.environ, {"GH_TOKEN": "", "GITHUB_TOKEN": ""}),
+            mock.patch.object(transport.shutil, "which", return_value=None),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        previous = transport._transport
+        self.addCleanup(setattr, transport, "_transport", previous)
+
+    def test_http_transport_without_a_token_points_at_its_settings(self):
+        transport._transport = transport.HttpTransport("https://ghe.example.test/api/v3")
+
+        with self.assertRaises(FileNotFoundError) as raised:
+            github.get_open_prs_for_head("feature/x")
+        error = github.create_pr("feature/x", "main", "T", "", skip_confirm=True)["error"]
+
+        for message in (str(raised.exception), error):
+            self.assertIn("GH_TOKEN", message)
+            self.assertIn("github_api_url", message)
+            self.assertIn("https://ghe.example.test/api/v3", message)
+            self.assertNotIn("gh CLI", message)
+
+    def test_gh_transport_without_the_binary(self):
+        transport._transport = transport.GhCliTransport()
+
+        error = github.create_pr("feature/x", "main", "T", "", skip_confirm=True)["error"]
+        self.assertEqual(error, "gh CLI not found")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from pr_creator import main
+
+
+class SaveReviewersArgumentsTest(unittest.TestCase):
+    def test_matches_the_full_parser(self):
+        for argv in (
+            ["--save-reviewers"],
+            ["--save-reviewers", "--reviewers", "alice", "/repo"],
+            ["--save-reviewers", "--reviewers", "alice", "--reviewers", "bob"],
+            ["--timings", "--save-reviewers", "--reviewers", "alice", "/repo"],
+        ):
+            with self.subTest(argv=argv):
+                args = main.build_parser().parse_args(argv)
+                self.assertEqual(
+                    main._parse_save_reviewers(argv),
+                    (args.reviewers or [], args.timings, args.repo_path),
+                )
+
+    def test_anything_else_is_left_to_the_full_parser(self):
+        for argv in (
+            [],
+            ["--get-data"],
+            ["--save-reviewers", "--get-data"],
+            ["--save-reviewers", "--reviewers"],
+            ["--save-reviewers", "--reviewers=alice"],
+            ["--save-reviewers", "/repo", "/other"],
+        ):
+            with self.subTest(argv=argv):
+                self.assertIsNone(main._parse_save_reviewers(argv))
+
+
+if __name__ == "__main__":
+    unittest.main()
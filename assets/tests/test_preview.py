@@ -0,0 +1,46 @@
+import unittest
+from unittest import mock
+
+from pr_creator import preview
+
+
+class GitStageMemoTest(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(preview, "MAX_STAGES", 2),
+            mock.patch.object(preview, "_stages", preview.collections.OrderedDict()),
+            mock.patch.object(preview, "_stage_key", side_effect=lambda source, targets: source),
+            mock.patch.object(preview, "read_cache", return_value=None),
+            mock.patch.object(preview, "write_cache"),
+            mock.patch.object(preview, "get_changed_files_for_targets", return_value=[]),
+            mock.patch.object(preview, "get_all_owners", return_value=[]),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        commits = mock.patch.object(
+            preview, "get_commits_for_targets", return_value={"main": ["subject"]}
+        )
+        self.commits = commits.start()
+        self.addCleanup(commits.stop)
+
+    def test_stages_are_reused_in_process(self):
+        first = preview.get_git_stage("a", ["main"])
+        second = preview.get_git_stage("a", ["main"])
+
+        self.assertIs(second, first)
+        self.assertEqual(self.commits.call_count, 1)
+
+    def test_least_recently_used_stage_is_evicted(self):
+        preview.get_git_stage("a", ["main"])
+        preview.get_git_stage("b", ["main"])
+        preview.get_git_stage("a", ["main"])
+        preview.get_git_stage("c", ["main"])
+
+        self.assertEqual(list(preview._stages), ["a", "c"])
+        preview.get_git_stage("a", ["main"])
+        self.assertEqual(self.commits.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
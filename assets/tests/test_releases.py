@@ -0,0 +1,123 @@
+import unittest
+
+from pr_creator.releases import PINNED_BRANCHES, BranchIndex, build_release_index
+
+BRANCHES = [
+    "develop",
+    "feature/ABC-1-login",
+    "hotfix/1.9.1",
+    "hotfix/1.9.1-fix-crash",
+    "hotfix/1.9.2",
+    "main",
+    "release/1.10.0",
+    "release/1.10.0-a",
+    "release/1.2.3",
+    "release/1.2.3-a",
+    "release/1.2.3-b",
+    "release/1.9.0",
+    "release/1.9.0-b",
+    "release/2.0.0-a",
+    "release/notes",
+    "upstream/release/1.9.5",
+]
+
+
+class BuildReleaseIndexTest(unittest.TestCase):
+    def test_versions_newest_first_numerically(self):
+        index = build_release_index(BRANCHES)
+
+        self.assertEqual(
+            [entry["version"] for entry in index["versions"]],
+            ["2.0.0", "1.10.0", "1.9.5", "1.9.0", "1.2.3"],
+        )
+        self.assertEqual(index["versionCount"], 5)
+
+    def test_alpha_and_beta_grouped_with_their_version(self):
+        versions = build_release_index(BRANCHES)["versions"]
+        by_version = {entry["version"]: entry for entry in versions}
+
+        self.assertEqual(
+            by_version["1.2.3"],
+            {
+                "version": "1.2.3",
+                "staging": "release/1.2.3",
+                "alpha": "release/1.2.3-a",
+                "beta": "release/1.2.3-b",
+            },
+        )
+        # An alpha without its staging branch still forms a version.
+        self.assertEqual(
+            by_version["2.0.0"],
+            {"version": "2.0.0", "staging": None, "alpha": "release/2.0.0-a", "beta": None},
+        )
+        self.assertEqual(by_version["1.9.5"]["staging"], "upstream/release/1.9.5")
+
+    def test_latest_of_each_kind(self):
+        self.assertEqual(
+            build_release_index(BRANCHES)["latest"],
+            {
+                "staging": "release/1.10.0",
+                "alpha": "release/2.0.0-a",
+                "beta": "release/1.9.0-b",
+            },
+        )
+
+    def test_limit_caps_lists_but_not_latest(self):
+        index = build_release_index(BRANCHES, limit=1)
+
+        self.assertEqual([entry["version"] for entry in index["versions"]], ["2.0.0"])
+        self.assertEqual(index["versionCount"], 5)
+        self.assertEqual(index["latest"]["beta"], "release/1.9.0-b")
+        self.assertEqual(index["hotfixParents"], ["hotfix/1.9.1"])
+
+    def test_hotfix_parents_and_children(self):
+        index = build_release_index(BRANCHES)
+
+        self.assertEqual(index["hotfixParents"], ["hotfix/1.9.1", "hotfix/1.9.2"])
+        self.assertEqual(index["hotfixChildren"], ["hotfix/1.9.1-fix-crash"])
+
+    def test_live_branch(self):
+        self.assertEqual(build_release_index(["main", "master"])["liveBranch"], "main")
+        self.assertEqual(build_release_index(["master"])["liveBranch"], "master")
+        self.assertEqual(build_release_index([])["liveBranch"], "main")
+
+
+class BranchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = BranchIndex(BRANCHES)
+
+    def test_prefix_matches_name_or_path_segment(self):
+        self.assertEqual(
+            self.index.search("1.9"),
+            [
+                "hotfix/1.9.1",
+                "hotfix/1.9.1-fix-crash",
+                "hotfix/1.9.2",
+                "release/1.9.0",
+                "release/1.9.0-b",
+                "upstream/release/1.9.5",
+            ],
+        )
+
+    def test_full_name_matches_first_and_case_insensitive(self):
+        self.assertEqual(
+            self.index.search("REL")[:2], ["release/1.10.0", "release/1.10.0-a"]
+        )
+        self.assertEqual(self.index.search("rel")[-1], "upstream/release/1.9.5")
+
+    def test_no_prefix_lists_every_branch_in_order(self):
+        self.assertEqual(self.index.search(), BRANCHES)
+
+    def test_pinned_branches_survive_the_limit(self):
+        limited = self.index.search("", 2, pinned=PINNED_BRANCHES)
+
+        self.assertEqual(limited, ["develop", "feature/ABC-1-login", "main"])
+
+    def test_pinned_branches_must_match_the_prefix(self):
+        self.assertEqual(
+            self.index.search("release", 1, pinned=PINNED_BRANCHES), ["release/1.10.0"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
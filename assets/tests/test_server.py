@@ -0,0 +1,26 @@
+import unittest
+from unittest import mock
+
+from pr_creator import server
+
+
+class RepoSessionTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(server, "get_ttl_seconds", return_value=300)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_contributors_are_reused_within_the_api_cache_ttl(self):
+        session = server.RepoSession("/repo")
+        self.assertIsNone(session.cached_contributors())
+
+        with mock.patch.object(server.time, "monotonic", return_value=1000.0):
+            session.remember_contributors(["alice"])
+        with mock.patch.object(server.time, "monotonic", return_value=1299.0):
+            self.assertEqual(session.cached_contributors(), ["alice"])
+        with mock.patch.object(server.time, "monotonic", return_value=1300.0):
+            self.assertIsNone(session.cached_contributors())
+
+
+if __name__ == "__main__":
+    unittest.main()
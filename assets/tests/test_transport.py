@@ -0,0 +1,200 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pr_creator import api_cache, transport
+from pr_creator.cache import CACHE_DIR_ENV
+from pr_creator.transport import HttpTransport, TransportError
+
+ETAG = '"contributors-v1"'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """A few GitHub endpoints, recording every request it serves."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload=None, headers=None, close=False):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Drop the connection without announcing it, like an idle timeout.
+        self.close_connection = close
+
+    def _record(self):
+        self.server.requests.append(
+            {
+                "method": self.command,
+                "path": self.path,
+                "client_port": self.client_address[1],
+                "headers": {name.lower(): value for name, value in self.headers.items()},
+            }
+        )
+
+    def do_GET(self):
+        self._record()
+        port = self.server.server_address[1]
+        if self.path == "/repos/o/r/contributors?page=1":
+            if self.headers.get("If-None-Match") == ETAG:
+                self._send(304, headers={"ETag": ETAG})
+                return
+            next_url = f"http://127.0.0.1:{port}/repos/o/r/contributors?page=2"
+            self._send(
+                200,
+                [{"login": "alice"}],
+                {"ETag": ETAG, "Link": f'<{next_url}>; rel="next"'},
+            )
+        elif self.path == "/repos/o/r/contributors?page=2":
+            self._send(200, [{"login": "bob"}])
+        elif self.path == "/api/v3/repos/o/r/contributors":
+            # GitHub Enterprise links to later pages by repository id.
+            next_url = f"http://127.0.0.1:{port}/api/v3/repositories/1/contributors?page=2"
+            self._send(200, [{"login": "alice"}], {"Link": f'<{next_url}>; rel="next"'})
+        elif self.path == "/api/v3/repositories/1/contributors?page=2":
+            self._send(200, [{"login": "bob"}])
+        elif self.path == "/user":
+            self._send(200, {"login": "octocat"})
+        elif self.path == "/drop":
+            self._send(200, {"ok": True}, close=True)
+        elif self.path == "/boom":
+            self._send(500, {"message": "Server Error"})
+        else:
+            self._send(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        self._record()
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if "broken" in payload.get("query", ""):
+            self._send(200, {"errors": [{"message": "Field 'broken' doesn't exist"}]})
+        else:
+            self._send(200, {"data": {"viewer": {"login": "octocat"}}})
+
+
+class HttpTransportTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.requests = []
+        thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.transport = HttpTransport(base_url, token="test-token")
+
+        # api_cache goes through the process-wide transport and cache directory.
+        previous_transport = transport._transport
+        transport._transport = self.transport
+        self.addCleanup(setattr, transport, "_transport", previous_transport)
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        previous_cache_dir = os.environ.get(CACHE_DIR_ENV)
+        os.environ[CACHE_DIR_ENV] = cache_dir.name
+        self.addCleanup(self._restore_env, CACHE_DIR_ENV, previous_cache_dir)
+
+    @staticmethod
+    def _restore_env(name, value):
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+    def test_requests_reuse_a_pooled_connection(self):
+        for _ in range(3):
+            response = self.transport.request("GET", "user")
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.json(), {"login": "octocat"})
+
+        ports = {request["client_port"] for request in self.server.requests}
+        self.assertEqual(len(ports), 1)
+        self.assertEqual(
+            self.server.requests[0]["headers"]["authorization"], "Bearer test-token"
+        )
+
+    def test_connection_closed_by_server_is_retried(self):
+        self.transport.request("GET", "drop")
+        response = self.transport.request("GET", "user")
+
+        self.assertEqual(response.status, 200)
+        ports = [request["client_port"] for request in self.server.requests]
+        self.assertNotEqual(ports[0], ports[1])
+
+    def test_etag_revalidation_serves_cached_body_on_304(self):
+        first = api_cache.cached_api_get("repos/o/r/contributors?page=1", ttl=0)
+        second = api_cache.cached_api_get("repos/o/r/contributors?page=1", ttl=0)
+
+        self.assertEqual(first["body"], [{"login": "alice"}])
+        self.assertEqual(second["body"], [{"login": "alice"}])
+        self.assertNotIn("if-none-match", self.server.requests[0]["headers"])
+        self.assertEqual(self.server.requests[1]["headers"]["if-none-match"], ETAG)
+
+    def test_fresh_cache_entry_skips_the_network(self):
+        api_cache.cached_api_get("repos/o/r/contributors?page=1", ttl=300)
+        api_cache.cached_api_get("repos/o/r/contributors?page=1", ttl=300)
+
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_link_header_pagination(self):
+        pages = list(api_cache.iter_api_pages("repos/o/r/contributors?page=1", ttl=0))
+
+        self.assertEqual(pages, [[{"login": "alice"}], [{"login": "bob"}]])
+        self.assertEqual(
+            [request["path"] for request in self.server.requests],
+            ["/repos/o/r/contributors?page=1", "/repos/o/r/contributors?page=2"],
+        )
+
+    def test_link_header_pagination_on_github_enterprise(self):
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v3"
+        transport._transport = HttpTransport(base_url, token="test-token")
+
+        pages = list(api_cache.iter_api_pages("repos/o/r/contributors", ttl=0))
+
+        self.assertEqual(pages, [[{"login": "alice"}], [{"login": "bob"}]])
+        self.assertEqual(
+            [request["path"] for request in self.server.requests],
+            [
+                "/api/v3/repos/o/r/contributors",
+                "/api/v3/repositories/1/contributors?page=2",
+            ],
+        )
+
+    def test_error_statuses(self):
+        missing = self.transport.request("GET", "missing")
+        self.assertEqual(missing.status, 404)
+        with self.assertRaisesRegex(TransportError, "Not Found"):
+            self.transport._checked(missing)
+        with self.assertRaisesRegex(TransportError, "Server Error"):
+            self.transport._checked(self.transport.request("GET", "boom"))
+
+        # An error status with nothing cached yields no entry rather than raising.
+        self.assertIsNone(api_cache.cached_api_get("boom", ttl=0))
+
+    def test_graphql(self):
+        data = self.transport.graphql("query { viewer { login } }")
+        self.assertEqual(data, {"viewer": {"login": "octocat"}})
+        with self.assertRaisesRegex(TransportError, "broken"):
+            self.transport.graphql("query { broken }")
+
+    def test_unreachable_server(self):
+        self.server.shutdown()
+        self.server.server_close()
+        unreachable = HttpTransport("http://127.0.0.1:9", token="test-token")
+        with self.assertRaises(TransportError):
+            unreachable.request("GET", "user")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ import {
 } from "@raycast/api";
 import { ReactNode } from "react";
 import { useRepos, Preferences } from "../hooks/useRepos";
+import { RepoSummary, useRepoSummaries } from "../hooks/useRepoSummaries";
 import { Repo } from "../utils/repos";
 
 interface SelectRepoProps {
@@ -17,17 +18,30 @@ interface SelectRepoProps {
 
 function RepoItem({
   repo,
+  summary,
   onSelect,
 }: {
   repo: Repo;
+  summary?: RepoSummary;
   onSelect: (path: string) => void;
 }) {
+  const accessories: List.Item.Accessory[] = [];
+  if (summary?.error) {
+    accessories.push({ icon: Icon.Warning, tooltip: summary.error });
+  } else if (summary?.currentBranch) {
+    accessories.push({
+      tag: summary.currentBranch,
+      tooltip: `${summary.remoteBranchCount ?? 0} remote branches`,
+    });
+  }
+
   return (
     <List.Item
       key={repo.path}
       title={repo.name}
       subtitle={repo.path}
       icon={Icon.Folder}
+      accessories={accessories}
       actions={
         <ActionPanel>
           <Action
@@ -45,6 +59,7 @@ function RepoItem({
 export function SelectRepo({ onSelect, addRepositoryTarget }: SelectRepoProps) {
   const preferences = getPreferenceValues<Preferences>();
   const { repos, isLoading } = useRepos();
+  const summaries = useRepoSummaries(repos);
   const recentRepos = repos.filter((repo) => repo.source === "recent");
   const projectRepos = repos.filter((repo) => repo.source === "projects");
 
@@ -92,14 +107,24 @@ export function SelectRepo({ onSelect, addRepositoryTarget }: SelectRepoProps) {
       {recentRepos.length > 0 && (
         <List.Section title="Recent">
           {recentRepos.map((repo) => (
-            <RepoItem key={repo.path} repo={repo} onSelect={onSelect} />
+            <RepoItem
+              key={repo.path}
+              repo={repo}
+              summary={summaries[repo.path]}
+              onSelect={onSelect}
+            />
           ))}
         </List.Section>
       )}
       {projectRepos.length > 0 && (
         <List.Section title="Projects Directory">
           {projectRepos.map((repo) => (
-            <RepoItem key={repo.path} repo={repo} onSelect={onSelect} />
+            <RepoItem
+              key={repo.path}
+              repo={repo}
+              summary={summaries[repo.path]}
+              onSelect={onSelect}
+            />
           ))}
         </List.Section>
       )}
@@ -2,7 +2,7 @@ import { Form, ActionPanel, Action, Detail, Icon } from "@raycast/api";
 import { useState, useMemo, useEffect, useRef } from "react";
 import { useGitData, GitData } from "../../hooks/useGitData";
 import { useRepos } from "../../hooks/useRepos";
-import { usePRPreview } from "../../hooks/usePRPreview";
+import { PreviewResult, usePRPreview } from "../../hooks/usePRPreview";
 import { usePRForm } from "../../hooks/usePRForm";
 import { rememberRepoPath } from "../../utils/repos";
 import {
@@ -32,6 +32,7 @@ export function PRFormView({
   const {
     data: newData,
     isLoading,
+    isRevalidating,
     error: fetchError,
   } = useGitData(shouldFetch ? repoPath : undefined);
 
@@ -53,18 +54,18 @@ export function PRFormView({
     if (strategyType === "release") {
       return getReleaseStages(
         currentData.currentBranch,
-        currentData.remoteBranches,
+        currentData.releaseIndex,
       );
     }
     if (strategyType === "hotfix") {
       return [
         ...getChildHotfixStages(
           currentData.currentBranch,
-          currentData.remoteBranches,
+          currentData.releaseIndex,
         ),
         ...getParentHotfixStages(
           currentData.currentBranch,
-          currentData.remoteBranches,
+          currentData.releaseIndex,
         ),
       ];
     }
@@ -88,11 +89,7 @@ export function PRFormView({
   const [recommendation, setRecommendation] =
     useState<StrategyRecommendation | null>(initialRecommendation);
 
-  const [preview, setPreview] = useState<{
-    title: string;
-    body: string;
-    suggestedReviewers?: string[];
-  } | null>(null);
+  const [preview, setPreview] = useState<PreviewResult | null>(null);
 
   // If we are switching repos and loading, pass null or a safe fallback to usePRForm.
   // However, usePRForm requires data to populate fields.
@@ -169,7 +166,7 @@ export function PRFormView({
 
   return (
     <Form
-      isLoading={isRefreshing || showLoading}
+      isLoading={isRefreshing || showLoading || isRevalidating}
       actions={
         <ActionPanel>
           <Action.SubmitForm
@@ -217,17 +214,17 @@ export function PRFormView({
             if (newType === "release") {
               stages = getReleaseStages(
                 currentData.currentBranch,
-                currentData.remoteBranches,
+                currentData.releaseIndex,
               );
             } else if (newType === "hotfix") {
               stages = [
                 ...getChildHotfixStages(
                   currentData.currentBranch,
-                  currentData.remoteBranches,
+                  currentData.releaseIndex,
                 ),
                 ...getParentHotfixStages(
                   currentData.currentBranch,
-                  currentData.remoteBranches,
+                  currentData.releaseIndex,
                 ),
               ];
             }
@@ -384,6 +381,15 @@ export function PRFormView({
       {preview && (
         <>
           <Form.Separator />
+          {Object.entries(preview.existingPullRequests || {}).map(
+            ([target, url]) => (
+              <Form.Description
+                key={`existing-${target}`}
+                title="⚠️ PR Already Exists"
+                text={`${target}: ${url}`}
+              />
+            ),
+          )}
           <Form.Description
             title="Final PR Preview"
             text={`**Full Title:** \`${preview.title}\`\n\n**Full Description:**\n\n${preview.body}`}
@@ -19,11 +19,11 @@ export function StageList({ type, data, selectedRepoPath }: StageListProps) {
 
   let stages: Stage[] = [];
   if (type === "release") {
-    stages = getReleaseStages(data.currentBranch, data.remoteBranches);
+    stages = getReleaseStages(data.currentBranch, data.releaseIndex);
   } else if (type === "hotfix-child") {
-    stages = getChildHotfixStages(data.currentBranch, data.remoteBranches);
+    stages = getChildHotfixStages(data.currentBranch, data.releaseIndex);
   } else if (type === "hotfix-parent") {
-    stages = getParentHotfixStages(data.currentBranch, data.remoteBranches);
+    stages = getParentHotfixStages(data.currentBranch, data.releaseIndex);
   }
 
   const title =
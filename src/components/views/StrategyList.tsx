@@ -17,7 +17,7 @@ export function StrategyList({
   selectedRepoPath,
 }: StrategyListProps) {
   const { push, pop } = useNavigation();
-  const { data, saveReviewers, isLoading, refresh } =
+  const { data, saveReviewers, isLoading, isRevalidating, refresh } =
     useGitData(selectedRepoPath);
 
   const currentData = data || initialData;
@@ -51,7 +51,10 @@ export function StrategyList({
   }, [currentData?.currentBranch, hasAutoNavigated, push]);
 
   return (
-    <List navigationTitle="Select Strategy" isLoading={isLoading}>
+    <List
+      navigationTitle="Select Strategy"
+      isLoading={isLoading || isRevalidating}
+    >
       <List.Item
         title="Release Strategy"
         icon={Icon.Rocket}
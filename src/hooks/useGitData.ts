@@ -1,15 +1,32 @@
 import { useState, useEffect, useCallback } from "react";
-import { runPythonScript } from "../utils/shell";
+import { runPythonScript, runPythonScriptStream } from "../utils/shell";
 import { showToast, Toast } from "@raycast/api";
+import { ReleaseIndex } from "../utils/strategies";
+
+// Branches listed in the payload; the engine answers --get-branches for the
+// rest as the user types, and release stages come from releaseIndex.
+export const BRANCH_LIMIT = 500;
+
+export interface OpenPullRequest {
+  url: string;
+  title: string;
+}
 
 export interface GitData {
   currentBranch: string;
   remoteBranches: string[];
+  // Remote branches in the repository; more than remoteBranches when truncated.
+  remoteBranchCount: number;
+  releaseIndex: ReleaseIndex;
   contributors: string[];
   suggestedTickets: string[];
   suggestedTitle: string;
   personalizedReviewers: string[];
   defaultTargetBranch?: string;
+  currentUser?: string;
+  openPullRequests?: Record<string, OpenPullRequest>;
+  // True while a background fetch may still replace this payload.
+  revalidating?: boolean;
   error?: string;
 }
 
@@ -27,6 +44,9 @@ function isGitData(value: unknown): value is GitData {
   return (
     typeof currentBranch === "string" &&
     Array.isArray(remoteBranches) &&
+    typeof obj.remoteBranchCount === "number" &&
+    typeof obj.releaseIndex === "object" &&
+    obj.releaseIndex !== null &&
     Array.isArray(contributors) &&
     Array.isArray(suggestedTickets) &&
     typeof suggestedTitle === "string" &&
@@ -51,12 +71,14 @@ function isSaveReviewersResult(value: unknown): value is SaveReviewersResult {
 export function useGitData(repoPath?: string): {
   data: GitData | null;
   isLoading: boolean;
+  isRevalidating: boolean;
   error: string | null;
   saveReviewers: (reviewers: string[]) => Promise<boolean>;
   refresh: () => void;
 } {
   const [data, setData] = useState<GitData | null>(null);
   const [isLoading, setIsLoading] = useState(false);
+  const [isRevalidating, setIsRevalidating] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const fetchData = useCallback(
@@ -67,19 +89,30 @@ export function useGitData(repoPath?: string): {
       setError(null);
 
       try {
-        const args = ["--get-data"];
+        // One GraphQL round trip for all GitHub metadata instead of a chain
+        // of REST calls.
+        const args = [
+          "--get-data",
+          "--graphql",
+          "--branch-limit",
+          String(BRANCH_LIMIT),
+        ];
         if (fetchRemote) {
           args.push("--fetch");
         }
-        const result = await runPythonScript(args, repoPath);
-
-        if (isErrorResponse(result)) {
-          setError(result.error);
-        } else if (isGitData(result)) {
-          setData(result);
-        } else {
-          setError("Invalid response from git data");
-        }
+        // Locally known branches arrive first; a second payload follows only
+        // if the background fetch changed the remote refs.
+        await runPythonScriptStream(args, repoPath, (result) => {
+          if (isErrorResponse(result)) {
+            setError(result.error);
+          } else if (isGitData(result)) {
+            setData(result);
+            setIsRevalidating(result.revalidating === true);
+          } else {
+            setError("Invalid response from git data");
+          }
+          setIsLoading(false);
+        });
       } catch (err) {
         const errorMessage = String(err);
         setError(errorMessage);
@@ -90,13 +123,15 @@ export function useGitData(repoPath?: string): {
         });
       } finally {
         setIsLoading(false);
+        setIsRevalidating(false);
       }
     },
     [repoPath],
   );
 
   useEffect(() => {
-    fetchData(false); // Initial load: no fetch for speed
+    // Local data renders immediately; the fetch runs in the background.
+    fetchData(true);
   }, [fetchData]);
 
   const saveReviewers = useCallback(
@@ -130,6 +165,7 @@ export function useGitData(repoPath?: string): {
   return {
     data,
     isLoading,
+    isRevalidating,
     error,
     saveReviewers,
     refresh: () => fetchData(true),
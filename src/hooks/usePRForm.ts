@@ -1,8 +1,13 @@
 import { useState, useRef, useEffect, useMemo, useCallback } from "react";
 import { showToast, Toast, open, getPreferenceValues } from "@raycast/api";
 import { useCachedState } from "@raycast/utils";
-import { runPythonScript } from "../utils/shell";
-import { GitData } from "./useGitData";
+import {
+  ProgressEvent,
+  runPythonScript,
+  runPythonScriptWithProgress,
+} from "../utils/shell";
+import { BRANCH_LIMIT, GitData } from "./useGitData";
+import { PreviewResult } from "./usePRPreview";
 import { StrategyRecommendation } from "../utils/strategies";
 
 export interface PRFormValues {
@@ -19,13 +24,7 @@ export interface PRFormValues {
 interface UsePRFormProps {
   selectedRepoPath: string | null;
   data: GitData | null;
-  setPreview: (
-    preview: {
-      title: string;
-      body: string;
-      suggestedReviewers?: string[];
-    } | null,
-  ) => void;
+  setPreview: (preview: PreviewResult | null) => void;
   recommendation?: StrategyRecommendation | null;
 }
 
@@ -56,6 +55,26 @@ function isSkippedResult(r: unknown): r is SkippedResult {
   return typeof r === "object" && r !== null && "skipped" in r && "target" in r;
 }
 
+/** Describe a headless progress event for the toast. */
+function describeProgress(event: ProgressEvent): string | null {
+  switch (event.event) {
+    case "fetch-done":
+      return "Branches up to date";
+    case "description-built":
+      return `${event.target}: description ready`;
+    case "duplicate-check":
+      return event.exists
+        ? `${event.target}: PR already exists`
+        : `${event.target}: creating PR`;
+    case "pr-created":
+      return `${event.target}: PR created`;
+    case "target-error":
+      return `${event.target}: ${event.error}`;
+    default:
+      return null;
+  }
+}
+
 interface DescriptionResult {
   description?: string;
 }
@@ -70,6 +89,19 @@ function isDescriptionResult(value: unknown): value is DescriptionResult {
   return typeof value === "object" && value !== null;
 }
 
+interface BranchesResult {
+  branches: string[];
+  matchCount: number;
+}
+
+function isBranchesResult(value: unknown): value is BranchesResult {
+  return (
+    typeof value === "object" &&
+    value !== null &&
+    Array.isArray((value as BranchesResult).branches)
+  );
+}
+
 function isPRSubmissionResult(value: unknown): value is PRSubmissionResult {
   return typeof value === "object" && value !== null && "success" in value;
 }
@@ -82,13 +114,7 @@ export function usePRForm({
 }: UsePRFormProps) {
   // Wrap setPreview to sniff suggestedReviewers
   const interceptSetPreview = useCallback(
-    (
-      preview: {
-        title: string;
-        body: string;
-        suggestedReviewers?: string[];
-      } | null,
-    ) => {
+    (preview: PreviewResult | null) => {
       setPreview(preview);
       if (
         preview?.suggestedReviewers &&
@@ -130,9 +156,13 @@ export function usePRForm({
   // --- UI/Search States ---
   const [targetSearchText, setTargetSearchText] = useState("");
   const [reviewerSearchText, setReviewerSearchText] = useState("");
+  // Branches beyond the truncated --get-data list that match targetSearchText.
+  const [searchedBranches, setSearchedBranches] = useState<string[]>([]);
 
   // --- Refs ---
   const isDescriptionDirty = useRef(false);
+  // Bumped per --get-branches lookup; only the latest one may set results.
+  const branchSearchSeq = useRef(0);
 
   // --- Effects ---
 
@@ -195,6 +225,44 @@ export function usePRForm({
     }
   }, [selectedRepoPath, sourceBranch, targetBranches]);
 
+  // Look up branches the --get-data payload left out as the user types
+  useEffect(() => {
+    if (
+      !selectedRepoPath ||
+      !data ||
+      !targetSearchText ||
+      data.remoteBranchCount <= data.remoteBranches.length
+    ) {
+      setSearchedBranches([]);
+      return;
+    }
+    const timer = setTimeout(() => {
+      const seq = ++branchSearchSeq.current;
+      runPythonScript(
+        [
+          "--get-branches",
+          "--branch-prefix",
+          targetSearchText,
+          "--branch-limit",
+          String(BRANCH_LIMIT),
+        ],
+        selectedRepoPath,
+      )
+        .then((result) => {
+          // Drop responses overtaken by a later lookup or an edit since.
+          if (seq === branchSearchSeq.current && isBranchesResult(result)) {
+            setSearchedBranches(result.branches);
+          }
+        })
+        .catch((e) => console.error("Failed to search branches:", e));
+    }, 300); // Debounced like the preview, so typing spawns one lookup
+    return () => {
+      clearTimeout(timer);
+      // Invalidate any lookup still in flight for the previous text.
+      branchSearchSeq.current++;
+    };
+  }, [selectedRepoPath, data, targetSearchText]);
+
   // --- Actions ---
 
   const fetchInitialDescription = useCallback(async () => {
@@ -232,9 +300,11 @@ export function usePRForm({
         style: Toast.Style.Animated,
         title: "Creating Pull Request(s)...",
       });
+      // PRs reported by progress events, kept in case the run fails later.
+      const createdUrls: string[] = [];
 
       try {
-        const args: string[] = ["--headless"];
+        const args: string[] = ["--headless", "--stream"];
         args.push("--source", values.source);
         values.targets.forEach((t: string) => {
           args.push("--target", t);
@@ -254,9 +324,16 @@ export function usePRForm({
           values.reviewers.forEach((r: string) => args.push("--reviewers", r));
         }
 
-        const result = await runPythonScript(
+        const result = await runPythonScriptWithProgress(
           args,
           selectedRepoPath || undefined,
+          (event) => {
+            if (event.event === "pr-created" && typeof event.url === "string") {
+              createdUrls.push(event.url);
+            }
+            const message = describeProgress(event);
+            if (message) toast.message = message;
+          },
         );
 
         if (isPRSubmissionResult(result) && result.success) {
@@ -315,6 +392,13 @@ export function usePRForm({
         toast.style = Toast.Style.Failure;
         toast.title = "Failed to create PR";
         toast.message = String(error);
+        if (createdUrls.length > 0) {
+          toast.message = `Created ${createdUrls.length} PR(s) before: ${error}`;
+          toast.primaryAction = {
+            title: "Open Created PRs",
+            onAction: () => createdUrls.forEach((url) => open(url)),
+          };
+        }
       }
     },
     [selectedRepoPath, data, setPreview, openPrInBrowser],
@@ -332,8 +416,14 @@ export function usePRForm({
 
   const allTargetOptions = useMemo(
     () =>
-      Array.from(new Set([...(data?.remoteBranches || []), ...targetBranches])),
-    [data, targetBranches],
+      Array.from(
+        new Set([
+          ...(data?.remoteBranches || []),
+          ...searchedBranches,
+          ...targetBranches,
+        ]),
+      ),
+    [data, searchedBranches, targetBranches],
   );
 
   const allReviewerOptions = useMemo(() => {
@@ -342,8 +432,11 @@ export function usePRForm({
       // If personalized reviewers are set, only show those as options
       return Array.from(new Set([...personalized, ...reviewers]));
     }
-    // Otherwise show all contributors
-    return Array.from(new Set([...(data?.contributors || []), ...reviewers]));
+    // Otherwise show all contributors, except the PR author
+    const contributors = (data?.contributors || []).filter(
+      (login) => login !== data?.currentUser,
+    );
+    return Array.from(new Set([...contributors, ...reviewers]));
   }, [data, reviewers]);
 
   return {
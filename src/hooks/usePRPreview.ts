@@ -1,10 +1,11 @@
 import { useState, useEffect, useCallback } from "react";
 import { runPythonScript } from "../utils/shell";
 
-interface PreviewResult {
+export interface PreviewResult {
   title: string;
   body: string;
   suggestedReviewers?: string[];
+  existingPullRequests?: Record<string, string>;
 }
 
 interface UsePRPreviewProps {
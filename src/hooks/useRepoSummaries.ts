@@ -0,0 +1,45 @@
+import { useEffect, useState } from "react";
+import { ProgressEvent, runPythonScriptWithProgress } from "../utils/shell";
+import { Repo } from "../utils/repos";
+
+export interface RepoSummary {
+  repoPath: string;
+  currentBranch?: string;
+  remoteBranchCount?: number;
+  defaultTargetBranch?: string;
+  error?: string;
+}
+
+function isRepoSummaryEvent(
+  event: ProgressEvent,
+): event is ProgressEvent & RepoSummary {
+  return event.event === "repo-data" && typeof event.repoPath === "string";
+}
+
+/**
+ * Current branch and branch count of every repository in the picker, read
+ * by one engine request (--get-repos-data) that covers all of them in
+ * parallel. Summaries appear one by one as each repository is read.
+ */
+export function useRepoSummaries(repos: Repo[]): Record<string, RepoSummary> {
+  const [summaries, setSummaries] = useState<Record<string, RepoSummary>>({});
+  const pathsKey = repos.map((repo) => repo.path).join("\n");
+
+  useEffect(() => {
+    if (!pathsKey) return;
+    let cancelled = false;
+    const args = ["--get-repos-data", "--branch-limit", "1"];
+    pathsKey.split("\n").forEach((repoPath) => args.push("--repos", repoPath));
+
+    runPythonScriptWithProgress(args, undefined, (event) => {
+      if (cancelled || !isRepoSummaryEvent(event)) return;
+      setSummaries((current) => ({ ...current, [event.repoPath]: event }));
+    }).catch((err) => console.error("Failed to read repositories:", err));
+
+    return () => {
+      cancelled = true;
+    };
+  }, [pathsKey]);
+
+  return summaries;
+}
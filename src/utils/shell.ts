@@ -1,11 +1,272 @@
-import { execFile } from "child_process";
+import { ChildProcessWithoutNullStreams, execFile, spawn } from "child_process";
 import path from "path";
+import { createInterface } from "readline";
 import { promisify } from "util";
 import { environment } from "@raycast/api";
-import { existsSync } from "fs";
+import { existsSync, readdirSync, statSync } from "fs";
 
 const execFileAsync = promisify(execFile);
 
+const ENGINE_TIMEOUT_MS = 120000;
+
+// CLI mode flags and the engine server method each one maps to.
+const ENGINE_METHODS: Record<string, string> = {
+  "--get-data": "get-data",
+  "--get-description": "get-description",
+  "--get-branches": "get-branches",
+  "--get-repos-data": "get-repos-data",
+  "--get-preview": "get-preview",
+  "--headless": "headless",
+  "--save-reviewers": "save-reviewers",
+};
+const BOOLEAN_FLAGS = new Set([
+  "--fetch",
+  "--full-fetch",
+  "--draft",
+  "--graphql",
+  "--stream",
+  "--timings",
+]);
+const LIST_FLAGS = new Set([
+  "--target",
+  "--reviewers",
+  "--tickets",
+  "--repos",
+]);
+
+class EngineUnavailableError extends Error {}
+
+/** A progress event from `--headless --stream`, e.g. `pr-created`. */
+export interface ProgressEvent {
+  event: string;
+  target?: string;
+  [key: string]: unknown;
+}
+
+type ProgressHandler = (event: ProgressEvent) => void;
+
+interface PendingRequest {
+  resolve: (value: unknown) => void;
+  reject: (reason: Error) => void;
+  timer: NodeJS.Timeout;
+  method: string;
+  onProgress?: ProgressHandler;
+}
+
+interface EngineResponse {
+  id?: number;
+  result?: unknown;
+  error?: { code: number; message: string };
+  // Set on notifications, which carry no id.
+  method?: string;
+  params?: Record<string, unknown>;
+}
+
+type NotificationHandler = (params: Record<string, unknown>) => void;
+
+/**
+ * Whether the precompiled bundle from build_engine.py is at least as new as
+ * every engine source file, so a stale bundle never shadows local edits.
+ */
+function isBundleFresh(bundle: string): boolean {
+  if (!existsSync(bundle)) return false;
+  try {
+    const builtAt = statSync(bundle).mtimeMs;
+    const packageDir = path.join(environment.assetsPath, "pr_creator");
+    const sources = [
+      path.join(environment.assetsPath, "pr_engine.py"),
+      ...readdirSync(packageDir)
+        .filter((name) => name.endsWith(".py"))
+        .map((name) => path.join(packageDir, name)),
+    ];
+    return sources.every((source) => statSync(source).mtimeMs <= builtAt);
+  } catch {
+    return false;
+  }
+}
+
+function getEnginePaths(): { python: string; script: string } {
+  const bundle = path.join(environment.assetsPath, "venv", "pr_engine.pyz");
+  return {
+    python: path.join(environment.assetsPath, "venv", "bin", "python3"),
+    script: isBundleFresh(bundle)
+      ? bundle
+      : path.join(environment.assetsPath, "pr_engine.py"),
+  };
+}
+
+function getEngineEnv(): Record<string, string> {
+  return {
+    ...process.env,
+    PATH: `/opt/homebrew/bin:/usr/local/bin:/usr/bin:/bin:/usr/sbin:/sbin:${process.env.PATH}`,
+  };
+}
+
+/**
+ * Translate CLI-style arguments into an engine server request.
+ * Returns null when the arguments do not map onto a server method.
+ */
+function toEngineRequest(
+  args: string[],
+  cwd?: string,
+): { method: string; params: Record<string, unknown> } | null {
+  let method: string | null = null;
+  const params: Record<string, unknown> = {};
+
+  for (let i = 0; i < args.length; i++) {
+    const flag = args[i] as string;
+    const mapped = ENGINE_METHODS[flag];
+    if (mapped) {
+      method = mapped;
+      continue;
+    }
+    if (!flag.startsWith("--")) return null;
+
+    const key = flag.slice(2).replace(/-/g, "_");
+    if (BOOLEAN_FLAGS.has(flag)) {
+      params[key] = true;
+      continue;
+    }
+
+    const value = args[++i];
+    if (value === undefined) return null;
+    if (LIST_FLAGS.has(flag)) {
+      const existing = (params[key] as string[] | undefined) || [];
+      params[key] = [...existing, value];
+    } else {
+      params[key] = value;
+    }
+  }
+
+  if (!method) return null;
+  if (cwd) params.repo_path = cwd;
+  return { method, params };
+}
+
+/**
+ * Client for the long-lived `pr_engine.py --serve` process.
+ * Keeps one warm interpreter for the lifetime of the extension.
+ */
+class EngineClient {
+  private child: ChildProcessWithoutNullStreams | null = null;
+  private nextId = 1;
+  private pending = new Map<number, PendingRequest>();
+  private listeners = new Map<string, Set<NotificationHandler>>();
+
+  private start(): ChildProcessWithoutNullStreams {
+    if (this.child) return this.child;
+
+    const { python, script } = getEnginePaths();
+    const child = spawn(python, [script, "--serve"], { env: getEngineEnv() });
+    child.unref();
+
+    createInterface({ input: child.stdout }).on("line", (line) =>
+      this.onLine(line),
+    );
+    child.stderr.on("data", (chunk) => {
+      console.warn("Python stderr:", String(chunk));
+    });
+    child.on("error", (error) =>
+      this.shutdown(new EngineUnavailableError(error.message)),
+    );
+    child.on("exit", () =>
+      this.shutdown(
+        new EngineUnavailableError("PR engine server exited unexpectedly"),
+      ),
+    );
+
+    this.child = child;
+    return child;
+  }
+
+  private onLine(line: string): void {
+    let response: EngineResponse;
+    try {
+      response = JSON.parse(line) as EngineResponse;
+    } catch {
+      console.warn("Ignoring malformed engine response:", line);
+      return;
+    }
+    if (typeof response.id !== "number") {
+      if (response.method === "progress") {
+        this.onProgress(response.params || {});
+      } else if (response.method) {
+        for (const handler of this.listeners.get(response.method) || []) {
+          handler(response.params || {});
+        }
+      }
+      return;
+    }
+
+    const request = this.pending.get(response.id);
+    if (!request) return;
+    this.pending.delete(response.id);
+    clearTimeout(request.timer);
+
+    if (response.error) {
+      request.reject(new Error(response.error.message));
+    } else {
+      request.resolve(response.result);
+    }
+  }
+
+  private onProgress(params: Record<string, unknown>): void {
+    const id = params.id;
+    if (typeof id !== "number" || !isProgressEvent(params)) return;
+    const request = this.pending.get(id);
+    if (!request) return;
+    // Progress shows the request is alive, so its timeout starts over.
+    clearTimeout(request.timer);
+    request.timer = this.armTimer(id, request.method);
+    request.onProgress?.(params);
+  }
+
+  private armTimer(id: number, method: string): NodeJS.Timeout {
+    return setTimeout(() => {
+      const request = this.pending.get(id);
+      if (!request) return;
+      this.pending.delete(id);
+      request.reject(new Error(`PR engine request timed out: ${method}`));
+    }, ENGINE_TIMEOUT_MS);
+  }
+
+  private shutdown(error: Error): void {
+    this.child = null;
+    for (const request of this.pending.values()) {
+      clearTimeout(request.timer);
+      request.reject(error);
+    }
+    this.pending.clear();
+  }
+
+  /** Subscribe to a server notification; returns the unsubscribe function. */
+  onNotification(method: string, handler: NotificationHandler): () => void {
+    const handlers = this.listeners.get(method) || new Set();
+    handlers.add(handler);
+    this.listeners.set(method, handlers);
+    return () => handlers.delete(handler);
+  }
+
+  request(
+    method: string,
+    params: Record<string, unknown>,
+    onProgress?: ProgressHandler,
+  ): Promise<unknown> {
+    const child = this.start();
+    const id = this.nextId++;
+
+    return new Promise((resolve, reject) => {
+      const timer = this.armTimer(id, method);
+      this.pending.set(id, { resolve, reject, timer, method, onProgress });
+      child.stdin.write(
+        JSON.stringify({ jsonrpc: "2.0", id, method, params }) + "\n",
+      );
+    });
+  }
+}
+
+const engineClient = new EngineClient();
+
 function isValidDirectory(dirPath: string): boolean {
   try {
     return existsSync(dirPath);
@@ -18,13 +279,213 @@ export async function runPythonScript(
   args: string[],
   cwd?: string,
 ): Promise<unknown> {
-  const scriptPath = path.join(environment.assetsPath, "pr_engine.py");
-  const pythonExecutable = path.join(
-    environment.assetsPath,
-    "venv",
-    "bin",
-    "python3",
+  if (cwd && !isValidDirectory(cwd)) {
+    throw new Error(`Invalid working directory: ${cwd}`);
+  }
+
+  const request = toEngineRequest(args, cwd);
+  if (request) {
+    try {
+      return await engineClient.request(request.method, request.params);
+    } catch (error) {
+      if (!(error instanceof EngineUnavailableError)) throw error;
+      // Fall back to a one-shot process if the server is unavailable.
+      console.warn("PR engine server unavailable:", error);
+    }
+  }
+
+  return runPythonProcess(args, cwd);
+}
+
+function isProgressEvent(payload: unknown): payload is ProgressEvent {
+  return (
+    typeof payload === "object" &&
+    payload !== null &&
+    typeof (payload as { event?: unknown }).event === "string"
   );
+}
+
+function isRevalidating(payload: unknown): boolean {
+  return (
+    typeof payload === "object" &&
+    payload !== null &&
+    (payload as { revalidating?: unknown }).revalidating === true
+  );
+}
+
+/**
+ * Wait for the server's refs-updated notification for a repository.
+ * Resolves to whether the refs changed, or false after the engine timeout.
+ */
+function waitForRefsUpdate(repoPath: unknown): {
+  updated: Promise<boolean>;
+  cancel: () => void;
+} {
+  let cancel = () => {};
+  const updated = new Promise<boolean>((resolve) => {
+    let unsubscribe = () => {};
+    const finish = (changed: boolean) => {
+      clearTimeout(timer);
+      unsubscribe();
+      resolve(changed);
+    };
+    const timer = setTimeout(() => finish(false), ENGINE_TIMEOUT_MS);
+    unsubscribe = engineClient.onNotification("refs-updated", (params) => {
+      if (params.repo_path === repoPath) finish(params.changed === true);
+    });
+    cancel = () => finish(false);
+  });
+  return { updated, cancel };
+}
+
+/**
+ * Run an engine mode that may answer more than once (stale-while-revalidate).
+ * The first payload arrives as soon as it is known locally and carries
+ * `revalidating: true` while a background fetch runs; a later payload
+ * replaces it only if the fetch changed something. Resolves once no further
+ * payloads will follow.
+ */
+export async function runPythonScriptStream(
+  args: string[],
+  cwd: string | undefined,
+  onPayload: (payload: unknown) => void,
+): Promise<void> {
+  if (cwd && !isValidDirectory(cwd)) {
+    throw new Error(`Invalid working directory: ${cwd}`);
+  }
+
+  const request = toEngineRequest(args, cwd);
+  if (request) {
+    // Subscribe first: a fast fetch can finish before the response arrives.
+    const { updated, cancel } = waitForRefsUpdate(request.params.repo_path);
+    try {
+      const first = await engineClient.request(request.method, request.params);
+      onPayload(first);
+      if (!isRevalidating(first)) {
+        cancel();
+        return;
+      }
+      if (await updated) {
+        onPayload(
+          await engineClient.request(request.method, {
+            ...request.params,
+            fetch: false,
+          }),
+        );
+      }
+      return;
+    } catch (error) {
+      cancel();
+      if (!(error instanceof EngineUnavailableError)) throw error;
+      console.warn("PR engine server unavailable:", error);
+    }
+  }
+
+  await runPythonProcessStream(args, cwd, onPayload);
+}
+
+/**
+ * Run an engine mode that reports progress (`--headless --stream`).
+ * Each event reaches onEvent as it happens and restarts the engine timeout,
+ * so long multi-target runs are not cut off. Resolves with the final
+ * summary.
+ */
+export async function runPythonScriptWithProgress(
+  args: string[],
+  cwd: string | undefined,
+  onEvent: ProgressHandler,
+): Promise<unknown> {
+  if (cwd && !isValidDirectory(cwd)) {
+    throw new Error(`Invalid working directory: ${cwd}`);
+  }
+
+  // The server handles one request at a time and a headless run waits on
+  // GitHub for seconds per target, so it gets its own process and previews
+  // keep flowing through the server meanwhile.
+  const request = args.includes("--headless")
+    ? null
+    : toEngineRequest(args, cwd);
+  if (request) {
+    try {
+      return await engineClient.request(
+        request.method,
+        request.params,
+        onEvent,
+      );
+    } catch (error) {
+      if (!(error instanceof EngineUnavailableError)) throw error;
+      console.warn("PR engine server unavailable:", error);
+    }
+  }
+
+  let summary: unknown = undefined;
+  await runPythonProcessStream(args, cwd, (payload) => {
+    if (isProgressEvent(payload)) {
+      onEvent(payload);
+    } else {
+      summary = payload;
+    }
+  });
+  if (summary === undefined) {
+    throw new Error("PR engine exited before reporting a result");
+  }
+  return summary;
+}
+
+/**
+ * Spawn a one-shot engine process and report each NDJSON line it prints.
+ * The timeout restarts with every line.
+ */
+function runPythonProcessStream(
+  args: string[],
+  cwd: string | undefined,
+  onPayload: (payload: unknown) => void,
+): Promise<void> {
+  const { python, script } = getEnginePaths();
+  const finalArgs = cwd ? [...args, cwd] : args;
+
+  return new Promise((resolve, reject) => {
+    const child = spawn(python, [script, ...finalArgs], {
+      cwd,
+      env: getEngineEnv(),
+    });
+    let timer = setTimeout(() => child.kill(), ENGINE_TIMEOUT_MS);
+    let received = false;
+
+    createInterface({ input: child.stdout }).on("line", (line) => {
+      if (!line.trim()) return;
+      clearTimeout(timer);
+      timer = setTimeout(() => child.kill(), ENGINE_TIMEOUT_MS);
+      try {
+        onPayload(JSON.parse(line));
+        received = true;
+      } catch {
+        console.warn("Ignoring malformed engine output:", line);
+      }
+    });
+    child.stderr.on("data", (chunk) => {
+      console.warn("Python stderr:", String(chunk));
+    });
+    child.on("error", (error) => {
+      clearTimeout(timer);
+      reject(error);
+    });
+    child.on("close", (code) => {
+      clearTimeout(timer);
+      if (received || code === 0) {
+        resolve();
+      } else {
+        reject(new Error(`PR engine exited with code ${code}`));
+      }
+    });
+  });
+}
+
+async function runPythonProcess(
+  args: string[],
+  cwd?: string,
+): Promise<unknown> {
+  const { python: pythonExecutable, script: scriptPath } = getEnginePaths();
 
   const finalArgs = [...args];
   const executionOptions: {
@@ -33,11 +494,8 @@ export async function runPythonScript(
     env: Record<string, string>;
     maxBuffer: number;
   } = {
-    timeout: 120000,
-    env: {
-      ...process.env,
-      PATH: `/opt/homebrew/bin:/usr/local/bin:/usr/bin:/bin:/usr/sbin:/sbin:${process.env.PATH}`,
-    },
+    timeout: ENGINE_TIMEOUT_MS,
+    env: getEngineEnv(),
     maxBuffer: 10 * 1024 * 1024,
   };
 
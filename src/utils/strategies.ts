@@ -10,9 +10,35 @@ export interface Stage {
   recommendation: StrategyRecommendation;
 }
 
-export const STAGING_PATTERN = /release\/\d+\.\d+\.\d+$/;
-export const ALPHA_PATTERN = /release\/\d+\.\d+\.\d+-a$/;
-export const BETA_PATTERN = /release\/\d+\.\d+\.\d+-b$/;
+/**
+ * One release version as indexed by the engine (release/x.y.z, -a, -b).
+ * Branches that do not exist are null.
+ */
+export interface ReleaseVersion {
+  version: string;
+  staging: string | null;
+  alpha: string | null;
+  beta: string | null;
+}
+
+/**
+ * Release and hotfix branches parsed by the engine (--get-data), so the
+ * stages below never scan or sort the full branch list. Versions are
+ * newest first; "latest" covers every branch even when the lists are
+ * truncated by --branch-limit.
+ */
+export interface ReleaseIndex {
+  versions: ReleaseVersion[];
+  versionCount: number;
+  latest: {
+    staging: string | null;
+    alpha: string | null;
+    beta: string | null;
+  };
+  liveBranch: string;
+  hotfixParents: string[];
+  hotfixChildren: string[];
+}
 
 function buildStageId(recommendation: StrategyRecommendation): string {
   return [
@@ -30,23 +56,20 @@ function buildStageId(recommendation: StrategyRecommendation): string {
  */
 export function getReleaseStages(
   currentBranch: string,
-  remoteBranches: string[],
+  releaseIndex: ReleaseIndex,
 ): Stage[] {
-  const releaseBranches = remoteBranches
-    .filter((b) => STAGING_PATTERN.test(b))
-    .sort((a, b) => b.localeCompare(a, undefined, { numeric: true }));
-  const alphaBranches = remoteBranches
-    .filter((b) => ALPHA_PATTERN.test(b))
-    .sort((a, b) => b.localeCompare(a, undefined, { numeric: true }));
-  const betaBranches = remoteBranches
-    .filter((b) => BETA_PATTERN.test(b))
-    .sort((a, b) => b.localeCompare(a, undefined, { numeric: true }));
+  const versions = releaseIndex.versions;
+  const releaseBranches = versions.flatMap((v) =>
+    v.staging ? [v.staging] : [],
+  );
+  const alphaBranches = versions.flatMap((v) => (v.alpha ? [v.alpha] : []));
+  const betaBranches = versions.flatMap((v) => (v.beta ? [v.beta] : []));
 
   const stages: Stage[] = [];
 
   // 1. Feature/Bugfix -> Develop & Staging (Latest staging)
-  if (releaseBranches.length > 0) {
-    const latestRB = releaseBranches[0];
+  if (releaseIndex.latest.staging) {
+    const latestRB = releaseIndex.latest.staging;
     stages.push({
       id: buildStageId({
         name: "Release: Feature",
@@ -111,13 +134,8 @@ export function getReleaseStages(
   });
 
   // 4. Beta -> Live
+  const liveBranch = releaseIndex.liveBranch;
   betaBranches.forEach((bb) => {
-    const liveBranch = remoteBranches.includes("main")
-      ? "main"
-      : remoteBranches.includes("master")
-        ? "master"
-        : "main";
-
     stages.push({
       id: buildStageId({
         name: "Release: Beta->Live",
@@ -139,25 +157,14 @@ export function getReleaseStages(
 /**
  * Shared logic for determining standard propagation targets for parent hotfixes
  */
-function getParentHotfixTargets(remoteBranches: string[]): string[] {
-  const sortedBranches = [...remoteBranches].sort((a, b) =>
-    b.localeCompare(a, undefined, { numeric: true }),
-  );
-  const releaseBranch = sortedBranches.find((b) => STAGING_PATTERN.test(b));
-  const alphaBranch = sortedBranches.find((b) => ALPHA_PATTERN.test(b));
-  const betaBranch = sortedBranches.find((b) => BETA_PATTERN.test(b));
+function getParentHotfixTargets(releaseIndex: ReleaseIndex): string[] {
+  const { staging, alpha, beta } = releaseIndex.latest;
 
   const targets = ["develop"];
-  if (releaseBranch) targets.push(releaseBranch);
-  if (alphaBranch) targets.push(alphaBranch);
-  if (betaBranch) targets.push(betaBranch);
-
-  const liveBranch = remoteBranches.includes("main")
-    ? "main"
-    : remoteBranches.includes("master")
-      ? "master"
-      : "main";
-  targets.push(liveBranch);
+  if (staging) targets.push(staging);
+  if (alpha) targets.push(alpha);
+  if (beta) targets.push(beta);
+  targets.push(releaseIndex.liveBranch);
 
   return Array.from(new Set(targets));
 }
@@ -167,12 +174,9 @@ function getParentHotfixTargets(remoteBranches: string[]): string[] {
  */
 export function getChildHotfixStages(
   currentBranch: string,
-  remoteBranches: string[],
+  releaseIndex: ReleaseIndex,
 ): Stage[] {
-  const hotfixBranches = remoteBranches.filter((b) => b.startsWith("hotfix/"));
-  const childHotfixes = hotfixBranches.filter((b) =>
-    b.replace("hotfix/", "").includes("-"),
-  );
+  const childHotfixes = releaseIndex.hotfixChildren;
 
   const stages: Stage[] = [];
 
@@ -226,12 +230,9 @@ export function getChildHotfixStages(
  */
 export function getParentHotfixStages(
   currentBranch: string,
-  remoteBranches: string[],
+  releaseIndex: ReleaseIndex,
 ): Stage[] {
-  const hotfixBranches = remoteBranches.filter((b) => b.startsWith("hotfix/"));
-  const parentHotfixes = hotfixBranches.filter(
-    (b) => !b.replace("hotfix/", "").includes("-"),
-  );
+  const parentHotfixes = releaseIndex.hotfixParents;
 
   const stages: Stage[] = [];
 
@@ -242,13 +243,13 @@ export function getParentHotfixStages(
       id: buildStageId({
         name: "Hotfix: Detected Parent->All",
         source: detectedParent,
-        targets: getParentHotfixTargets(remoteBranches),
+        targets: getParentHotfixTargets(releaseIndex),
       }),
       title: `Parent: ${detectedParent} -> All Branches (Propagate)`,
       recommendation: {
         name: "Hotfix: Detected Parent->All",
         source: detectedParent,
-        targets: getParentHotfixTargets(remoteBranches),
+        targets: getParentHotfixTargets(releaseIndex),
       },
     });
   }
@@ -265,13 +266,13 @@ export function getParentHotfixStages(
       id: buildStageId({
         name: `Hotfix: Parent (${ph})`,
         source: ph,
-        targets: getParentHotfixTargets(remoteBranches),
+        targets: getParentHotfixTargets(releaseIndex),
       }),
       title: `${ph} -> All Branches (Propagate)`,
       recommendation: {
         name: `Hotfix: Parent (${ph})`,
         source: ph,
-        targets: getParentHotfixTargets(remoteBranches),
+        targets: getParentHotfixTargets(releaseIndex),
       },
     });
   });